@@ -5,20 +5,36 @@ ArXiv Daily Chef - ArXiv 每日私厨
 功能：论文浏览、收藏夹、Visual Teaser、代码链接检测
 """
 
+import time
+
 import streamlit as st
 from utils.topic_manager import load_topics, add_topic, delete_topic
-from utils.arxiv_fetcher import fetch_papers, ArxivFetchError
-from utils.llm_summarizer import summarize_abstract, LLMSummarizeError
+from utils.arxiv_fetcher import iter_papers, PageCursor, ArxivFetchError
+from utils.feed_cache import FEED_CACHE
+from utils.bulk_harvester import HARVEST_FEED
+from utils.paper_id import base_id, content_hash
+from utils.llm_summarizer import (
+    stream_summary, summarize_packed, summarize_all_languages, get_cached_summary, get_partial_summary,
+    LLMSummarizeError
+)
 from utils.i18n import get_text, SUPPORTED_LANGUAGES
 from utils.pdf_image_extractor import get_teaser_image, image_to_base64
 from utils.favorites_manager import (
     add_favorite, remove_favorite, is_favorited, 
     get_categories, get_favorites_by_category, get_all_favorites,
-    get_favorites_count, load_favorites
+    get_favorites_count, load_favorites, refresh_favorites_metadata
 )
 from utils.conference_tracker import get_upcoming_deadlines, check_paper_conference_match, format_countdown
-from utils.hyperparam_extractor import extract_hyperparams_from_pdf
+from utils.hyperparam_extractor import stream_hyperparams_from_pdf, HyperparamExtractError
 from utils.trend_radar import generate_trend_radar, get_top_keywords, WORDCLOUD_AVAILABLE
+from utils.llm_metrics import get_daily_rollup, get_model_rollup
+from utils.llm_client_pool import get_pool_stats
+from utils.llm_router import LLM_ROUTER, Provider
+from utils.llm_scheduler import LLM_SCHEDULER
+from utils.presummarizer import PRESUMMARIZER
+from utils.summary_cache import get_stats as get_summary_cache_stats
+from utils.pdf_text_cache import get_stats as get_pdf_text_cache_stats
+from utils.rate_limiter import ARXIV_LIMITER
 
 
 # ==================== 页面配置 ====================
@@ -132,6 +148,11 @@ if "papers" not in st.session_state:
     st.session_state.papers = []
 if "summaries" not in st.session_state:
     st.session_state.summaries = {}
+if "offline_summaries" not in st.session_state:
+    # LLM 失败时退回的离线摘要：{摘要键: (离线摘要, LLM 错误)}，不计入 summaries，之后仍可重试 LLM
+    st.session_state.offline_summaries = {}
+if "page_cursor" not in st.session_state:
+    st.session_state.page_cursor = None
 if "teasers" not in st.session_state:
     st.session_state.teasers = {}
 if "lang" not in st.session_state:
@@ -142,6 +163,9 @@ if "selected_fav_category" not in st.session_state:
     st.session_state.selected_fav_category = None
 if "hyperparams" not in st.session_state:
     st.session_state.hyperparams = {}
+if "partial_hyperparams" not in st.session_state:
+    # 生成失败的超参数卡片：{论文 ID: (已生成的部分, 错误)}，不计入 hyperparams，之后仍可重试
+    st.session_state.partial_hyperparams = {}
 if "theme" not in st.session_state:
     st.session_state.theme = "light"  # light, dark, ocean, forest
 
@@ -362,6 +386,7 @@ def render_paper_card(paper, show_favorite_btn=True, is_favorite_view=False, fav
         abstract = paper.get('abstract', '')
         published = paper.get('published', '')
         code_urls = paper.get('code_urls', [])
+        journal_ref = paper.get('journal_ref', '')
         favorited_at = paper.get('favorited_at', '')
     else:
         title = paper.title
@@ -371,6 +396,7 @@ def render_paper_card(paper, show_favorite_btn=True, is_favorite_view=False, fav
         abstract = paper.abstract
         published = paper.published
         code_urls = paper.code_urls if hasattr(paper, 'code_urls') else []
+        journal_ref = getattr(paper, 'journal_ref', '')
         favorited_at = ''
     
     with st.container():
@@ -429,6 +455,8 @@ def render_paper_card(paper, show_favorite_btn=True, is_favorite_view=False, fav
                 st.caption(f"📅 {published} | ⭐ {t('favorited_at', time=favorited_at)}")
             else:
                 st.caption(f"📅 {published} | 🔖 {arxiv_id}")
+        if journal_ref:
+            st.caption(f"📰 {journal_ref}")
         
         # 摘要
         with st.expander(t("view_abstract")):
@@ -468,6 +496,82 @@ def render_paper_card(paper, show_favorite_btn=True, is_favorite_view=False, fav
                 st.info(hyperparam_result)
             else:
                 st.caption(t("hyperparam_failed"))
+        elif hyperparam_key in st.session_state.partial_hyperparams:
+            # 生成中途失败：显示已生成的部分（不当作最终结果），按钮保留以便重试
+            partial_card, hyperparam_error = st.session_state.partial_hyperparams[hyperparam_key]
+            st.markdown(t("hyperparam_title"))
+            st.warning(t("hyperparam_partial", error=hyperparam_error))
+            if partial_card:
+                st.info(partial_card)
+
+
+def render_stream(chunks, placeholder, waiting_text: str) -> str:
+    """
+    把 LLM 流式输出逐段渲染到占位元素中
+    
+    Args:
+        chunks: 文本片段迭代器
+        placeholder: st.empty() 创建的占位元素
+        waiting_text: 第一个片段到达前显示的提示
+    
+    Returns:
+        str: 拼接后的完整文本
+    """
+    placeholder.caption(waiting_text)
+    text = ""
+    last_render = 0.0
+    for chunk in chunks:
+        text += chunk
+        # 限制刷新频率，避免逐 token 向前端推送过多消息
+        now = time.time()
+        if now - last_render >= STREAM_RENDER_INTERVAL:
+            placeholder.info(text + " ▌")
+            last_render = now
+    if text:
+        placeholder.info(text)
+    else:
+        placeholder.empty()
+    return text
+
+
+def render_paper_preview(paper):
+    """渲染拉取过程中的简化论文卡片（不含按钮，拉取完成后替换为完整卡片）"""
+    st.markdown("---")
+    st.markdown(f"### [{paper.title}]({paper.url})")
+    authors_display = ", ".join(paper.authors[:3])
+    if len(paper.authors) > 3:
+        authors_display += " " + t("authors_et_al", count=len(paper.authors))
+    st.caption(f"👤 {authors_display} | 📅 {paper.published} | 🔖 {paper.arxiv_id}")
+
+
+# 流式拉取时第一页的论文数量（第一页到达后即可显示，其余论文再用一次请求取回）
+STREAM_FIRST_PAGE_SIZE = 10
+
+# 「加载更多」每次追加的论文数量
+LOAD_MORE_PAGE_SIZE = 20
+
+# LLM 流式输出的最短刷新间隔（秒）
+STREAM_RENDER_INTERVAL = 0.05
+
+# 管理面板中 SQLite 统计的缓存秒数（避免每次重新运行脚本都扫描用量表和缓存库）
+ADMIN_STATS_TTL = 30
+
+
+@st.cache_data(ttl=ADMIN_STATS_TTL, show_spinner=False)
+def load_admin_stats():
+    """读取管理面板中需要查询 SQLite 的统计（按 ADMIN_STATS_TTL 缓存，所有会话共享）"""
+    return {
+        "daily": get_daily_rollup(days=7),
+        "by_model": get_model_rollup(days=7),
+        "summary_cache": get_summary_cache_stats(),
+        "pdf_text_cache": get_pdf_text_cache_stats(),
+        "arxiv_limiter": ARXIV_LIMITER.get_stats(),
+    }
+
+
+def get_summary_key(paper, lang):
+    """摘要缓存键：基础编号 + 摘要内容指纹 + 语言（论文新版本的摘要不变时复用已有摘要）"""
+    return f"{base_id(paper.arxiv_id)}_{content_hash(paper.abstract)}_{lang}"
 
 
 # ==================== 侧边栏 ====================
@@ -491,8 +595,8 @@ with st.sidebar:
         
         new_lang = lang_options[lang_labels.index(selected_lang_label)]
         if new_lang != st.session_state.lang:
+            # 摘要按语言分别保存，切换语言不清空，切回时直接显示
             st.session_state.lang = new_lang
-            st.session_state.summaries = {}
             st.rerun()
     
     with col_theme:
@@ -631,6 +735,78 @@ with st.sidebar:
         )
         
         st.caption("💡 提示: 选择预设后只需填写 API Key 即可使用")
+        
+        # 备用服务商：主服务商响应过慢时对冲请求、失败时切换（摘要和超参数提取）
+        backup_preset = st.selectbox(
+            t("backup_provider"),
+            [t("backup_none")] + list(api_presets.keys()),
+            index=0,
+            help=t("backup_provider_help"),
+            key="sidebar_backup_preset"
+        )
+        backups = []
+        if backup_preset in api_presets:
+            backup_url, backup_model = api_presets[backup_preset]
+            backup_key = st.text_input(
+                t("backup_api_key"),
+                type="password",
+                key="sidebar_backup_api_key"
+            )
+            if backup_key and backup_url != base_url.strip():
+                backups.append(Provider(backup_url, backup_key, backup_model))
+        
+        # 摘要语言模式：仅当前语言 / 由其他语言的已有摘要翻译 / 一次请求生成全部语言
+        summary_modes = ["single", "derive", "all"]
+        summary_mode_labels = [t(f"summary_mode_{mode}") for mode in summary_modes]
+        selected_mode_label = st.selectbox(
+            t("summary_mode"),
+            summary_mode_labels,
+            index=0,
+            help=t("summary_mode_help"),
+            key="sidebar_summary_mode"
+        )
+        summary_mode = summary_modes[summary_mode_labels.index(selected_mode_label)]
+        
+        # 后台预摘要：拉取到论文后以最低优先级提前生成当前语言的摘要
+        presummarize = st.checkbox(
+            t("presummarize"),
+            value=False,
+            help=t("presummarize_help"),
+            key="sidebar_presummarize"
+        )
+        if presummarize:
+            # 每日上限由 presummarize.json 配置，所有会话共用，这里只展示
+            st.caption(t(
+                "presummarize_budget",
+                remaining=PRESUMMARIZER.remaining_budget(),
+                budget=PRESUMMARIZER.daily_budget
+            ))
+    
+    # ==================== 管理面板：LLM 用量与运行状态（可折叠）====================
+    # expander 的内容每次重新运行都会执行，统计只在打开开关后读取
+    with st.expander(t("admin_panel"), expanded=False):
+        if st.toggle(t("show_admin_stats"), key="admin_show_stats"):
+            stats = load_admin_stats()
+            if stats["daily"]:
+                st.markdown(t("metrics_by_day"))
+                st.dataframe(stats["daily"], hide_index=True, use_container_width=True)
+                st.markdown(t("metrics_by_model"))
+                st.dataframe(stats["by_model"], hide_index=True, use_container_width=True)
+            else:
+                st.caption(t("no_llm_calls"))
+            
+            st.markdown(t("runtime_stats"))
+            st.json({
+                "llm_scheduler": LLM_SCHEDULER.get_stats(),
+                "llm_router": LLM_ROUTER.get_stats(),
+                "llm_client_pool": get_pool_stats(),
+                "summary_cache": stats["summary_cache"],
+                "pdf_text_cache": stats["pdf_text_cache"],
+                "feed_cache": FEED_CACHE.get_stats(),
+                "bulk_harvest": HARVEST_FEED.get_stats(),
+                "presummarizer": PRESUMMARIZER.get_stats(),
+                "arxiv_limiter": stats["arxiv_limiter"],
+            }, expanded=False)
     
     # ==================== 领域订阅管理（可折叠，仅浏览模式）====================
     if st.session_state.view_mode == "browse":
@@ -716,7 +892,22 @@ if st.session_state.view_mode == "favorites":
         fav_papers = get_all_favorites()
     
     if fav_papers:
-        st.success(t("favorites_count", count=len(fav_papers)))
+        col_count, col_refresh = st.columns([3, 1])
+        with col_count:
+            st.success(t("favorites_count", count=len(fav_papers)))
+        with col_refresh:
+            # 批量刷新收藏的元数据（新版本、期刊出处），所有收藏共用少量 id_list 请求
+            if st.button(t("refresh_favorites"), use_container_width=True):
+                with st.spinner(t("refreshing_favorites")):
+                    try:
+                        saved, changed, total = refresh_favorites_metadata()
+                        if saved:
+                            st.toast(t("favorites_refreshed", changed=changed, total=total))
+                            st.rerun()
+                        else:
+                            st.error(t("favorites_save_failed"))
+                    except ArxivFetchError as e:
+                        st.error(f"⚠️ {str(e)}")
         for paper in fav_papers:
             render_paper_card(paper, show_favorite_btn=True, is_favorite_view=True)
     else:
@@ -756,18 +947,55 @@ else:
             else:
                 paper_count = int(count_option)
         
-        # 拉取论文
+        # 打开领域时优先使用缓存（过期的缓存先展示，同时在后台刷新）；点击刷新按钮则强制拉取
+        cached = None
+        newly_loaded = False
+        if not fetch_btn and not st.session_state.papers:
+            cached = FEED_CACHE.get_cached(st.session_state.selected_topic, paper_count)
+            if cached is not None:
+                st.session_state.papers = cached[0]
+                st.session_state.page_cursor = PageCursor.after(cached[0], source=cached[2])
+                st.session_state.summaries = {}
+                newly_loaded = True
+                st.caption(t("feed_cached", minutes=int(cached[1] // 60)))
+        
+        # 拉取论文：批量收割结果能回答时直接使用（收割到期时在后台进行），
+        # 否则单独搜索该领域（流式：每页到达后立即显示预览卡片）
         if fetch_btn or not st.session_state.papers:
-            with st.spinner(t("fetching_papers", topic=st.session_state.selected_topic)):
-                try:
-                    papers = fetch_papers(st.session_state.selected_topic, max_results=paper_count)
-                    st.session_state.papers = papers
-                    st.session_state.summaries = {}
-                    if not papers:
-                        st.warning(t("no_papers_found", topic=st.session_state.selected_topic))
-                except ArxivFetchError as e:
-                    st.error(f"⚠️ {str(e)}")
-                    st.session_state.papers = []
+            preview = st.empty()
+            papers = HARVEST_FEED.search(st.session_state.selected_topic, paper_count, wait=False)
+            source = "local"
+            if papers is None:
+                HARVEST_FEED.record_fallback()
+                source = "arxiv"
+                papers = []
+                with st.spinner(t("fetching_papers", topic=st.session_state.selected_topic)):
+                    try:
+                        with preview.container():
+                            for paper in iter_papers(
+                                st.session_state.selected_topic,
+                                max_results=paper_count,
+                                incremental=True,
+                                first_page_size=STREAM_FIRST_PAGE_SIZE
+                            ):
+                                papers.append(paper)
+                                render_paper_preview(paper)
+                        if not papers:
+                            st.warning(t("no_papers_found", topic=st.session_state.selected_topic))
+                    except ArxivFetchError as e:
+                        st.error(f"⚠️ {str(e)}")
+            # 保留已到达的论文，预览卡片由下方的完整卡片替换
+            preview.empty()
+            if papers:
+                FEED_CACHE.put(st.session_state.selected_topic, paper_count, papers, source)
+            st.session_state.papers = papers
+            st.session_state.page_cursor = PageCursor.after(papers, source=source)
+            st.session_state.summaries = {}
+            newly_loaded = True
+        
+        # 新拉取或从缓存载入的论文交给后台预摘要（已有摘要的论文会被跳过）
+        if presummarize and newly_loaded:
+            PRESUMMARIZER.submit(st.session_state.papers, api_key, base_url, model_name, st.session_state.lang)
         
         # 显示论文列表
         if st.session_state.papers:
@@ -803,7 +1031,28 @@ else:
                 render_paper_card(paper, show_favorite_btn=True, is_favorite_view=False)
                 
                 # LLM 摘要区域
-                summary_key = f"{paper.arxiv_id}_{st.session_state.lang}"
+                summary_key = get_summary_key(paper, st.session_state.lang)
+                
+                # 其他会话已经生成过的摘要直接从共享缓存读取；上次生成中途被打断的部分摘要单独展示，提示重新生成
+                partial_summary = None
+                if summary_key not in st.session_state.summaries:
+                    cached_summary = get_cached_summary(
+                        abstract=paper.abstract,
+                        arxiv_id=paper.arxiv_id,
+                        base_url=base_url,
+                        model=model_name,
+                        lang=st.session_state.lang
+                    )
+                    if cached_summary is not None:
+                        st.session_state.summaries[summary_key] = cached_summary
+                    else:
+                        partial_summary = get_partial_summary(
+                            abstract=paper.abstract,
+                            arxiv_id=paper.arxiv_id,
+                            base_url=base_url,
+                            model=model_name,
+                            lang=st.session_state.lang
+                        )
                 
                 if summary_key in st.session_state.summaries:
                     st.markdown(t("ai_summary_title"))
@@ -812,73 +1061,143 @@ else:
                     # 摘要和超参数提取按钮并排
                     btn_col1, btn_col2 = st.columns(2)
                     with btn_col1:
-                        if st.button(t("generate_summary"), key=f"sum_{paper.arxiv_id}"):
-                            if not api_key:
-                                st.warning(t("error_no_api_key"))
-                            else:
-                                with st.spinner(t("generating_summary")):
-                                    try:
-                                        summary = summarize_abstract(
-                                            abstract=paper.abstract,
-                                            api_key=api_key,
-                                            base_url=base_url,
-                                            model=model_name,
-                                            lang=st.session_state.lang
-                                        )
-                                        st.session_state.summaries[summary_key] = summary
-                                        st.rerun()
-                                    except LLMSummarizeError as e:
-                                        st.error(f"⚠️ {str(e)}")
+                        summary_clicked = st.button(
+                            t("retry_summary" if partial_summary is not None else "generate_summary"),
+                            key=f"sum_{paper.arxiv_id}"
+                        )
                     
+                    hyperparam_key = paper.arxiv_id
+                    hyperparam_clicked = False
                     with btn_col2:
-                        hyperparam_key = paper.arxiv_id
                         if hyperparam_key not in st.session_state.hyperparams:
-                            if st.button(t("hyperparam_spy"), key=f"hp_{paper.arxiv_id}"):
-                                if not api_key:
-                                    st.warning(t("error_no_api_key"))
-                                else:
-                                    with st.spinner(t("extracting_hyperparams")):
-                                        try:
-                                            result = extract_hyperparams_from_pdf(
-                                                arxiv_url=paper.url,
-                                                arxiv_id=paper.arxiv_id,
-                                                api_key=api_key,
-                                                base_url=base_url,
-                                                model=model_name,
-                                                lang=st.session_state.lang
-                                            )
-                                            st.session_state.hyperparams[hyperparam_key] = result
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.session_state.hyperparams[hyperparam_key] = None
-                                            st.error(t("hyperparam_failed"))
-            
-            # 批量生成摘要
-            st.markdown("---")
-            if st.button(t("generate_all_summaries"), type="secondary"):
-                if not api_key:
-                    st.warning(t("error_no_api_key"))
-                else:
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
+                            hyperparam_clicked = st.button(t("hyperparam_spy"), key=f"hp_{paper.arxiv_id}")
                     
-                    for i, paper in enumerate(st.session_state.papers):
-                        summary_key = f"{paper.arxiv_id}_{st.session_state.lang}"
-                        if summary_key not in st.session_state.summaries:
-                            status_text.text(t("processing_paper", title=paper.title[:50]))
+                    # 生成结果逐段显示在按钮下方（整行宽度），生成结束后写入会话状态
+                    # 摘要在未配置 API Key 或 LLM 不可用时退回离线抽取式摘要：离线摘要和 LLM 的错误单独保存，
+                    # 按钮保留，之后可以再次尝试 LLM
+                    if hyperparam_clicked and not api_key:
+                        st.warning(t("error_no_api_key"))
+                    elif summary_clicked and summary_mode == "all" and api_key:
+                        st.markdown(t("ai_summary_title"))
+                        with st.spinner(t("generating_all_languages")):
                             try:
-                                summary = summarize_abstract(
+                                summaries = summarize_all_languages(
                                     abstract=paper.abstract,
                                     api_key=api_key,
                                     base_url=base_url,
                                     model=model_name,
-                                    lang=st.session_state.lang
+                                    arxiv_id=paper.arxiv_id
                                 )
-                                st.session_state.summaries[summary_key] = summary
+                                for lang, summary in summaries.items():
+                                    st.session_state.summaries[get_summary_key(paper, lang)] = summary
+                                st.rerun()
                             except LLMSummarizeError as e:
-                                st.session_state.summaries[summary_key] = t("summary_failed", error=str(e))
-                        
-                        progress_bar.progress((i + 1) / len(st.session_state.papers))
-                    
-                    status_text.text(t("all_summaries_done"))
-                    st.rerun()
+                                st.error(f"⚠️ {str(e)}")
+                    elif summary_clicked:
+                        st.markdown(t("ai_summary_title"))
+                        fallback_errors = []
+                        try:
+                            summary = render_stream(stream_summary(
+                                abstract=paper.abstract,
+                                api_key=api_key,
+                                base_url=base_url,
+                                model=model_name,
+                                lang=st.session_state.lang,
+                                arxiv_id=paper.arxiv_id,
+                                fallback=True,
+                                backups=backups,
+                                derive=summary_mode == "derive",
+                                on_fallback=fallback_errors.append
+                            ), st.empty(), t("generating_summary"))
+                            if fallback_errors:
+                                st.session_state.offline_summaries[summary_key] = (summary, fallback_errors[0])
+                            else:
+                                st.session_state.offline_summaries.pop(summary_key, None)
+                                st.session_state.summaries[summary_key] = summary
+                            st.rerun()
+                        except LLMSummarizeError as e:
+                            st.error(f"⚠️ {str(e)}")
+                    elif hyperparam_clicked:
+                        st.markdown(t("hyperparam_title"))
+                        try:
+                            result = render_stream(stream_hyperparams_from_pdf(
+                                arxiv_url=paper.url,
+                                arxiv_id=paper.arxiv_id,
+                                api_key=api_key,
+                                base_url=base_url,
+                                model=model_name,
+                                lang=st.session_state.lang,
+                                backups=backups
+                            ), st.empty(), t("extracting_hyperparams"))
+                            st.session_state.partial_hyperparams.pop(hyperparam_key, None)
+                            st.session_state.hyperparams[hyperparam_key] = result or None
+                        except HyperparamExtractError as e:
+                            st.session_state.partial_hyperparams[hyperparam_key] = (e.partial, str(e))
+                        st.rerun()
+                    elif summary_key in st.session_state.offline_summaries:
+                        offline_summary, llm_error = st.session_state.offline_summaries[summary_key]
+                        st.markdown(t("ai_summary_title"))
+                        st.warning(t("llm_fallback_error", error=llm_error))
+                        st.info(offline_summary)
+                    elif partial_summary is not None:
+                        st.markdown(t("ai_summary_title"))
+                        st.warning(t("summary_partial"))
+                        st.info(partial_summary)
+            
+            # 加载更多：只请求游标之后的下一页（与首页同一来源），追加到已加载的论文后面
+            cursor = st.session_state.page_cursor
+            if cursor is not None and not cursor.exhausted:
+                if st.button(t("load_more"), use_container_width=True):
+                    with st.spinner(t("fetching_papers", topic=st.session_state.selected_topic)):
+                        try:
+                            more, st.session_state.page_cursor = HARVEST_FEED.fetch_page(
+                                st.session_state.selected_topic,
+                                page_size=LOAD_MORE_PAGE_SIZE,
+                                cursor=cursor
+                            )
+                            st.session_state.papers = st.session_state.papers + more
+                            if presummarize:
+                                PRESUMMARIZER.submit(more, api_key, base_url, model_name, st.session_state.lang)
+                            st.rerun()
+                        except ArxivFetchError as e:
+                            st.error(f"⚠️ {str(e)}")
+            
+            # 批量生成摘要
+            st.markdown("---")
+            if st.button(t("generate_all_summaries"), type="secondary"):
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                pending = [
+                    paper for paper in st.session_state.papers
+                    if get_summary_key(paper, st.session_state.lang) not in st.session_state.summaries
+                ]
+                
+                # 多篇论文打包进同一请求、多个请求并发，每篇完成时立即写入结果并推进进度条
+                def on_summary_complete(result, done):
+                    paper = pending[result.index]
+                    summary_key = get_summary_key(paper, st.session_state.lang)
+                    if result.ok:
+                        st.session_state.offline_summaries.pop(summary_key, None)
+                        st.session_state.summaries[summary_key] = result.summary
+                    elif result.offline:
+                        st.session_state.offline_summaries[summary_key] = (result.summary, result.error)
+                    else:
+                        st.session_state.summaries[summary_key] = t("summary_failed", error=result.error)
+                    status_text.text(t("summary_progress", done=done, total=len(pending), title=paper.title[:50]))
+                    progress_bar.progress(done / len(pending))
+                
+                summarize_packed(
+                    abstracts=[paper.abstract for paper in pending],
+                    api_key=api_key,
+                    base_url=base_url,
+                    model=model_name,
+                    lang=st.session_state.lang,
+                    arxiv_ids=[paper.arxiv_id for paper in pending],
+                    on_complete=on_summary_complete,
+                    fallback=True,
+                    derive=summary_mode in ("derive", "all")
+                )
+                
+                status_text.text(t("all_summaries_done"))
+                st.rerun()
@@ -0,0 +1 @@
+# benchmarks 模块初始化文件
@@ -0,0 +1,72 @@
+"""
+批量分类收割基准测试
+在本地 OAI-PMH 替身服务上运行 bulk_harvester，对比「按分类收割 + 本地匹配」
+与「每个领域一次 arxiv.Search」两种刷新方式需要的 ArXiv 请求数
+
+用法（在项目根目录运行）:
+    python -m benchmarks.bench_bulk_harvest
+    python -m benchmarks.bench_bulk_harvest --records 20000 --topics 40 --throttle-rate 0.1
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fake_oai_server import VOCABULARY, make_records, start_server
+from utils import bulk_harvester, paper_store
+from utils.topic_manager import load_topics
+
+
+# 收割的分类（与替身数据的分类对应）
+HARVEST_CATEGORIES = ["cs.CV", "cs.LG", "cs.CL", "cs.AI", "cs.RO", "stat.ML"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量分类收割基准测试")
+    parser.add_argument("--records", type=int, default=5000, help="替身服务中的论文数量")
+    parser.add_argument("--page-size", type=int, default=1000, help="OAI 每页记录数")
+    parser.add_argument("--topics", type=int, default=30, help="模拟订阅的领域数量（不足时用词表补齐）")
+    parser.add_argument("--max-results", type=int, default=10, help="每个领域展示的论文数量")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="替身服务返回 503 的概率")
+    args = parser.parse_args()
+
+    # 使用临时论文库，避免污染真实缓存
+    paper_store.PAPER_DB_FILE = os.path.join(tempfile.mkdtemp(), "papers.db")
+
+    topics = load_topics()
+    topics += [w for w in VOCABULARY if w not in topics][:max(args.topics - len(topics), 0)]
+
+    server, base_url = start_server(
+        make_records(args.records), page_size=args.page_size, throttle_rate=args.throttle_rate
+    )
+
+    start = time.perf_counter()
+    stored = bulk_harvester.harvest_categories(
+        HARVEST_CATEGORIES, from_date="2000-01-01", base_url=base_url, limiter=None
+    )
+    harvest_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    answered = {
+        topic: bulk_harvester.fetch_papers_local(topic, max_results=args.max_results)
+        for topic in topics
+    }
+    query_seconds = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"收割分类: {', '.join(HARVEST_CATEGORIES)} -> OAI 集合 {stored}")
+    print(f"收割耗时: {harvest_seconds:.2f}s，写入 {sum(stored.values())} 篇")
+    print(f"OAI 请求数: {server.request_count}（其中 503 限流 {server.throttled_count} 次）")
+    print(f"本地匹配 {len(topics)} 个领域: 共 {query_seconds * 1000:.1f}ms，"
+          f"平均 {query_seconds / len(topics) * 1000:.2f}ms/领域")
+    print(f"逐领域 arxiv.Search 每次刷新需要 {len(topics)} 次请求"
+          f"（按 3 秒/次限流至少 {len(topics) * 3}s）")
+
+    empty = [t for t, papers in answered.items() if not papers]
+    if empty:
+        print(f"本地无结果的领域: {', '.join(empty)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+代码链接提取基准测试
+对比旧版「逐个模式 re.findall」实现与当前单次扫描实现的速度，并校验两者结果一致
+
+用法（在项目根目录运行）:
+    python -m benchmarks.bench_code_urls
+    python -m benchmarks.bench_code_urls --corpus abstracts.json --repeat 20
+    python -m benchmarks.bench_code_urls --synthetic 2000
+
+语料默认取自 ArXiv 的真实摘要：首次运行按 topics.json 中的领域拉取并缓存到本地，
+之后直接读取缓存；也可以用 --corpus 指定 JSON 文件（字符串列表或含 abstract 字段的对象列表）。
+--synthetic 改用合成摘要（不联网），无法访问 ArXiv 时也会自动改用合成摘要。
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+from typing import List
+
+from utils.arxiv_fetcher import ArxivFetchError, CODE_URL_PATTERNS, extract_code_urls, fetch_papers
+from utils.paper_store import CACHE_DIR
+from utils.topic_manager import load_topics
+
+
+# 真实摘要语料缓存路径
+CORPUS_CACHE_FILE = os.path.join(CACHE_DIR, "bench_abstracts.json")
+
+# 合成摘要的素材：正文句子与各类代码链接（含结尾标点、括号等需要清洗的情况）
+FILLER = [
+    "We propose a novel framework for {topic} that improves robustness under distribution shift.",
+    "Extensive experiments on {count} benchmarks show consistent gains over strong baselines.",
+    "Our method reduces memory usage by {percent}% without sacrificing accuracy.",
+    "We further analyze the contribution of each component through ablation studies.",
+    "Theoretical analysis shows that the proposed objective converges at a linear rate.",
+]
+CODE_LINKS = [
+    "Code is available at https://github.com/{user}/{repo}.",
+    "Our implementation is released at https://github.com/{user}/{repo} (MIT license).",
+    "Project page: https://{user}.github.io/{repo}/",
+    "Models and code: https://huggingface.co/{user}/{repo}; https://gitlab.com/{user}/{repo}",
+    "See https://paperswithcode.com/paper/{repo} for results.",
+    "Source code: https://bitbucket.org/{user}/{repo}!",
+]
+TOPICS = ["point cloud segmentation", "language modeling", "image retrieval", "graph learning"]
+
+
+def make_synthetic(count: int, seed: int = 0) -> List[str]:
+    """生成 count 篇合成摘要（约一半附带代码链接）"""
+    rng = random.Random(seed)
+    abstracts = []
+    for i in range(count):
+        values = dict(topic=rng.choice(TOPICS), count=rng.randint(3, 9), percent=rng.randint(10, 60),
+                      user=f"lab{rng.randint(0, 50)}", repo=f"project-{i}")
+        sentences = rng.sample(FILLER, rng.randint(2, 4))
+        if rng.random() < 0.5:
+            sentences += rng.sample(CODE_LINKS, rng.randint(1, 2))
+        abstracts.append(" ".join(sentence.format(**values) for sentence in sentences))
+    return abstracts
+
+
+def legacy_extract_code_urls(text: str) -> List[str]:
+    """旧版实现（五次未编译的 re.findall + 二次清洗），作为对照基准"""
+    found_urls = set()
+    
+    for pattern in CODE_URL_PATTERNS:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        found_urls.update(matches)
+    
+    cleaned_urls = []
+    for url in found_urls:
+        url = url.rstrip('.,;:!?)]>')
+        if url:
+            cleaned_urls.append(url)
+    
+    return list(cleaned_urls)
+
+
+def load_corpus(path: str, per_topic: int) -> List[str]:
+    """
+    加载摘要语料
+    
+    Args:
+        path: 语料 JSON 文件路径，为空时使用（或生成）真实摘要缓存
+        per_topic: 生成缓存时每个领域拉取的论文数
+    
+    Returns:
+        List[str]: 摘要列表
+    """
+    if not path and os.path.exists(CORPUS_CACHE_FILE):
+        path = CORPUS_CACHE_FILE
+    
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return [item["abstract"] if isinstance(item, dict) else item for item in data]
+    
+    abstracts = []
+    for topic in load_topics() or ["Point Cloud", "LLM"]:
+        print(f"拉取语料: {topic} ...")
+        abstracts.extend(p.abstract for p in fetch_papers(topic, max_results=per_topic))
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(CORPUS_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(abstracts, f, ensure_ascii=False)
+    return abstracts
+
+
+def time_it(func, texts: List[str], repeat: int) -> float:
+    """返回对整个语料执行 repeat 轮的总耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return time.perf_counter() - start
+
+
+def check_same_output(texts: List[str]) -> int:
+    """校验新旧实现结果一致（新实现按出现顺序，旧实现无序，故比较集合），返回不一致数"""
+    mismatches = 0
+    for text in texts:
+        new_urls = extract_code_urls(text)
+        if set(new_urls) != set(legacy_extract_code_urls(text)) or len(new_urls) != len(set(new_urls)):
+            mismatches += 1
+            print(f"结果不一致: {text[:80]!r}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="代码链接提取基准测试")
+    parser.add_argument("--corpus", default="", help="摘要语料 JSON 文件")
+    parser.add_argument("--per-topic", type=int, default=100, help="生成语料时每个领域拉取的论文数")
+    parser.add_argument("--synthetic", type=int, default=0, help="改用指定数量的合成摘要（不联网）")
+    parser.add_argument("--repeat", type=int, default=10, help="每种实现重复的轮数")
+    parser.add_argument("--doc-size", type=int, default=20, help="模拟 PDF 全文时每篇拼接的摘要数")
+    args = parser.parse_args()
+    
+    if args.synthetic:
+        abstracts = make_synthetic(args.synthetic)
+    else:
+        try:
+            abstracts = load_corpus(args.corpus, args.per_topic)
+        except ArxivFetchError as e:
+            print(f"无法拉取真实摘要（{e}），改用 1000 篇合成摘要")
+            abstracts = make_synthetic(1000)
+    # 用多篇摘要拼接出长文本，模拟对 PDF 全文的扫描
+    documents = [
+        "\n".join(abstracts[i:i + args.doc_size])
+        for i in range(0, len(abstracts), args.doc_size)
+    ]
+    with_urls = sum(1 for text in abstracts if legacy_extract_code_urls(text))
+    print(f"语料: {len(abstracts)} 篇摘要（{with_urls} 篇含链接），{len(documents)} 篇拼接长文本\n")
+    
+    for name, texts in (("摘要", abstracts), ("长文本", documents)):
+        old = time_it(legacy_extract_code_urls, texts, args.repeat)
+        new = time_it(extract_code_urls, texts, args.repeat)
+        calls = len(texts) * args.repeat
+        print(
+            f"[{name}] 旧版 {old * 1e6 / calls:8.1f} µs/次 | "
+            f"单次扫描 {new * 1e6 / calls:8.1f} µs/次 | 加速 {old / new:5.1f}x"
+        )
+    
+    mismatches = check_same_output(abstracts + documents)
+    print(f"\n结果校验: {'全部一致' if mismatches == 0 else f'{mismatches} 条不一致'}")
+    
+    # 新实现的输出顺序必须稳定（按首次出现顺序）
+    stable = all(extract_code_urls(text) == extract_code_urls(text) for text in abstracts)
+    print(f"输出顺序稳定: {stable}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+离线抽取式摘要基准测试
+测量 summarize_extractive 的单线程吞吐量（篇/秒）和单篇耗时分布
+
+用法（在项目根目录运行）:
+    python -m benchmarks.bench_extractive
+    python -m benchmarks.bench_extractive --corpus abstracts.json --repeat 5
+    python -m benchmarks.bench_extractive --synthetic 2000
+
+语料默认与 bench_code_urls 共用真实摘要缓存（首次运行从 ArXiv 拉取）；
+无法联网时自动改用合成摘要。
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from benchmarks.bench_code_urls import load_corpus
+from utils.arxiv_fetcher import ArxivFetchError
+from utils.llm_summarizer import summarize_extractive
+
+
+# 合成摘要的句子模板（背景 / 方法 / 结果各选若干句）
+BACKGROUND = [
+    "{topic} has attracted increasing attention in recent years.",
+    "Existing methods for {topic} suffer from high computational cost and limited generalization.",
+    "However, most prior work on {topic} relies on large amounts of labeled data, e.g. manual annotations.",
+]
+METHOD = [
+    "In this paper, we propose {name}, a novel framework for {topic} based on sparse attention.",
+    "Our approach combines contrastive pretraining with a lightweight adapter module.",
+    "We further introduce a curriculum strategy that stabilizes training.",
+]
+RESULT = [
+    "Extensive experiments on {count} benchmarks demonstrate that {name} outperforms strong baselines.",
+    "{name} achieves state-of-the-art accuracy while reducing memory usage by {percent}%.",
+    "Code and models are publicly available.",
+]
+TOPICS = ["point cloud segmentation", "large language models", "image generation", "graph learning"]
+
+
+def make_synthetic(count: int, seed: int = 0) -> List[str]:
+    """生成 count 篇结构接近真实论文的合成摘要"""
+    rng = random.Random(seed)
+    abstracts = []
+    for i in range(count):
+        values = dict(topic=rng.choice(TOPICS), name=f"Model{i}", count=rng.randint(3, 9),
+                      percent=rng.randint(10, 60))
+        sentences = (rng.sample(BACKGROUND, 2) + rng.sample(METHOD, rng.randint(1, 3))
+                     + rng.sample(RESULT, rng.randint(1, 3)))
+        abstracts.append(" ".join(sentence.format(**values) for sentence in sentences))
+    return abstracts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线抽取式摘要基准测试")
+    parser.add_argument("--corpus", default="", help="摘要语料 JSON 文件")
+    parser.add_argument("--per-topic", type=int, default=100, help="生成语料时每个领域拉取的论文数")
+    parser.add_argument("--synthetic", type=int, default=0, help="改用指定数量的合成摘要（不联网）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复的轮数")
+    parser.add_argument("--lang", default="zh-CN", help="摘要标题的语言")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        abstracts = make_synthetic(args.synthetic)
+    else:
+        try:
+            abstracts = load_corpus(args.corpus, args.per_topic)
+        except ArxivFetchError as e:
+            print(f"无法拉取真实摘要（{e}），改用 1000 篇合成摘要")
+            abstracts = make_synthetic(1000)
+    abstracts = [abstract for abstract in abstracts if abstract and abstract.strip()]
+    print(f"语料: {len(abstracts)} 篇摘要，平均 {sum(map(len, abstracts)) / len(abstracts):.0f} 字符")
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for abstract in abstracts:
+            began = time.perf_counter()
+            summarize_extractive(abstract, args.lang)
+            latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+
+    print(f"单线程 {args.repeat} 轮共 {len(latencies)} 篇: {elapsed:.2f}s，{len(latencies) / elapsed:,.0f} 篇/秒")
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"单篇耗时 p50 {cuts[49] * 1000:.3f}ms  p95 {cuts[94] * 1000:.3f}ms  p99 {cuts[98] * 1000:.3f}ms")
+    print()
+    print("示例输出:")
+    print(summarize_extractive(abstracts[0], args.lang))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+LLM 调用路径基准测试
+在本地 OpenAI 兼容替身服务上，以不同并发度驱动摘要（普通 / 流式 / 打包）和超参数提取，
+报告吞吐量、p50/p95/p99 延迟、流式首 token 延迟，以及注入 429 / 500 后的恢复情况
+
+用法（在项目根目录运行）:
+    python -m benchmarks.bench_llm
+    python -m benchmarks.bench_llm --papers 64 --concurrency 1 4 16 --latency 0.5 --token-rate 100
+    python -m benchmarks.bench_llm --error-rate 0.05 --rate-limit-rate 0.05
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from benchmarks.fake_openai_server import start_server
+from utils import hyperparam_extractor, llm_metrics, pdf_image_extractor, summary_cache
+from utils.llm_scheduler import LLM_SCHEDULER
+from utils.llm_summarizer import (
+    LLMSummarizeError, stream_summary, summarize_abstract, summarize_batch, summarize_packed
+)
+
+
+# 生成合成摘要使用的词表
+WORDS = [
+    "transformer", "diffusion", "point", "cloud", "segmentation", "benchmark", "agents",
+    "reinforcement", "learning", "detection", "efficient", "language", "model", "graph",
+]
+
+# 合成 PDF 中的实验章节（供超参数提取定位）
+EXPERIMENT_SECTION = (
+    "4 Experiments\nImplementation details. We train with batch size 256 and learning rate 3e-4 "
+    "using AdamW with cosine decay on 8 A100 GPUs for 100 epochs. "
+)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """最近秩法计算百分位数（values 为空时返回 0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(p / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def make_abstracts(count: int, tag: str, seed: int = 0) -> List[str]:
+    """生成互不相同的合成摘要（tag 保证不同场景之间不会命中摘要缓存）"""
+    rng = random.Random(seed)
+    return [
+        f"[{tag}-{i}] " + " ".join(rng.choice(WORDS) for _ in range(150)) + "."
+        for i in range(count)
+    ]
+
+
+def make_pdfs(count: int) -> List[str]:
+    """在 PDF 缓存目录生成合成论文，返回 ArXiv ID 列表（提取时直接命中缓存，不访问 ArXiv）"""
+    arxiv_ids = []
+    for i in range(count):
+        arxiv_id = f"2401.{90000 + i:05d}"
+        doc = fitz.open()
+        for page_num in range(3):
+            page = doc.new_page()
+            text = EXPERIMENT_SECTION * 6 if page_num == 1 else f"Paper {i} introduction. " * 40
+            page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=9)
+        doc.save(os.path.join(pdf_image_extractor.CACHE_DIR, f"{arxiv_id}.pdf"))
+        doc.close()
+        arxiv_ids.append(arxiv_id)
+    return arxiv_ids
+
+
+def drive(call: Callable[[int], Optional[float]], count: int, concurrency: int) -> Tuple[float, List[float], List[float], int]:
+    """
+    以指定并发度执行 count 次调用
+
+    Args:
+        call: 执行第 i 次调用的函数，返回首 token 延迟（非流式返回 None），失败时抛出异常
+
+    Returns:
+        (总耗时, 成功调用的延迟列表, 首 token 延迟列表, 失败次数)
+    """
+    def timed(i: int):
+        start = time.perf_counter()
+        try:
+            ttft = call(i)
+        except (LLMSummarizeError, RuntimeError):
+            return None
+        return time.perf_counter() - start, ttft
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, range(count)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [o[0] for o in outcomes if o is not None]
+    ttfts = [o[1] for o in outcomes if o is not None and o[1] is not None]
+    return elapsed, latencies, ttfts, outcomes.count(None)
+
+
+def report(name: str, concurrency: int, count: int, result, server, before) -> None:
+    """打印一行结果"""
+    elapsed, latencies, ttfts, failed = result
+    injected = (server.rate_limited_count - before[0]) + (server.error_count - before[1])
+    line = (
+        f"{name:<16} c={concurrency:<3} n={count:<4} "
+        f"{len(latencies) / elapsed:7.2f} req/s  "
+        f"p50 {percentile(latencies, 50) * 1000:7.0f}ms  "
+        f"p95 {percentile(latencies, 95) * 1000:7.0f}ms  "
+        f"p99 {percentile(latencies, 99) * 1000:7.0f}ms"
+    )
+    if ttfts:
+        line += f"  TTFT p50 {percentile(ttfts, 50) * 1000:6.0f}ms p95 {percentile(ttfts, 95) * 1000:6.0f}ms"
+    line += f"  注入错误 {injected} / 最终失败 {failed}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 调用路径基准测试")
+    parser.add_argument("--papers", type=int, default=32, help="每个场景的论文数量")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16], help="并发度列表")
+    parser.add_argument("--latency", type=float, default=0.2, help="替身服务的首 token 延迟（秒）")
+    parser.add_argument("--token-rate", type=float, default=400.0, help="替身服务的输出速度（token/秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="替身服务返回 500 的概率")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="替身服务随机返回 429 的概率")
+    parser.add_argument("--rpm", type=int, default=100000, help="调度器对替身服务的 RPM 预算")
+    parser.add_argument("--tpm", type=int, default=100000000, help="调度器对替身服务的 TPM 预算")
+    parser.add_argument("--model", default="gpt-4o-mini", help="模型名称（影响打包请求的分组大小）")
+    args = parser.parse_args()
+
+    # 使用临时缓存和计量库，避免污染真实数据
+    temp_dir = tempfile.mkdtemp()
+    summary_cache.SUMMARY_DB_FILE = os.path.join(temp_dir, "summaries.db")
+    llm_metrics.METRICS_DB_FILE = os.path.join(temp_dir, "llm_metrics.db")
+    pdf_image_extractor.CACHE_DIR = temp_dir
+    hyperparam_extractor.HYPERPARAM_CACHE_DIR = os.path.join(temp_dir, "hyperparams")
+
+    server, base_url = start_server(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    )
+    LLM_SCHEDULER.set_budget(llm_metrics.provider_name(base_url), args.rpm, args.tpm)
+    common = dict(api_key="sk-bench", base_url=base_url, model=args.model, lang="en")
+
+    print(f"替身服务 {base_url}：首 token {args.latency}s，输出 {args.token_rate} token/s，"
+          f"500 概率 {args.error_rate}，429 概率 {args.rate_limit_rate}")
+
+    for concurrency in args.concurrency:
+        abstracts = make_abstracts(args.papers, f"summary-c{concurrency}")
+        before = (server.rate_limited_count, server.error_count)
+        result = drive(lambda i: summarize_abstract(abstracts[i], **common) and None, args.papers, concurrency)
+        report("summary", concurrency, args.papers, result, server, before)
+
+    for concurrency in args.concurrency:
+        abstracts = make_abstracts(args.papers, f"stream-c{concurrency}")
+
+        def stream_call(i: int) -> float:
+            start = time.perf_counter()
+            ttft = None
+            for _ in stream_summary(abstracts[i], **common):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            return ttft
+
+        before = (server.rate_limited_count, server.error_count)
+        result = drive(stream_call, args.papers, concurrency)
+        report("summary_stream", concurrency, args.papers, result, server, before)
+
+    arxiv_ids = make_pdfs(args.papers)
+    for concurrency in args.concurrency:
+        hyperparam_extractor.HYPERPARAM_CACHE_DIR = os.path.join(temp_dir, f"hyperparams-c{concurrency}")
+
+        def hyperparam_call(i: int) -> None:
+            card = hyperparam_extractor.extract_hyperparams_from_pdf(
+                f"https://arxiv.org/abs/{arxiv_ids[i]}", arxiv_ids[i], **common
+            )
+            if not card:
+                raise RuntimeError("提取失败")
+
+        before = (server.rate_limited_count, server.error_count)
+        result = drive(hyperparam_call, args.papers, concurrency)
+        report("hyperparams", concurrency, args.papers, result, server, before)
+
+    # 批量摘要：逐篇并发请求 vs 打包请求
+    print()
+    for name, summarize in (("batch", summarize_batch), ("packed", summarize_packed)):
+        abstracts = make_abstracts(args.papers, f"{name}-all")
+        requests_before = server.request_count
+        start = time.perf_counter()
+        results = summarize(abstracts, **common)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} {args.papers} 篇: {elapsed:6.2f}s，HTTP 请求 {server.request_count - requests_before} 次，"
+              f"成功 {sum(r.ok for r in results)} 篇")
+
+    stats = LLM_SCHEDULER.get_stats().get(llm_metrics.provider_name(base_url), {})
+    print()
+    print(f"替身服务共收到 {server.request_count} 次请求，注入 429 {server.rate_limited_count} 次、"
+          f"500 {server.error_count} 次；调度器重试 {stats.get('retries', 0)} 次，"
+          f"重试耗尽失败 {stats.get('failed', 0)} 次")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+论文内存占用基准测试
+遍历对象图（共享对象只计一次）测量 10 万篇合成论文在三种布局下的内存：
+旧版 dataclass（带 __dict__、列表字段、每篇独立的作者字符串）、
+当前的 slots + 字符串驻留 Paper，以及列式 PaperBatch
+
+用法（在项目根目录运行）:
+    python -m benchmarks.bench_paper_memory
+    python -m benchmarks.bench_paper_memory --count 200000 --abstract-len 0
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from types import FunctionType, ModuleType
+from typing import List
+
+from utils.arxiv_fetcher import Paper
+from utils.paper_batch import PaperBatch
+
+
+@dataclass
+class LegacyPaper:
+    """旧版论文数据结构（对照组）"""
+    title: str
+    authors: List[str]
+    abstract: str
+    url: str
+    published: str
+    arxiv_id: str
+    code_urls: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+
+
+CATEGORIES = ["cs.CV", "cs.LG", "cs.CL", "cs.AI", "cs.RO", "stat.ML", "eess.IV", "cs.GR"]
+
+
+def synthetic_records(count: int, abstract_len: int, seed: int = 0) -> List[dict]:
+    """
+    生成合成论文记录
+
+    每条记录中的字符串都是新建的对象（模拟从 Atom 源逐条解析得到的结果），
+    作者从 2 万人的作者池中抽取，因此同一作者会在不同论文中重复出现。
+    """
+    rng = random.Random(seed)
+    first_names = [f"Name{i}" for i in range(400)]
+    last_names = [f"Surname{i}" for i in range(50)]
+    words = ["point", "cloud", "model", "learning", "transformer", "diffusion", "graph", "agent"]
+    sentences = [
+        " ".join(rng.choice(words) for _ in range(abstract_len // 7))
+        for _ in range(200)
+    ]
+
+    records = []
+    for i in range(count):
+        arxiv_id = f"{2400 + i // 100000}.{i % 100000:05d}v1"
+        authors = [
+            " ".join([rng.choice(first_names), rng.choice(last_names)])
+            for _ in range(rng.randint(1, 8))
+        ]
+        abstract = "".join([rng.choice(sentences), f" ({i})"])
+        records.append({
+            "title": " ".join(rng.choice(words) for _ in range(8)),
+            "authors": authors,
+            "abstract": abstract,
+            "url": "".join(["http://arxiv.org/abs/", arxiv_id]),
+            "published": "-".join(["2025", f"{rng.randint(1, 12):02d}", f"{rng.randint(1, 28):02d}"]),
+            "arxiv_id": arxiv_id,
+            "code_urls": [f"https://github.com/u{i}/repo"] if rng.random() < 0.2 else [],
+            "categories": [" ".join([c])[:] for c in rng.sample(CATEGORIES, rng.randint(1, 3))],
+        })
+    return records
+
+
+def deep_sizeof(root: object) -> int:
+    """
+    计算对象图占用的总字节数
+
+    沿 gc.get_referents 遍历所有可达对象（类型、函数和模块除外），
+    同一个对象只计算一次，因此驻留共享的字符串不会被重复计数。
+    """
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, FunctionType, ModuleType)):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="论文内存占用基准测试")
+    parser.add_argument("--count", type=int, default=100_000, help="合成论文数量")
+    parser.add_argument("--abstract-len", type=int, default=1000, help="每篇摘要的大致字符数")
+    args = parser.parse_args()
+
+    print(f"合成 {args.count} 篇论文（摘要约 {args.abstract_len} 字符）...")
+
+    records = synthetic_records(args.count, args.abstract_len)
+
+    # 每种布局都从一份全新的记录构建，保证对照组拿到的是未经驻留的字符串
+    layouts = {
+        "旧版 dataclass": lambda recs: [LegacyPaper(**r) for r in recs],
+        "slots Paper": lambda recs: [Paper(**r) for r in recs],
+        "PaperBatch": lambda recs: PaperBatch.from_papers(Paper(**r) for r in recs),
+    }
+
+    # 标题和摘要正文在所有布局中都必须保留，单独统计便于比较结构开销
+    text_only = deep_sizeof([[r["title"], r["abstract"]] for r in records])
+    text_only -= sys.getsizeof([]) * (args.count + 1)
+
+    baseline = None
+    for name, build in layouts.items():
+        records = synthetic_records(args.count, args.abstract_len)
+        start = time.perf_counter()
+        obj = build(records)
+        elapsed = time.perf_counter() - start
+        del records
+        total = deep_sizeof(obj)
+        baseline = baseline or total
+        print(
+            f"{name:16s} {total / args.count:8.1f} 字节/篇 | "
+            f"除正文外 {(total - text_only) / args.count:7.1f} 字节/篇 | "
+            f"相对旧版 {total / baseline:6.1%} | 构建 {elapsed:5.2f}s"
+        )
+        del obj
+
+
+if __name__ == "__main__":
+    main()
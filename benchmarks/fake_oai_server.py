@@ -0,0 +1,195 @@
+"""
+本地 OAI-PMH 替身服务
+模拟 ArXiv OAI-PMH 接口（ListRecords + arXiv 元数据格式 + resumptionToken 分页），
+用于离线测试和基准测试 utils.bulk_harvester
+
+用法（在项目根目录运行）:
+    python -m benchmarks.fake_oai_server --port 8765 --records 5000
+然后将 bulk_harvester 的 base_url 指向 http://127.0.0.1:8765/oai
+"""
+
+import argparse
+import random
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+# 替身数据使用的分类（OAI 集合名由分类大类决定）
+CATEGORIES = ["cs.CV", "cs.LG", "cs.CL", "cs.AI", "cs.RO", "stat.ML", "eess.IV", "hep-th"]
+
+# 生成标题 / 摘要时使用的词表（包含 topics.json 中的常见领域词）
+VOCABULARY = [
+    "point", "cloud", "LLM", "agents", "YOLO", "detection", "diffusion", "transformer",
+    "segmentation", "reinforcement", "learning", "graph", "language", "model", "FSAR",
+    "few-shot", "action", "recognition", "robot", "benchmark", "efficient", "3D",
+]
+
+
+def make_records(count: int, days: int = 7, seed: int = 0) -> List[dict]:
+    """生成合成论文记录，日期均匀分布在最近 days 天内"""
+    rng = random.Random(seed)
+    today = date.today()
+    records = []
+    for i in range(count):
+        day = today - timedelta(days=rng.randrange(days))
+        categories = rng.sample(CATEGORIES, rng.randint(1, 2))
+        words = [rng.choice(VOCABULARY) for _ in range(60)]
+        abstract = " ".join(words) + "."
+        if rng.random() < 0.2:
+            abstract += f" Code: https://github.com/lab{i % 50}/repo{i}."
+        records.append({
+            "id": f"{day.strftime('%y%m')}.{i:05d}",
+            "datestamp": day.isoformat(),
+            "title": " ".join(words[:8]).title(),
+            "authors": [(f"Surname{rng.randrange(300)}", f"Name{rng.randrange(40)}") for _ in range(rng.randint(1, 5))],
+            "categories": categories,
+            "abstract": abstract,
+        })
+    return records
+
+
+def _set_of(category: str) -> str:
+    """与 bulk_harvester.category_to_set 一致的集合映射"""
+    archive = category.split(".")[0]
+    return f"physics:{archive}" if archive == "hep-th" else archive
+
+
+class FakeOAIServer(ThreadingHTTPServer):
+    """持有替身数据和请求统计的 HTTP 服务"""
+
+    def __init__(self, address: Tuple[str, int], records: List[dict], page_size: int = 1000,
+                 throttle_rate: float = 0.0):
+        super().__init__(address, FakeOAIHandler)
+        self.records = records
+        self.page_size = page_size
+        self.throttle_rate = throttle_rate      # 以 503 + Retry-After 拒绝请求的概率
+        self.request_count = 0
+        self.throttled_count = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(1)
+        self._tokens: Dict[str, Tuple[List[dict], int]] = {}
+
+    def query(self, params: Dict[str, str]) -> Tuple[List[dict], Optional[str]]:
+        """返回本页记录和下一页的 resumptionToken"""
+        with self._lock:
+            if "resumptionToken" in params:
+                matched, offset = self._tokens.pop(params["resumptionToken"], ([], 0))
+            else:
+                matched = [
+                    r for r in self.records
+                    if (not params.get("set") or any(_set_of(c) == params["set"] for c in r["categories"]))
+                    and r["datestamp"] >= params.get("from", "")
+                    and r["datestamp"] <= params.get("until", "9999-12-31")
+                ]
+                offset = 0
+
+            page = matched[offset:offset + self.page_size]
+            token = None
+            if offset + self.page_size < len(matched):
+                token = f"token{len(self._tokens)}-{offset + self.page_size}"
+                self._tokens[token] = (matched, offset + self.page_size)
+        return page, token
+
+
+class FakeOAIHandler(BaseHTTPRequestHandler):
+    """处理 /oai?verb=ListRecords 请求"""
+
+    server: FakeOAIServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        with self.server._lock:
+            self.server.request_count += 1
+            throttled = self.server._rng.random() < self.server.throttle_rate
+            if throttled:
+                self.server.throttled_count += 1
+
+        if throttled:
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+
+        if params.get("verb") != "ListRecords":
+            body = self._envelope('<error code="badVerb">only ListRecords is supported</error>')
+        else:
+            page, token = self.server.query(params)
+            if not page:
+                body = self._envelope('<error code="noRecordsMatch"/>')
+            else:
+                records = "".join(self._record(r) for r in page)
+                token_xml = f"<resumptionToken>{token or ''}</resumptionToken>"
+                body = self._envelope(f"<ListRecords>{records}{token_xml}</ListRecords>")
+
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def _envelope(inner: str) -> str:
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+            f"<responseDate>{date.today().isoformat()}T00:00:00Z</responseDate>"
+            f"{inner}</OAI-PMH>"
+        )
+
+    @staticmethod
+    def _record(r: dict) -> str:
+        authors = "".join(
+            f"<author><keyname>{escape(k)}</keyname><forenames>{escape(f)}</forenames></author>"
+            for k, f in r["authors"]
+        )
+        set_specs = "".join(f"<setSpec>{_set_of(c)}</setSpec>" for c in r["categories"])
+        return (
+            f"<record><header><identifier>oai:arXiv.org:{r['id']}</identifier>"
+            f"<datestamp>{r['datestamp']}</datestamp>{set_specs}</header>"
+            '<metadata><arXiv xmlns="http://arxiv.org/OAI/arXiv/">'
+            f"<id>{r['id']}</id><created>{r['datestamp']}</created>"
+            f"<authors>{authors}</authors><title>{escape(r['title'])}</title>"
+            f"<categories>{' '.join(r['categories'])}</categories>"
+            f"<abstract>{escape(r['abstract'])}</abstract>"
+            "</arXiv></metadata></record>"
+        )
+
+
+def start_server(records: List[dict], port: int = 0, page_size: int = 1000,
+                 throttle_rate: float = 0.0) -> Tuple[FakeOAIServer, str]:
+    """
+    在后台线程启动替身服务
+
+    Returns:
+        (server, base_url): 服务对象和 OAI 接口地址
+    """
+    server = FakeOAIServer(("127.0.0.1", port), records, page_size, throttle_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/oai"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 OAI-PMH 替身服务")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--records", type=int, default=5000, help="合成论文数量")
+    parser.add_argument("--page-size", type=int, default=1000, help="每页记录数")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="返回 503 的概率")
+    args = parser.parse_args()
+
+    server = FakeOAIServer(
+        ("127.0.0.1", args.port), make_records(args.records), args.page_size, args.throttle_rate
+    )
+    print(f"OAI-PMH 替身服务: http://127.0.0.1:{args.port}/oai")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
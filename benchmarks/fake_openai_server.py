@@ -0,0 +1,271 @@
+"""
+本地 OpenAI 兼容替身服务
+模拟 /v1/chat/completions（普通响应返回 usage；SSE 流式响应只在请求了
+stream_options.include_usage 时返回 usage，与 OpenAI 一致），
+可配置首 token 延迟、输出速度、5xx 错误率和 429 限流行为，
+用于离线测试和基准测试 utils.llm_summarizer / utils.hyperparam_extractor
+
+用法（在项目根目录运行）:
+    python -m benchmarks.fake_openai_server --port 8766 --latency 0.3 --token-rate 200
+然后将侧边栏的 Base URL 设置为 http://127.0.0.1:8766/v1（API Key 任意填写）
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, List, Optional, Tuple
+
+
+# 识别打包请求中每篇论文的标记（与 llm_summarizer 的打包格式一致）
+_PACK_PAPER = re.compile(r'\[\[PAPER ([^\]\n]+)\]\]\n(.*?)(?=\n\[\[PAPER |\Z)', re.DOTALL)
+
+# 识别多语言请求中要求的语言列表（与 llm_summarizer 的多语言格式一致，如 "en (English), ja (日本語)"）
+_LANG_LIST = re.compile(r'([A-Za-z]{2}(?:-[A-Za-z]{2})?) \([^)\n]*\)')
+
+# 单篇结果的默认输出 token 数
+DEFAULT_COMPLETION_TOKENS = 120
+
+
+def _fake_text(prompt: str, tokens: int) -> str:
+    """生成约 tokens 个 token 的伪摘要（按 4 个字符 1 个 token 计）"""
+    words = re.findall(r'[A-Za-z]{4,}', prompt)[:40] or ["summary"]
+    text = []
+    while len(" ".join(text)) < tokens * 4:
+        text.append(words[len(text) % len(words)])
+    return " ".join(text)
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """持有替身行为配置和请求统计的 HTTP 服务"""
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        latency: float = 0.2,
+        token_rate: float = 200.0,
+        completion_tokens: int = DEFAULT_COMPLETION_TOKENS,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        rpm_limit: int = 0,
+        retry_after: float = 1.0,
+        seed: int = 0
+    ):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency = latency                      # 首 token 延迟（秒）
+        self.token_rate = token_rate                # 输出速度（token/秒），0 表示不限
+        self.completion_tokens = completion_tokens  # 每篇结果的输出 token 数
+        self.error_rate = error_rate                # 返回 500 的概率
+        self.rate_limit_rate = rate_limit_rate      # 随机返回 429 的概率
+        self.rpm_limit = rpm_limit                  # 每分钟请求数上限，超过返回 429（0 表示不限）
+        self.retry_after = retry_after              # 随机 429 的 Retry-After 秒数
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.error_count = 0
+        self._recent: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def admit(self) -> Tuple[int, Optional[float]]:
+        """
+        决定本次请求的结果
+
+        Returns:
+            (状态码, Retry-After 秒数): 200 表示正常处理
+        """
+        with self._lock:
+            self.request_count += 1
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - 60:
+                self._recent.popleft()
+
+            if self.rpm_limit and len(self._recent) >= self.rpm_limit:
+                self.rate_limited_count += 1
+                return 429, self._recent[0] + 60 - now
+            if self._rng.random() < self.rate_limit_rate:
+                self.rate_limited_count += 1
+                return 429, self.retry_after
+            if self._rng.random() < self.error_rate:
+                self.error_count += 1
+                return 500, None
+
+            self._recent.append(now)
+            return 200, None
+
+    def handle_error(self, request, client_address):
+        """客户端断开保活连接属于正常情况，不打印堆栈"""
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def completion(self, messages: List[dict]) -> Tuple[str, int, int]:
+        """
+        生成回复
+
+        打包请求（含 [[PAPER id]] 标记）按论文逐篇输出 [[SUMMARY id]] ... [[END id]]；
+        多语言请求（含 [[LANG 标记说明）按语言逐个输出 [[LANG code]] ... [[END code]]。
+
+        Returns:
+            (回复文本, 输入 token 数, 输出 token 数)
+        """
+        prompt = "\n".join(message.get("content", "") for message in messages)
+        user = messages[-1].get("content", "") if messages else ""
+        papers = _PACK_PAPER.findall(user)
+        if papers:
+            text = "\n\n".join(
+                f"[[SUMMARY {label}]]\n{_fake_text(abstract, self.completion_tokens)}\n[[END {label}]]"
+                for label, abstract in papers
+            )
+        elif "[[LANG" in user:
+            text = "\n\n".join(
+                f"[[LANG {code}]]\n{_fake_text(user, self.completion_tokens)}\n[[END {code}]]"
+                for code in _LANG_LIST.findall(user.split("\n", 1)[0])
+            )
+        else:
+            text = _fake_text(user, self.completion_tokens)
+        return text, len(prompt) // 4 + 1, len(text) // 4 + 1
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """处理 POST /v1/chat/completions 请求"""
+
+    server: FakeOpenAIServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        status, retry_after = self.server.admit()
+        if status == 429:
+            self._send_json(429, {"error": {"message": "rate limit exceeded", "type": "rate_limit"}},
+                            {"Retry-After": f"{retry_after:.3f}"})
+            return
+        if status != 200:
+            self._send_json(status, {"error": {"message": "internal error", "type": "server_error"}})
+            return
+
+        text, prompt_tokens, completion_tokens = self.server.completion(body.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        time.sleep(self.server.latency)
+
+        if not body.get("stream"):
+            if self.server.token_rate:
+                time.sleep(completion_tokens / self.server.token_rate)
+            self._send_json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", ""),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            # 每个片段约 4 个 token（16 个字符），按输出速度间隔发送
+            for start in range(0, len(text), 16):
+                self._send_chunk(body, {"content": text[start:start + 16]}, None)
+                if self.server.token_rate:
+                    time.sleep(4 / self.server.token_rate)
+            self._send_chunk(body, {}, "stop")
+            # 与 OpenAI 一致：只有请求了 stream_options.include_usage 才在最后单独发送 usage（choices 为空）
+            if (body.get("stream_options") or {}).get("include_usage"):
+                self._send_usage_chunk(body, usage)
+            self._write(b"data: [DONE]\n\n")
+            self._write(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端提前关闭了流
+            pass
+
+    def _send_chunk(self, body: dict, delta: dict, finish_reason: Optional[str]):
+        self._send_event(body, {"choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+
+    def _send_usage_chunk(self, body: dict, usage: dict):
+        self._send_event(body, {"choices": [], "usage": usage})
+
+    def _send_event(self, body: dict, fields: dict):
+        chunk = {
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": body.get("model", ""),
+            **fields,
+        }
+        self._write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+    def _write(self, data: bytes):
+        """写入一个 HTTP chunked 分块（空数据表示结束）"""
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(port: int = 0, **options) -> Tuple[FakeOpenAIServer, str]:
+    """
+    在后台线程启动替身服务
+
+    Args:
+        port: 端口（0 表示随机）
+        **options: FakeOpenAIServer 的行为配置（latency、token_rate、error_rate 等）
+
+    Returns:
+        (server, base_url): 服务对象和 API 基础地址（以 /v1 结尾）
+    """
+    server = FakeOpenAIServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容替身服务")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.2, help="首 token 延迟（秒）")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="输出速度（token/秒），0 表示不限")
+    parser.add_argument("--completion-tokens", type=int, default=DEFAULT_COMPLETION_TOKENS,
+                        help="每篇结果的输出 token 数")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的概率")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="随机返回 429 的概率")
+    parser.add_argument("--rpm-limit", type=int, default=0, help="每分钟请求数上限（0 表示不限）")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="随机 429 的 Retry-After 秒数")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        ("127.0.0.1", args.port),
+        latency=args.latency,
+        token_rate=args.token_rate,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rpm_limit=args.rpm_limit,
+        retry_after=args.retry_after
+    )
+    print(f"OpenAI 兼容替身服务: http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
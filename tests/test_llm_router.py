@@ -0,0 +1,127 @@
+"""对冲路由：熔断器与对冲延迟"""
+
+import time
+
+import pytest
+
+import utils.llm_router as llm_router
+from utils.llm_router import (
+    BREAKER_FAILURE_THRESHOLD,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    LLMRouter,
+    Provider,
+)
+
+
+PRIMARY = Provider("https://primary.example.com/v1", "key", "model")
+BACKUP = Provider("https://backup.example.com/v1", "key", "model")
+
+
+class ProviderDown(Exception):
+    pass
+
+
+def make_open_stream(failing=(), delays=None):
+    """返回一个假的 open_stream：failing 中的服务商直接报错，其余按 delays 延迟后产出服务商名"""
+    calls = []
+
+    def open_stream(provider):
+        calls.append(provider.name)
+        if provider in failing:
+            raise ProviderDown(provider.name)
+        time.sleep((delays or {}).get(provider, 0))
+        yield provider.name
+        yield "!"
+
+    return open_stream, calls
+
+
+def test_failover_to_backup():
+    router = LLMRouter()
+    open_stream, calls = make_open_stream(failing=[PRIMARY])
+    assert "".join(router.stream(open_stream, [PRIMARY, BACKUP])) == "backup.example.com!"
+    assert calls == ["primary.example.com", "backup.example.com"]
+
+
+def test_all_providers_fail_raises_last_error():
+    router = LLMRouter()
+    open_stream, _ = make_open_stream(failing=[PRIMARY, BACKUP])
+    with pytest.raises(ProviderDown, match="backup"):
+        list(router.stream(open_stream, [PRIMARY, BACKUP]))
+
+
+def test_empty_stream_raises_error_type():
+    router = LLMRouter()
+    with pytest.raises(ProviderDown):
+        list(router.stream(lambda provider: iter(()), [PRIMARY], error_type=ProviderDown))
+
+
+def test_breaker_ejects_after_consecutive_failures(monkeypatch):
+    monkeypatch.setattr(llm_router, "BREAKER_COOLDOWN_SECONDS", 0.2)
+    router = LLMRouter()
+    open_stream, calls = make_open_stream(failing=[PRIMARY])
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        list(router.stream(open_stream, [PRIMARY, BACKUP]))
+    stats = router.get_stats()["primary.example.com"]
+    assert stats["ejected"] == 1
+    assert stats["breaker_open"]
+    assert not router.is_available(PRIMARY)
+
+    # 熔断中：请求直接发往备用服务商
+    calls.clear()
+    list(router.stream(open_stream, [PRIMARY, BACKUP]))
+    assert calls == ["backup.example.com"]
+
+    # 冷却结束后放行一次试探请求，成功后恢复
+    time.sleep(0.25)
+    assert router.is_available(PRIMARY)
+    ok_stream, _ = make_open_stream()
+    assert "".join(router.stream(ok_stream, [PRIMARY, BACKUP])) == "primary.example.com!"
+    assert router.get_stats()["primary.example.com"]["breaker_open"] is False
+
+
+def test_all_ejected_still_tries_primary():
+    router = LLMRouter()
+    open_stream, calls = make_open_stream(failing=[PRIMARY])
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(ProviderDown):
+            list(router.stream(open_stream, [PRIMARY]))
+    calls.clear()
+    with pytest.raises(ProviderDown):
+        list(router.stream(open_stream, [PRIMARY]))
+    assert calls == ["primary.example.com"]
+
+
+def test_hedge_delay_default_until_enough_samples():
+    router = LLMRouter()
+    assert router.hedge_delay(PRIMARY) == HEDGE_DEFAULT_DELAY
+    for _ in range(HEDGE_MIN_SAMPLES - 1):
+        router._record_first_chunk(PRIMARY, 2.0)
+    assert router.hedge_delay(PRIMARY) == HEDGE_DEFAULT_DELAY
+
+
+def test_hedge_delay_uses_percentile():
+    router = LLMRouter()
+    for i in range(1, 101):
+        router._record_first_chunk(PRIMARY, float(i))
+    assert router.hedge_delay(PRIMARY) == 96.0
+
+
+def test_hedge_delay_has_a_floor():
+    router = LLMRouter()
+    for _ in range(HEDGE_MIN_SAMPLES):
+        router._record_first_chunk(PRIMARY, 0.01)
+    assert router.hedge_delay(PRIMARY) == HEDGE_MIN_DELAY
+
+
+def test_slow_primary_is_hedged(monkeypatch):
+    monkeypatch.setattr(llm_router, "HEDGE_DEFAULT_DELAY", 0.05)
+    router = LLMRouter()
+    open_stream, calls = make_open_stream(delays={PRIMARY: 1.0})
+    assert "".join(router.stream(open_stream, [PRIMARY, BACKUP])) == "backup.example.com!"
+    stats = router.get_stats()
+    assert stats["backup.example.com"]["hedge_wins"] == 1
+    assert stats["primary.example.com"]["cancelled"] == 1
+    assert stats["primary.example.com"]["failures"] == 0
@@ -0,0 +1,35 @@
+"""打包请求响应（[[SUMMARY id]] ... [[END id]]）的解析"""
+
+from utils.llm_summarizer import parse_packed_response
+
+
+def test_parses_each_section():
+    text = (
+        "[[SUMMARY 2505.06002]]\n第一篇的摘要\n[[END 2505.06002]]\n\n"
+        "[[SUMMARY 2505.07001v2]]\nSecond summary\nwith two lines\n[[END 2505.07001v2]]\n"
+    )
+    assert parse_packed_response(text) == {
+        "2505.06002": "第一篇的摘要",
+        "2505.07001": "Second summary\nwith two lines",
+    }
+
+
+def test_tolerates_markdown_decoration():
+    text = "**[[SUMMARY #1]]**\n> 内容\n> [[END #1]]\n"
+    assert parse_packed_response(text) == {"#1": "> 内容"}
+
+
+def test_missing_end_marker_is_a_failure():
+    text = (
+        "[[SUMMARY a]]\n完整\n[[END a]]\n"
+        "[[SUMMARY b]]\n被截断的输出"
+    )
+    assert parse_packed_response(text) == {"a": "完整"}
+
+
+def test_mismatched_end_marker_is_a_failure():
+    assert parse_packed_response("[[SUMMARY a]]\n内容\n[[END b]]\n") == {}
+
+
+def test_skips_empty_sections():
+    assert parse_packed_response("[[SUMMARY a]]\n  \n[[END a]]\n") == {}
@@ -0,0 +1,35 @@
+"""PaperId 解析与规范化"""
+
+import pytest
+
+from utils.paper_id import PaperId, base_id, content_hash
+
+
+@pytest.mark.parametrize("text, base, version", [
+    ("2505.06002v2", "2505.06002", 2),
+    ("2505.06002", "2505.06002", 0),
+    ("arXiv:2505.06002v3", "2505.06002", 3),
+    ("  2505.06002v1 ", "2505.06002", 1),
+    ("http://arxiv.org/abs/2505.06002v2", "2505.06002", 2),
+    ("https://export.arxiv.org/abs/2505.06002", "2505.06002", 0),
+    ("https://arxiv.org/pdf/2505.06002v4.pdf", "2505.06002", 4),
+    ("hep-th/9901001v1", "hep-th/9901001", 1),
+    ("https://arxiv.org/pdf/hep-th/9901001v1.pdf", "hep-th/9901001", 1),
+])
+def test_parse(text, base, version):
+    assert PaperId.parse(text) == PaperId(base, version)
+
+
+def test_str_and_filename():
+    assert str(PaperId("2505.06002", 2)) == "2505.06002v2"
+    assert str(PaperId("2505.06002")) == "2505.06002"
+    assert PaperId.parse("hep-th/9901001v1").filename == "hep-th_9901001v1"
+
+
+def test_base_id_ignores_version():
+    assert base_id("2505.06002v1") == base_id("arXiv:2505.06002v7") == "2505.06002"
+
+
+def test_content_hash_separates_parts():
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+    assert content_hash("a", "b") == content_hash("a", "b")
@@ -0,0 +1,58 @@
+"""预检：模型上限、输入预算与截断"""
+
+from utils.prompt_preflight import (
+    DEFAULT_MODEL_LIMITS,
+    PROMPT_SAFETY_MARGIN,
+    count_tokens,
+    get_model_limits,
+    input_budget,
+    preflight,
+    truncate_to_budget,
+)
+
+
+SENTENCES = " ".join(f"Sentence number {i} describes one more experimental result." for i in range(200))
+
+
+def test_model_limits_use_longest_prefix():
+    assert get_model_limits("gpt-4") == (8192, 4096)
+    assert get_model_limits("gpt-4o-mini") == (128000, 16384)
+    assert get_model_limits("GPT-4-Turbo-2024-04-09") == (128000, 4096)
+    assert get_model_limits("some-local-model") == DEFAULT_MODEL_LIMITS
+
+
+def test_input_budget_reserves_prompt_output_and_margin():
+    prompt = "Summarize the following paper."
+    window, _ = get_model_limits("gpt-4")
+    expected = window - count_tokens(prompt, "gpt-4") - 1000 - PROMPT_SAFETY_MARGIN
+    assert input_budget("gpt-4", prompt, 1000) == expected
+    assert input_budget("gpt-4", prompt, 1000, cap=500) == 500
+
+
+def test_input_budget_is_at_least_one():
+    assert input_budget("gpt-4", "prompt", 100000) == 1
+
+
+def test_truncate_within_budget_is_unchanged():
+    assert truncate_to_budget("short text", 100) == ("short text", False)
+
+
+def test_truncate_keeps_whole_sentences():
+    text, truncated = truncate_to_budget(SENTENCES, 100)
+    assert truncated
+    assert count_tokens(text) <= 100
+    assert SENTENCES.startswith(text)
+    assert text.endswith(".")
+
+
+def test_preflight_respects_budget():
+    result = preflight(SENTENCES, "gpt-4", budget=200)
+    assert result.truncated
+    assert result.tokens <= 200
+    assert result.saved_tokens == result.original_tokens - result.tokens > 0
+
+
+def test_preflight_without_budget_does_not_truncate():
+    result = preflight("A  short\nabstract.", "gpt-4")
+    assert not result.truncated
+    assert result.text == "A short abstract."
@@ -0,0 +1,58 @@
+"""跨进程令牌桶限流器"""
+
+import time
+
+import pytest
+
+from utils.rate_limiter import TokenBucketLimiter
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "rate_limits.db")
+
+
+def test_burst_up_to_capacity_then_waits(db_file):
+    limiter = TokenBucketLimiter("test", rate=10.0, capacity=2, db_file=db_file)
+    assert limiter.acquire() < 0.05
+    assert limiter.acquire() < 0.05
+    # 桶已空：第三次要等约 1/rate 秒补充一个令牌
+    assert limiter.acquire() >= 0.05
+
+
+def test_penalize_blocks_all_tokens(db_file):
+    limiter = TokenBucketLimiter("test", rate=100.0, capacity=5, db_file=db_file)
+    limiter.acquire()
+    limiter.penalize(0.3)
+    assert limiter.get_stats()["blocked_for"] > 0
+    assert limiter.acquire() >= 0.25
+
+
+def test_buckets_with_same_name_share_state(db_file):
+    first = TokenBucketLimiter("shared", rate=5.0, capacity=1, db_file=db_file)
+    second = TokenBucketLimiter("shared", rate=5.0, capacity=1, db_file=db_file)
+    other = TokenBucketLimiter("other", rate=5.0, capacity=1, db_file=db_file)
+    first.acquire()
+    start = time.time()
+    second.acquire()
+    assert time.time() - start >= 0.1
+    assert other.acquire() < 0.05
+
+
+def test_get_stats(db_file):
+    limiter = TokenBucketLimiter("test", rate=20.0, capacity=1, db_file=db_file)
+    for _ in range(3):
+        limiter.acquire()
+    stats = limiter.get_stats()
+    assert stats["acquired"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["local_waiting"] == 0
+    assert 0 < stats["max_wait"] < 1
+    assert stats["avg_wait"] <= stats["max_wait"]
+
+
+def test_get_stats_before_first_acquire(db_file):
+    stats = TokenBucketLimiter("test", rate=1.0, db_file=db_file).get_stats()
+    assert stats["acquired"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["blocked_for"] == 0.0
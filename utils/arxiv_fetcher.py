@@ -5,9 +5,14 @@ ArXiv 论文拉取模块
 
 import arxiv
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, field
-from datetime import datetime
+import requests
+import sys
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from utils.rate_limiter import ARXIV_LIMITER
+from utils.paper_id import base_id
+from utils.single_flight import SingleFlight
 
 
 # 用于检测代码仓库和项目页面链接的正则表达式
@@ -25,43 +30,87 @@ CODE_URL_PATTERNS = [
 ]
 
 
+# 单次扫描匹配器：先用 _URL_START 找到每个 "http(s)://" 起点，
+# 再在该起点用一个合并后的正则同时尝试所有模式（每个模式是一个可选的前瞻分组），
+# 这样全文只扫描一遍，且结果与逐个模式 re.findall 完全一致
+# （因此 CODE_URL_PATTERNS 中只能使用非捕获分组）
+_URL_START = re.compile(r'https?://', re.IGNORECASE)
+_CODE_URL_MATCHER = re.compile(
+    ''.join(f'(?=({pattern}))?' for pattern in CODE_URL_PATTERNS),
+    re.IGNORECASE
+)
+
+
 def extract_code_urls(text: str) -> List[str]:
     """
     从文本中提取代码仓库和项目页面链接
     
     Args:
-        text: 要扫描的文本（通常是论文摘要）
+        text: 要扫描的文本（论文摘要或 PDF 全文均可）
     
     Returns:
-        List[str]: 找到的 URL 列表（去重）
+        List[str]: 找到的 URL 列表（去重，按在文本中首次出现的顺序）
     """
-    found_urls = set()
+    # 所有模式都以 "://" 为必要部分，绝大多数摘要可以直接跳过
+    if "://" not in text:
+        return []
     
-    for pattern in CODE_URL_PATTERNS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        found_urls.update(matches)
+    # 每个模式上一次匹配的结束位置，用于模拟 re.findall 的不重叠匹配语义
+    last_end = [0] * len(CODE_URL_PATTERNS)
+    found_urls = {}
     
-    # 清理 URL（移除尾部标点符号）
-    cleaned_urls = []
-    for url in found_urls:
-        # 移除末尾可能误匹配的标点
-        url = url.rstrip('.,;:!?)]>')
-        if url:
-            cleaned_urls.append(url)
+    for start_match in _URL_START.finditer(text):
+        pos = start_match.start()
+        match = _CODE_URL_MATCHER.match(text, pos)
+        
+        for i in range(len(CODE_URL_PATTERNS)):
+            url = match.group(i + 1)
+            if url is None or pos < last_end[i]:
+                continue
+            last_end[i] = match.end(i + 1)
+            
+            # 移除末尾可能误匹配的标点
+            url = url.rstrip('.,;:!?)]>')
+            if url:
+                found_urls.setdefault(url, None)
     
-    return list(cleaned_urls)
+    return list(found_urls)
 
 
-@dataclass
+# 收到 429 后全局暂停发放令牌的秒数
+RATE_LIMIT_BACKOFF_SECONDS = 10.0
+
+# 按 ID 批量查询时每次请求的 ID 数量（id_list 过长会导致请求 URL 超限）
+ID_LIST_CHUNK_SIZE = 100
+
+# 进程内的拉取合并器：多个会话同时拉取同一领域时只发出一次请求
+PAPER_FLIGHTS = SingleFlight()
+
+
+@dataclass(slots=True)
 class Paper:
-    """论文数据结构"""
+    """
+    论文数据结构
+    
+    使用 __slots__ 去掉每个实例的 __dict__；作者、日期和分类字符串经过 sys.intern 驻留，
+    同一作者 / 日期 / 分类在所有论文之间共享同一个字符串对象，列表字段统一转为元组。
+    """
     title: str                          # 论文标题
-    authors: List[str]                  # 作者列表
+    authors: Tuple[str, ...]            # 作者列表
     abstract: str                       # 摘要
     url: str                            # ArXiv 链接
     published: str                      # 发布日期
     arxiv_id: str                       # ArXiv ID
-    code_urls: List[str] = field(default_factory=list)  # 代码/项目页面链接
+    code_urls: Tuple[str, ...] = ()     # 代码/项目页面链接
+    categories: Tuple[str, ...] = ()    # ArXiv 分类（如 cs.CV）
+    journal_ref: str = ""               # 期刊 / 会议出处（如有）
+    
+    def __post_init__(self):
+        # 允许传入列表，统一压缩为元组并驻留重复率高的字符串
+        self.authors = tuple(map(sys.intern, self.authors))
+        self.published = sys.intern(self.published)
+        self.code_urls = tuple(self.code_urls)
+        self.categories = tuple(map(sys.intern, self.categories))
     
     @property
     def has_code(self) -> bool:
@@ -69,18 +118,128 @@ class Paper:
         return len(self.code_urls) > 0
 
 
+@dataclass
+class PageCursor:
+    """
+    分页游标：记录已加载到的位置，用于「加载更多」时只请求下一页
+    
+    新论文不断提交会使结果整体后移，因此除了偏移量还记录最后一篇论文的
+    发布日期和 ID，下一页中不早于它的论文（已加载过）会被丢弃。
+    不同来源的匹配规则和排序不同，下一页必须从首页的同一来源读取（见 source）。
+    """
+    offset: int = 0                 # 下一页在结果中的起始偏移量
+    last_published: str = ""        # 已加载的最后一篇论文的发布日期
+    last_arxiv_id: str = ""         # 已加载的最后一篇论文的 ID
+    exhausted: bool = False         # 是否已没有更多结果
+    source: str = "arxiv"           # 结果来源："arxiv"（逐领域搜索）或 "local"（本地论文库中的收割结果）
+    
+    @classmethod
+    def after(cls, papers: List[Paper], offset: Optional[int] = None, source: str = "arxiv") -> "PageCursor":
+        """创建指向 papers（按发布日期倒序）之后的游标，offset 默认为 papers 的数量"""
+        if not papers:
+            return cls(offset=offset or 0, source=source)
+        return cls(
+            offset=len(papers) if offset is None else offset,
+            last_published=papers[-1].published,
+            last_arxiv_id=papers[-1].arxiv_id,
+            source=source
+        )
+    
+    def advance(self, fetched: List[Paper], page_size: int) -> Tuple[List[Paper], "PageCursor"]:
+        """
+        处理从游标位置取回的一页结果
+        
+        Args:
+            fetched: 从 offset 开始取回的结果
+            page_size: 本页请求的数量（取回的数量不足时视为没有更多结果）
+        
+        Returns:
+            Tuple[List[Paper], PageCursor]: (本页新论文, 指向下一页的游标)
+        """
+        # 两次请求之间有新论文加入时，本页开头会与已加载的论文重复
+        papers = [p for p in fetched if self.is_after(p)]
+        
+        next_cursor = PageCursor.after(papers or fetched, offset=self.offset + len(fetched), source=self.source)
+        if not papers:
+            next_cursor.last_published = self.last_published
+            next_cursor.last_arxiv_id = self.last_arxiv_id
+        next_cursor.exhausted = len(fetched) < page_size
+        return papers, next_cursor
+    
+    def is_after(self, paper: Paper) -> bool:
+        """判断论文是否排在游标之后（即尚未加载过）"""
+        if not self.last_published:
+            return True
+        return (paper.published, base_id(paper.arxiv_id)) < (
+            self.last_published, base_id(self.last_arxiv_id)
+        )
+
+
 class ArxivFetchError(Exception):
     """ArXiv 拉取异常"""
     pass
 
 
-def fetch_papers(query: str, max_results: int = 5) -> List[Paper]:
+class RateLimitedClient(arxiv.Client):
+    """
+    经过全局限流器的 ArXiv 客户端
+    
+    每一次分页请求（包括重试）都先从 ARXIV_LIMITER 获取令牌，
+    因此多个会话、多个进程之间也能共同遵守 ArXiv 的请求间隔。
+    """
+    
+    def __init__(self, page_size: int = 100, num_retries: int = 5):
+        # 请求间隔由全局限流器负责，重试也在这里自行处理
+        super().__init__(page_size=page_size, delay_seconds=0.0, num_retries=0)
+        self.max_retries = num_retries
+    
+    def _parse_feed(self, url: str, first_page: bool = True, _try_index: int = 0):
+        while True:
+            ARXIV_LIMITER.acquire()
+            try:
+                return super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+            except arxiv.HTTPError as e:
+                if e.status == 429:
+                    # 被限流时让所有会话一起退避
+                    ARXIV_LIMITER.penalize(RATE_LIMIT_BACKOFF_SECONDS)
+                if _try_index >= self.max_retries:
+                    raise
+            except (arxiv.UnexpectedEmptyPageError, requests.exceptions.ConnectionError):
+                if _try_index >= self.max_retries:
+                    raise
+            _try_index += 1
+
+
+def _build_paper(result: "arxiv.Result") -> Paper:
+    """将 arxiv 库返回的 Result 转换为 Paper"""
+    # 处理摘要文本
+    abstract_text = result.summary.replace("\n", " ")
+    
+    # 从摘要中提取代码/项目链接
+    code_urls = extract_code_urls(abstract_text)
+    
+    return Paper(
+        title=result.title,
+        authors=[author.name for author in result.authors],
+        abstract=abstract_text,
+        url=result.entry_id,
+        published=result.published.strftime("%Y-%m-%d"),
+        arxiv_id=result.get_short_id(),
+        code_urls=code_urls,
+        categories=result.categories,
+        journal_ref=result.journal_ref or ""
+    )
+
+
+def fetch_papers(query: str, max_results: int = 5, incremental: bool = False) -> List[Paper]:
     """
     根据关键词从 ArXiv 搜索最新论文
     
     Args:
         query: 搜索关键词（如 "Point Cloud", "LLM Agents"）
         max_results: 返回的最大论文数量，默认为 5
+        incremental: 是否启用增量模式。启用后结果会写入本地论文库，
+                     之后再次拉取同一领域时只请求比本地最新论文更新的部分
     
     Returns:
         List[Paper]: 论文列表
@@ -88,46 +247,203 @@ def fetch_papers(query: str, max_results: int = 5) -> List[Paper]:
     Raises:
         ArxivFetchError: 当网络连接失败或超时时抛出
     """
-    import time
+    return list(iter_papers(query, max_results=max_results, incremental=incremental))
+
+
+def fetch_papers_by_ids(arxiv_ids: List[str], chunk_size: int = ID_LIST_CHUNK_SIZE) -> Dict[str, Paper]:
+    """
+    通过 id_list 批量查询论文的最新元数据（每 chunk_size 个 ID 一次请求）
     
-    try:
-        # 创建 ArXiv 客户端，设置更长的延迟和更多重试
-        client = arxiv.Client(
-            page_size=max_results,
-            delay_seconds=3.0,  # 请求间隔增加到 3 秒
-            num_retries=5       # 重试次数增加到 5 次
-        )
-        
-        # 构建搜索查询
-        search = arxiv.Search(
-            query=query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending
-        )
-        
+    查询时去掉版本号，ArXiv 会返回每篇论文的最新版本。
+    
+    Args:
+        arxiv_ids: ArXiv ID 列表（可带版本号，如 "2505.06002v2"）
+        chunk_size: 每次请求的 ID 数量
+    
+    Returns:
+        Dict[str, Paper]: 不带版本号的 ID -> 最新版本的论文；ArXiv 上查不到的 ID 不在结果中
+    
+    Raises:
+        ArxivFetchError: 当网络连接失败或超时时抛出
+    """
+    base_ids = list(dict.fromkeys(base_id(i) for i in arxiv_ids if i))
+    papers = {}
+    
+    for start in range(0, len(base_ids), chunk_size):
+        chunk = base_ids[start:start + chunk_size]
+        try:
+            client = RateLimitedClient(page_size=len(chunk))
+            search = arxiv.Search(id_list=chunk, max_results=len(chunk))
+            for result in client.results(search):
+                paper = _build_paper(result)
+                papers[base_id(paper.arxiv_id)] = paper
+        except arxiv.HTTPError as e:
+            raise ArxivFetchError(f"ArXiv 服务请求失败: {str(e)}")
+        except Exception as e:
+            raise ArxivFetchError(f"批量查询论文失败，请检查网络连接: {str(e)}")
+    
+    return papers
+
+
+def fetch_page(query: str, page_size: int = 20, cursor: Optional[PageCursor] = None) -> Tuple[List[Paper], PageCursor]:
+    """
+    从游标位置开始拉取下一页论文（用于「加载更多」，只请求并解析这一页）
+    
+    只处理来源为 arxiv 的游标，本地收割结果的下一页见 bulk_harvester.HarvestFeed.fetch_page。
+    
+    Args:
+        query: 搜索关键词
+        page_size: 本页请求的论文数量
+        cursor: 上一页返回的游标，为 None 时从第一篇开始
+    
+    Returns:
+        Tuple[List[Paper], PageCursor]: (本页新论文, 指向下一页的游标)
+    
+    Raises:
+        ArxivFetchError: 当网络连接失败或超时时抛出
+    """
+    cursor = cursor or PageCursor()
+    if cursor.exhausted:
+        return [], cursor
+    
+    fetched = list(_iter_search(query, page_size, offset=cursor.offset))
+    return cursor.advance(fetched, page_size)
+
+
+def iter_papers(
+    query: str,
+    max_results: int = 5,
+    incremental: bool = False,
+    first_page_size: Optional[int] = None
+) -> Iterator[Paper]:
+    """
+    fetch_papers 的流式版本：每解析完一页 Atom 结果就逐篇产出 Paper
+    
+    Args:
+        query: 搜索关键词
+        max_results: 返回的最大论文数量
+        incremental: 是否启用增量模式（同 fetch_papers）
+        first_page_size: 第一页请求的论文数量，默认一次请求全部；
+                         设小一些可以让第一页更快到达（其余结果再用一次请求取回）
+    
+    Yields:
+        Paper: 按发布日期倒序逐篇产出的论文
+    
+    Raises:
+        ArxivFetchError: 当网络连接失败或超时时抛出
+    """
+    # 相同查询（忽略多余空格）的并发调用合并为一次拉取；
+    # 正在拉取 20 篇时，请求 10 篇的调用直接取其前 10 篇
+    key = (" ".join(query.split()), incremental)
+    yield from PAPER_FLIGHTS.run(
+        key, max_results, lambda: _iter_papers(query, max_results, incremental, first_page_size)
+    )
+
+
+def _iter_papers(
+    query: str,
+    max_results: int,
+    incremental: bool,
+    first_page_size: Optional[int]
+) -> Iterator[Paper]:
+    """iter_papers 的实际拉取逻辑（不经过请求合并）"""
+    if not incremental:
+        yield from _iter_search(query, max_results, first_page_size)
+        return
+    
+    from utils import paper_store
+    
+    state = paper_store.get_topic_state(query)
+    
+    # 本地没有足够的连续数据：完整拉取一次，边拉取边产出，结束后入库
+    if state is None or state["depth"] < max_results or not state["newest"]:
         papers = []
-        
-        # 执行搜索并解析结果
-        for result in client.results(search):
-            # 处理摘要文本
-            abstract_text = result.summary.replace("\n", " ")
+        for paper in _iter_search(query, max_results, first_page_size):
+            papers.append(paper)
+            yield paper
+        paper_store.save_papers(query, papers)
+        return
+    
+    # 只请求从本地最新发布日期（含当天）之后提交的论文
+    since = datetime.strptime(state["newest"], "%Y-%m-%d")
+    until = datetime.now() + timedelta(days=1)
+    delta_query = (
+        f"({query}) AND submittedDate:"
+        f"[{since.strftime('%Y%m%d')}0000 TO {until.strftime('%Y%m%d')}2359]"
+    )
+    delta = list(_iter_search(delta_query, max_results, first_page_size))
+    new_papers = [p for p in delta if base_id(p.arxiv_id) not in state["known_ids"]]
+    
+    # 增量结果被截断时，本地旧数据与新数据之间可能存在空档
+    if len(delta) >= max_results:
+        depth = len(delta)
+    else:
+        depth = state["depth"] + len(new_papers)
+    
+    paper_store.save_papers(query, delta, depth=depth)
+    yield from paper_store.get_papers(query, limit=max_results)
+
+
+def _iter_search(
+    query: str,
+    max_results: int,
+    first_page_size: Optional[int] = None,
+    offset: int = 0
+) -> Iterator[Paper]:
+    """
+    执行一次 ArXiv 搜索（按提交日期倒序），逐篇产出解析结果
+    
+    默认一次请求全部结果；指定 first_page_size 时先请求一个小的第一页（尽快显示），
+    其余结果再用一次请求全部取回，总请求数最多为 2。
+    
+    Args:
+        query: ArXiv 查询语句
+        max_results: 返回的最大论文数量
+        first_page_size: 第一页请求的论文数量，默认等于 max_results
+        offset: 从第几篇结果开始（跳过的部分不会被请求）
+    
+    Yields:
+        Paper: 论文
+    
+    Raises:
+        ArxivFetchError: 当网络连接失败或超时时抛出
+    """
+    first_page_size = min(first_page_size or max_results, max_results)
+    pages = [(offset, first_page_size)]
+    if first_page_size < max_results:
+        pages.append((offset + first_page_size, max_results - first_page_size))
+    
+    try:
+        received = 0
+        for start, size in pages:
+            # 上一页不满说明已经没有更多结果
+            if start - offset > received:
+                break
             
-            # 从摘要中提取代码/项目链接
-            code_urls = extract_code_urls(abstract_text)
+            # 创建 ArXiv 客户端，请求间隔由全局限流器控制（每 3 秒 1 次）
+            client = RateLimitedClient(
+                page_size=size,
+                num_retries=5       # 重试次数增加到 5 次
+            )
             
-            paper = Paper(
-                title=result.title,
-                authors=[author.name for author in result.authors],
-                abstract=abstract_text,
-                url=result.entry_id,
-                published=result.published.strftime("%Y-%m-%d"),
-                arxiv_id=result.get_short_id(),
-                code_urls=code_urls
+            # 构建搜索查询
+            search = arxiv.Search(
+                query=query,
+                max_results=start + size,
+                sort_by=arxiv.SortCriterion.SubmittedDate,
+                sort_order=arxiv.SortOrder.Descending
             )
-            papers.append(paper)
-        
-        return papers
+            
+            # 执行搜索，每页解析完即可产出
+            try:
+                for result in client.results(search, offset=start):
+                    received += 1
+                    yield _build_paper(result)
+            except arxiv.UnexpectedEmptyPageError:
+                # 第一页之后的空页表示结果恰好取完
+                if received == 0:
+                    raise
+                break
     
     except arxiv.UnexpectedEmptyPageError as e:
         raise ArxivFetchError(f"未找到与 '{query}' 相关的论文")
@@ -0,0 +1,489 @@
+"""
+批量分类收割模块
+通过 ArXiv OAI-PMH 接口按分类批量拉取每日新论文（每页上千条），写入本地论文库，
+之后各个订阅领域的查询直接在本地匹配，不再为每个领域单独调用 arxiv.Search
+"""
+
+import json
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from utils import paper_store
+from utils.arxiv_fetcher import ArxivFetchError, PageCursor, Paper, extract_code_urls, fetch_page, fetch_papers
+from utils.rate_limiter import OAI_LIMITER, TokenBucketLimiter
+
+
+# ArXiv OAI-PMH 接口地址
+OAI_BASE_URL = "https://oaipmh.arxiv.org/oai"
+
+# OAI-PMH 与 arXiv 元数据格式的 XML 命名空间
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+# 服务端返回 503 流控时的最大重试次数
+MAX_RETRIES = 5
+
+# 503 响应没有可解析的 Retry-After 时的等待秒数
+DEFAULT_RETRY_AFTER = 10.0
+
+# 不经过限流器时，单次按 Retry-After 休眠的最长秒数
+MAX_RETRY_AFTER = 120.0
+
+# 批量收割默认关闭，需要在 harvest.json（与 app.py 同级目录，可选）中开启，并可覆盖收割的分类
+# 格式: {"enabled": true, "categories": ["cs.CV", "cs.LG"], "interval": 21600}
+DEFAULT_HARVEST_CATEGORIES = ["cs.AI", "cs.CL", "cs.CV", "cs.LG", "cs.RO", "stat.ML"]
+HARVEST_CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "harvest.json")
+
+# 两次收割之间的最短间隔（秒），以及收割失败后的重试间隔
+HARVEST_INTERVAL = 6 * 60 * 60
+HARVEST_RETRY_INTERVAL = 15 * 60
+
+# 本地论文库的收割结果距今超过这么多天时不再用于回答领域查询
+HARVEST_MAX_AGE_DAYS = 2
+
+# 属于 physics 集合的分类前缀（其余分类的 OAI 集合名就是分类的大类名）
+PHYSICS_ARCHIVES = {
+    "astro-ph", "cond-mat", "gr-qc", "hep-ex", "hep-lat", "hep-ph", "hep-th",
+    "math-ph", "nlin", "nucl-ex", "nucl-th", "physics", "quant-ph",
+}
+
+
+def category_to_set(category: str) -> str:
+    """
+    将 ArXiv 分类映射为 OAI-PMH 集合名
+
+    例如 cs.CV -> cs，stat.ML -> stat，hep-th -> physics:hep-th，
+    astro-ph.GA -> physics:astro-ph。同一大类下的多个分类共用一个集合，
+    只需收割一次，再在本地按分类过滤。
+    """
+    archive = category.split(".")[0]
+    if archive in PHYSICS_ARCHIVES:
+        return f"physics:{archive}"
+    return archive
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """
+    解析 Retry-After 头（RFC 7231 允许秒数或 HTTP 日期两种形式）
+
+    Returns:
+        float: 需要等待的秒数，缺失或无法解析时返回 DEFAULT_RETRY_AFTER
+    """
+    if not value or not value.strip():
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _request_page(
+    base_url: str,
+    params: Dict[str, str],
+    limiter: Optional[TokenBucketLimiter]
+) -> ET.Element:
+    """
+    请求一页 OAI-PMH 结果，处理 503 + Retry-After 流控
+
+    Raises:
+        ArxivFetchError: 请求失败或重试耗尽时抛出
+    """
+    for try_index in range(MAX_RETRIES + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = requests.get(base_url, params=params, timeout=60)
+        except requests.RequestException as e:
+            if try_index >= MAX_RETRIES:
+                raise ArxivFetchError(f"批量收割请求失败，请检查网络连接: {e}")
+            continue
+
+        if response.status_code == 503:
+            # OAI-PMH 规范的流控方式：503 + Retry-After
+            retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+            if limiter is not None:
+                limiter.penalize(retry_after)
+            else:
+                time.sleep(min(retry_after, MAX_RETRY_AFTER))
+            continue
+
+        if response.status_code != 200:
+            raise ArxivFetchError(f"批量收割请求失败: HTTP {response.status_code}")
+
+        return ET.fromstring(response.content)
+
+    raise ArxivFetchError("⏳ ArXiv OAI 接口持续限流，请稍后重试")
+
+
+def _parse_record(record: ET.Element) -> Optional[Paper]:
+    """将一条 arXiv 格式的 OAI 记录解析为 Paper，已删除的记录返回 None"""
+    header = record.find(f"{OAI_NS}header")
+    if header is not None and header.get("status") == "deleted":
+        return None
+
+    meta = record.find(f"{OAI_NS}metadata/{ARXIV_NS}arXiv")
+    if meta is None:
+        return None
+
+    def text(tag: str) -> str:
+        return " ".join((meta.findtext(f"{ARXIV_NS}{tag}") or "").split())
+
+    authors = []
+    for author in meta.iter(f"{ARXIV_NS}author"):
+        parts = [
+            author.findtext(f"{ARXIV_NS}forenames") or "",
+            author.findtext(f"{ARXIV_NS}keyname") or "",
+            author.findtext(f"{ARXIV_NS}suffix") or "",
+        ]
+        authors.append(" ".join(p.strip() for p in parts if p.strip()))
+
+    arxiv_id = text("id")
+    abstract = text("abstract")
+    return Paper(
+        title=text("title"),
+        authors=authors,
+        abstract=abstract,
+        # OAI 记录不带版本号，链接指向最新版本
+        url=f"http://arxiv.org/abs/{arxiv_id}",
+        published=text("created"),
+        arxiv_id=arxiv_id,
+        code_urls=extract_code_urls(abstract),
+        categories=text("categories").split()
+    )
+
+
+def iter_listing(
+    set_spec: str,
+    from_date: str,
+    until_date: Optional[str] = None,
+    base_url: str = OAI_BASE_URL,
+    limiter: Optional[TokenBucketLimiter] = OAI_LIMITER
+) -> Iterator[List[Paper]]:
+    """
+    按页遍历一个 OAI 集合在指定日期范围内新增或更新的论文
+
+    Args:
+        set_spec: OAI 集合名（如 "cs"）
+        from_date: 起始日期 YYYY-MM-DD（含）
+        until_date: 截止日期 YYYY-MM-DD（含），默认不限
+        base_url: OAI-PMH 接口地址（测试时可指向本地替身服务）
+        limiter: 请求限流器，为 None 时不限流
+
+    Yields:
+        List[Paper]: 每页解析出的论文
+
+    Raises:
+        ArxivFetchError: 请求失败时抛出
+    """
+    params = {
+        "verb": "ListRecords",
+        "metadataPrefix": "arXiv",
+        "set": set_spec,
+        "from": from_date,
+    }
+    if until_date:
+        params["until"] = until_date
+
+    while True:
+        root = _request_page(base_url, params, limiter)
+
+        error = root.find(f"{OAI_NS}error")
+        if error is not None:
+            # 指定范围内没有记录不是错误
+            if error.get("code") == "noRecordsMatch":
+                return
+            raise ArxivFetchError(f"ArXiv OAI 接口返回错误: {error.get('code')} {error.text or ''}")
+
+        list_records = root.find(f"{OAI_NS}ListRecords")
+        if list_records is None:
+            return
+
+        papers = [
+            paper for paper in map(_parse_record, list_records.findall(f"{OAI_NS}record"))
+            if paper is not None
+        ]
+        yield papers
+
+        # 通过 resumptionToken 翻页，token 为空表示已经是最后一页
+        token = list_records.findtext(f"{OAI_NS}resumptionToken")
+        if not token:
+            return
+        params = {"verb": "ListRecords", "resumptionToken": token.strip()}
+
+
+def harvest_categories(
+    categories: List[str],
+    from_date: Optional[str] = None,
+    base_url: str = OAI_BASE_URL,
+    limiter: Optional[TokenBucketLimiter] = OAI_LIMITER
+) -> Dict[str, int]:
+    """
+    批量收割若干分类的新论文并写入本地论文库
+
+    同一 OAI 集合下的分类只收割一次；未指定 from_date 时从该集合上次收割的日期继续，
+    从未收割过则从昨天开始（即一份每日列表）。
+
+    Args:
+        categories: ArXiv 分类列表（如 ["cs.CV", "cs.LG"]）
+        from_date: 起始日期 YYYY-MM-DD，默认增量续传
+        base_url: OAI-PMH 接口地址
+        limiter: 请求限流器，为 None 时不限流
+
+    Returns:
+        Dict[str, int]: 每个 OAI 集合写入的论文数量
+
+    Raises:
+        ArxivFetchError: 请求失败时抛出
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    wanted: Dict[str, set] = {}
+    for category in categories:
+        wanted.setdefault(category_to_set(category), set()).add(category)
+
+    stored = {}
+    for set_spec, set_categories in wanted.items():
+        since = from_date or paper_store.get_harvest_date(set_spec) or (
+            (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        )
+        count = 0
+        for page in iter_listing(set_spec, since, base_url=base_url, limiter=limiter):
+            # 集合比分类粗，只保留订阅的分类
+            papers = [p for p in page if set_categories & set(p.categories)]
+            paper_store.save_harvested_papers(papers)
+            count += len(papers)
+        paper_store.set_harvest_date(set_spec, today)
+        stored[set_spec] = count
+
+    return stored
+
+
+def fetch_papers_local(
+    query: str,
+    max_results: int = 5,
+    categories: Optional[List[str]] = None
+) -> List[Paper]:
+    """
+    在本地论文库中回答领域查询（用于替代逐领域的 arxiv.Search）
+
+    Args:
+        query: 领域关键词（如 "Point Cloud"）
+        max_results: 返回的最大论文数量
+        categories: 只在这些分类中查找，为 None 时不限制
+
+    Returns:
+        List[Paper]: 按发布日期倒序排列的论文
+    """
+    return paper_store.search_papers(query, limit=max_results, categories=categories)
+
+
+def fetch_page_local(
+    query: str,
+    page_size: int = 20,
+    cursor: Optional[PageCursor] = None,
+    categories: Optional[List[str]] = None
+) -> Tuple[List[Paper], PageCursor]:
+    """
+    fetch_page 的本地版本：从游标位置继续在本地论文库中分页（匹配规则和排序与 fetch_papers_local 一致）
+
+    Args:
+        query: 领域关键词
+        page_size: 本页的论文数量
+        cursor: 上一页返回的游标，为 None 时从第一篇开始
+        categories: 只在这些分类中查找，为 None 时不限制
+
+    Returns:
+        Tuple[List[Paper], PageCursor]: (本页新论文, 指向下一页的游标)
+    """
+    cursor = cursor or PageCursor(source="local")
+    if cursor.exhausted:
+        return [], cursor
+    fetched = paper_store.search_papers(query, limit=page_size, categories=categories, offset=cursor.offset)
+    return cursor.advance(fetched, page_size)
+
+
+def load_harvest_config() -> Dict:
+    """
+    从 harvest.json 加载批量收割配置
+    文件不存在或格式错误时返回默认配置
+    """
+    config = {"enabled": False, "categories": DEFAULT_HARVEST_CATEGORIES, "interval": HARVEST_INTERVAL}
+    try:
+        if os.path.exists(HARVEST_CONFIG_FILE):
+            with open(HARVEST_CONFIG_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            config.update({key: data[key] for key in config if key in data})
+        return config
+    except (json.JSONDecodeError, IOError, TypeError) as e:
+        print(f"加载批量收割配置失败: {e}")
+        return config
+
+
+class HarvestFeed:
+    """
+    以批量收割为主、逐领域搜索兜底的领域论文来源（进程内，所有会话共享）
+
+    每隔 interval 秒按分类增量收割一次（同时只运行一次收割），领域查询先在本地论文库中检索
+    收割过的分类；收割结果过旧或本地匹配的论文数量不足时，才为该领域单独调用 arxiv.Search。
+    """
+
+    def __init__(
+        self,
+        categories: Optional[List[str]] = None,
+        interval: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        base_url: str = OAI_BASE_URL,
+        limiter: Optional[TokenBucketLimiter] = OAI_LIMITER
+    ):
+        """
+        Args:
+            categories: 收割的分类，默认读取 harvest.json
+            interval: 两次收割之间的最短间隔（秒），默认读取 harvest.json
+            enabled: 是否启用批量收割（默认读取 harvest.json，未配置时关闭），为 False 时所有查询都逐领域搜索
+            base_url: OAI-PMH 接口地址
+            limiter: 请求限流器，为 None 时不限流
+        """
+        config = load_harvest_config()
+        self.categories = list(categories if categories is not None else config["categories"])
+        self.interval = float(interval if interval is not None else config["interval"])
+        self.enabled = bool(config["enabled"] if enabled is None else enabled)
+        self.base_url = base_url
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._harvest_lock = threading.Lock()
+        self._next_run = 0.0
+        self._stats = {"harvests": 0, "harvest_errors": 0, "local_hits": 0, "fallbacks": 0}
+
+    def _due(self) -> bool:
+        with self._lock:
+            return self.enabled and bool(self.categories) and time.monotonic() >= self._next_run
+
+    def _harvest(self) -> None:
+        """执行一次收割（调用方需持有 _harvest_lock）"""
+        if not self._due():
+            return
+        try:
+            harvest_categories(self.categories, base_url=self.base_url, limiter=self.limiter)
+            ok = True
+        except ArxivFetchError as e:
+            print(f"批量收割失败: {e}")
+            ok = False
+        with self._lock:
+            self._stats["harvests" if ok else "harvest_errors"] += 1
+            self._next_run = time.monotonic() + (self.interval if ok else HARVEST_RETRY_INTERVAL)
+
+    def refresh(self, wait: bool = True) -> None:
+        """
+        到期时收割一次
+
+        Args:
+            wait: 为 True 时阻塞到收割结束（其他线程正在收割时同样等待）；
+                  为 False 时在后台线程中收割并立即返回
+        """
+        if not self._due():
+            return
+        if wait:
+            with self._harvest_lock:
+                self._harvest()
+        elif self._harvest_lock.acquire(blocking=False):
+            def run():
+                try:
+                    self._harvest()
+                finally:
+                    self._harvest_lock.release()
+            threading.Thread(target=run, name="bulk-harvest", daemon=True).start()
+
+    def is_fresh(self) -> bool:
+        """所有收割的集合都在 HARVEST_MAX_AGE_DAYS 天内成功收割过"""
+        if not self.enabled or not self.categories:
+            return False
+        oldest = (datetime.now() - timedelta(days=HARVEST_MAX_AGE_DAYS)).strftime("%Y-%m-%d")
+        for set_spec in {category_to_set(category) for category in self.categories}:
+            last_date = paper_store.get_harvest_date(set_spec)
+            if last_date is None or last_date < oldest:
+                return False
+        return True
+
+    def search(self, query: str, max_results: int, wait: bool = True) -> Optional[List[Paper]]:
+        """
+        只在本地收割结果中回答领域查询
+
+        Args:
+            query: 领域关键词
+            max_results: 需要的论文数量
+            wait: 收割到期时是否等待收割结束（见 refresh）
+
+        Returns:
+            Optional[List[Paper]]: 本地匹配的论文；收割结果过旧或匹配数量不足时返回 None
+        """
+        self.refresh(wait=wait)
+        if not self.is_fresh():
+            return None
+        papers = fetch_papers_local(query, max_results, self.categories)
+        if len(papers) < max_results:
+            return None
+        with self._lock:
+            self._stats["local_hits"] += 1
+        return papers
+
+    def fetch(self, query: str, max_results: int = 5) -> Tuple[List[Paper], str]:
+        """
+        获取领域论文：本地收割结果能回答时直接返回，否则增量调用 arxiv.Search
+
+        Returns:
+            Tuple[List[Paper], str]: (论文列表, 结果来源 "local" / "arxiv"，加载更多时需从同一来源分页)
+
+        Raises:
+            ArxivFetchError: 逐领域搜索失败时抛出
+        """
+        papers = self.search(query, max_results)
+        if papers is not None:
+            return papers, "local"
+        self.record_fallback()
+        return fetch_papers(query, max_results, incremental=True), "arxiv"
+
+    def fetch_page(self, query: str, page_size: int, cursor: PageCursor) -> Tuple[List[Paper], PageCursor]:
+        """
+        从游标位置拉取下一页：首页来自本地收割结果时继续在本地论文库中分页，否则继续逐领域搜索
+
+        两种来源的匹配规则和排序不同，混用时后续页面会出现遗漏或重复。
+
+        Raises:
+            ArxivFetchError: 逐领域搜索失败时抛出
+        """
+        if cursor.source == "local":
+            return fetch_page_local(query, page_size, cursor, self.categories)
+        return fetch_page(query, page_size=page_size, cursor=cursor)
+
+    def record_fallback(self) -> None:
+        """记录一次逐领域搜索（调用方自行搜索时使用）"""
+        with self._lock:
+            self._stats["fallbacks"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取统计
+
+        Returns:
+            dict: {"harvests": 成功收割次数, "harvest_errors": 收割失败次数,
+                   "local_hits": 本地回答的领域查询数, "fallbacks": 逐领域搜索的查询数}
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+# 全局领域论文来源（所有 Streamlit 会话共享）
+HARVEST_FEED = HarvestFeed()
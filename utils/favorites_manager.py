@@ -1,6 +1,7 @@
 """
 收藏夹管理模块
-支持按领域分类收藏论文，JSON 持久化存储
+支持按领域分类收藏论文，JSON 持久化存储；
+论文按不带版本号的基础编号识别，同一篇论文的不同版本视为同一条收藏
 """
 
 import json
@@ -9,6 +10,8 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from utils.paper_id import base_id
+
 
 # 收藏数据文件路径
 FAVORITES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "favorites.json")
@@ -26,6 +29,8 @@ class FavoritePaper:
     category: str           # 收藏分类（领域）
     favorited_at: str       # 收藏时间
     code_urls: List[str]    # 代码链接（如有）
+    journal_ref: str = ""   # 期刊 / 会议出处（如有）
+    updated_at: str = ""    # 元数据最近一次从 ArXiv 刷新的时间
     
     def to_dict(self) -> dict:
         return asdict(self)
@@ -101,10 +106,10 @@ def add_favorite(
     """
     favorites = load_favorites()
     
-    # 检查是否已收藏
+    # 检查是否已收藏（任意版本）
     if category in favorites:
         for paper in favorites[category]:
-            if paper.get("arxiv_id") == arxiv_id:
+            if base_id(paper.get("arxiv_id", "")) == base_id(arxiv_id):
                 return False, "该论文已在收藏夹中"
     
     # 创建收藏记录
@@ -139,9 +144,9 @@ def remove_favorite(arxiv_id: str, category: str) -> tuple[bool, str]:
     if category not in favorites:
         return False, "分类不存在"
     
-    # 查找并删除
+    # 查找并删除（按基础编号匹配，不区分版本）
     for i, paper in enumerate(favorites[category]):
-        if paper.get("arxiv_id") == arxiv_id:
+        if base_id(paper.get("arxiv_id", "")) == base_id(arxiv_id):
             favorites[category].pop(i)
             # 如果分类空了，删除分类
             if not favorites[category]:
@@ -155,16 +160,17 @@ def remove_favorite(arxiv_id: str, category: str) -> tuple[bool, str]:
 
 def is_favorited(arxiv_id: str) -> tuple[bool, Optional[str]]:
     """
-    检查论文是否已收藏
+    检查论文是否已收藏（收藏的是该论文的任意版本都算）
     
     Returns:
         tuple: (是否已收藏, 所在分类)
     """
     favorites = load_favorites()
+    target = base_id(arxiv_id)
     
     for category, papers in favorites.items():
         for paper in papers:
-            if paper.get("arxiv_id") == arxiv_id:
+            if base_id(paper.get("arxiv_id", "")) == target:
                 return True, category
     
     return False, None
@@ -210,3 +216,50 @@ def delete_category(category: str) -> tuple[bool, str]:
     if save_favorites(favorites):
         return True, f"已删除分类: {category}"
     return False, "保存失败"
+
+
+def refresh_favorites_metadata() -> tuple[bool, int, int]:
+    """
+    从 ArXiv 批量刷新所有收藏论文的元数据（新版本号、标题、摘要、期刊出处等）
+    
+    所有收藏的 ID 通过 id_list 批量查询（每 100 个 ID 一次请求），
+    全部更新完成后只写一次 favorites.json。
+    
+    Returns:
+        tuple: (是否保存成功, 有变化的论文数, 收藏论文总数)
+    
+    Raises:
+        ArxivFetchError: 当网络连接失败或超时时抛出
+    """
+    from utils.arxiv_fetcher import fetch_papers_by_ids
+    
+    favorites = load_favorites()
+    records = [paper for papers in favorites.values() for paper in papers]
+    if not records:
+        return True, 0, 0
+    
+    latest = fetch_papers_by_ids([paper.get("arxiv_id", "") for paper in records])
+    now = datetime.now().strftime("%Y-%m-%d %H:%M")
+    
+    changed = 0
+    for record in records:
+        paper = latest.get(base_id(record.get("arxiv_id", "")))
+        if paper is None:
+            continue
+        
+        # 发布日期、收藏分类和收藏时间保持不变
+        fields = {
+            "arxiv_id": paper.arxiv_id,
+            "title": paper.title,
+            "authors": list(paper.authors),
+            "abstract": paper.abstract,
+            "url": paper.url,
+            "code_urls": list(paper.code_urls),
+            "journal_ref": paper.journal_ref,
+        }
+        if any(record.get(key) != value for key, value in fields.items()):
+            changed += 1
+        record.update(fields)
+        record["updated_at"] = now
+    
+    return save_favorites(favorites), changed, len(records)
@@ -0,0 +1,215 @@
+"""
+领域论文流缓存模块
+在领域论文来源（批量收割结果 / fetch_papers）前加一层 stale-while-revalidate 缓存：
+未超过软过期时间直接返回；超过软过期时间仍先返回旧结果，同时在后台刷新；
+超过硬过期时间才阻塞等待重新拉取。过期时间可以按领域单独配置
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.arxiv_fetcher import Paper
+from utils.bulk_harvester import HARVEST_FEED
+
+
+# 默认软过期 / 硬过期时间（秒）
+DEFAULT_SOFT_TTL = 15 * 60
+DEFAULT_HARD_TTL = 6 * 60 * 60
+
+# 按领域配置过期时间的文件（与 app.py 同级目录，可选）
+# 格式: {"LLM": {"soft": 300, "hard": 3600}, ...}
+FEED_TTL_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "feed_ttl.json")
+
+
+def load_ttl_config() -> Dict[str, Tuple[float, float]]:
+    """
+    从 feed_ttl.json 加载按领域配置的过期时间
+    文件不存在或格式错误时返回空字典
+    """
+    try:
+        if os.path.exists(FEED_TTL_FILE):
+            with open(FEED_TTL_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {
+                _normalize(topic): (
+                    float(ttl.get("soft", DEFAULT_SOFT_TTL)),
+                    float(ttl.get("hard", DEFAULT_HARD_TTL))
+                )
+                for topic, ttl in data.items()
+            }
+        return {}
+    except (json.JSONDecodeError, IOError, AttributeError, ValueError) as e:
+        print(f"加载缓存过期配置失败: {e}")
+        return {}
+
+
+def _normalize(query: str) -> str:
+    """缓存键中的领域名（忽略大小写和多余空格，与论文库一致）"""
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class CacheEntry:
+    """一个领域的缓存结果"""
+    papers: List[Paper]
+    fetched_at: float
+    source: str = "arxiv"          # 结果来源（见 PageCursor.source）
+    refreshing: bool = False
+
+
+class FeedCache:
+    """
+    stale-while-revalidate 领域论文缓存（进程内，所有会话共享）
+
+    缓存键为 (领域, 论文数量)；请求数量更少时也可以直接使用数量更多的缓存结果的前若干篇。
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[Callable[[str, int], Tuple[List[Paper], str]]] = None,
+        soft_ttl: float = DEFAULT_SOFT_TTL,
+        hard_ttl: float = DEFAULT_HARD_TTL,
+        topic_ttls: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        """
+        Args:
+            fetcher: 实际拉取函数 (query, max_results) -> (论文列表, 结果来源)，
+                     默认先在批量收割结果中匹配，匹配不足时增量拉取
+            soft_ttl: 默认软过期秒数（超过后后台刷新）
+            hard_ttl: 默认硬过期秒数（超过后阻塞拉取）
+            topic_ttls: 按领域覆盖的 (soft_ttl, hard_ttl)，默认读取 feed_ttl.json
+        """
+        self.fetcher = fetcher or HARVEST_FEED.fetch
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.topic_ttls = load_ttl_config() if topic_ttls is None else {
+            _normalize(topic): ttl for topic, ttl in topic_ttls.items()
+        }
+        self._entries: Dict[Tuple[str, int], CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def set_ttl(self, query: str, soft_ttl: float, hard_ttl: float) -> None:
+        """为指定领域设置过期时间"""
+        with self._lock:
+            self.topic_ttls[_normalize(query)] = (soft_ttl, hard_ttl)
+
+    def get_ttl(self, query: str) -> Tuple[float, float]:
+        """获取指定领域的 (soft_ttl, hard_ttl)"""
+        return self.topic_ttls.get(_normalize(query), (self.soft_ttl, self.hard_ttl))
+
+    def _find(self, topic: str, max_results: int) -> Optional[Tuple[Tuple[str, int], CacheEntry]]:
+        """查找能满足请求数量的缓存项（优先数量相同的，其次数量最接近的更大结果）"""
+        candidates = [
+            (key, entry) for key, entry in self._entries.items()
+            if key[0] == topic and key[1] >= max_results
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda item: item[0][1])
+
+    def _refresh(self, query: str, key: Tuple[str, int]) -> None:
+        """后台刷新一个缓存项，失败时保留旧结果（任何异常都会清除刷新标记，之后仍可再次刷新）"""
+        try:
+            papers, source = self.fetcher(query, key[1])
+        except Exception as e:
+            print(f"后台刷新 '{query}' 失败: {e}")
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+                if key in self._entries:
+                    self._entries[key].refreshing = False
+            return
+
+        with self._lock:
+            self._entries[key] = CacheEntry(papers, time.time(), source)
+            self._stats["refreshes"] += 1
+
+    def get_cached(self, query: str, max_results: int) -> Optional[Tuple[List[Paper], float, str]]:
+        """
+        非阻塞地读取缓存
+
+        结果超过软过期时间时会在后台启动一次刷新（同一缓存项同时只刷新一次）。
+
+        Args:
+            query: 领域关键词
+            max_results: 需要的论文数量
+
+        Returns:
+            Optional[Tuple[List[Paper], float, str]]: (论文列表, 缓存年龄秒数, 结果来源)；
+            没有缓存或已超过硬过期时间时返回 None（计为一次未命中）
+        """
+        soft_ttl, hard_ttl = self.get_ttl(query)
+        with self._lock:
+            found = self._find(_normalize(query), max_results)
+            now = time.time()
+            if found is None or now - found[1].fetched_at >= hard_ttl:
+                self._stats["misses"] += 1
+                return None
+
+            key, entry = found
+            age = now - entry.fetched_at
+            if age < soft_ttl:
+                self._stats["hits"] += 1
+            else:
+                self._stats["stale_hits"] += 1
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    threading.Thread(target=self._refresh, args=(query, key), daemon=True).start()
+
+        return entry.papers[:max_results], age, entry.source
+
+    def put(self, query: str, max_results: int, papers: List[Paper], source: str = "arxiv") -> None:
+        """写入（或替换）一个缓存项，source 为结果来源（"local" / "arxiv"）"""
+        with self._lock:
+            self._entries[(_normalize(query), max_results)] = CacheEntry(list(papers), time.time(), source)
+
+    def get(self, query: str, max_results: int = 5) -> List[Paper]:
+        """
+        读取领域论文：命中则立即返回（必要时后台刷新），未命中或硬过期时阻塞拉取
+
+        Args:
+            query: 领域关键词
+            max_results: 需要的论文数量
+
+        Returns:
+            List[Paper]: 论文列表
+
+        Raises:
+            ArxivFetchError: 阻塞拉取失败时抛出
+        """
+        cached = self.get_cached(query, max_results)
+        if cached is not None:
+            return cached[0]
+
+        papers, source = self.fetcher(query, max_results)
+        self.put(query, max_results, papers, source)
+        return papers
+
+    def invalidate(self, query: Optional[str] = None) -> None:
+        """清除指定领域（为 None 时清除全部）的缓存"""
+        with self._lock:
+            if query is None:
+                self._entries.clear()
+            else:
+                topic = _normalize(query)
+                self._entries = {k: v for k, v in self._entries.items() if k[0] != topic}
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            dict: {"hits": 新鲜命中数, "stale_hits": 过期命中数（已触发后台刷新）,
+                   "misses": 未命中数, "refreshes": 后台刷新成功数,
+                   "refresh_errors": 后台刷新失败数, "entries": 缓存项数量}
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+# 全局领域论文缓存（所有 Streamlit 会话共享）
+FEED_CACHE = FeedCache()
@@ -6,8 +6,35 @@ Hyperparam Spy - 参数显微镜模块
 import fitz  # PyMuPDF
 import os
 import re
-from typing import Optional, Dict, List
-from utils.pdf_image_extractor import download_pdf, get_pdf_url_from_arxiv
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from utils import llm_metrics, pdf_text_cache
+from utils.llm_router import LLM_ROUTER, Provider, cancel_scope
+from utils.llm_scheduler import LLM_SCHEDULER, PRIORITY_INTERACTIVE, RequestCancelled
+from utils.paper_id import PaperId, content_hash
+from utils.prompt_preflight import PreflightResult, input_budget, preflight
+from utils.pdf_image_extractor import CACHE_DIR, download_pdf, get_pdf_url_from_arxiv
+
+
+# 超参数卡片缓存目录：按实验章节文本的内容指纹保存，
+# 论文新版本的实验章节没有变化时直接复用，不再调用 LLM
+HYPERPARAM_CACHE_DIR = os.path.join(CACHE_DIR, "hyperparams")
+
+# 超参数卡片的最大输出 token 数
+HYPERPARAM_MAX_TOKENS = 1000
+
+# 发送给 LLM 的实验章节最多保留的 token 数（还受模型上下文窗口限制，见 prompt_preflight.input_budget）
+HYPERPARAM_INPUT_TOKENS = 2000
+
+# 超参数请求的用户消息前缀
+_HYPERPARAM_REQUEST = "请从以下论文文本中提取实验配置：\n\n"
+
+
+class HyperparamExtractError(Exception):
+    """超参数卡片生成失败（partial 为失败前已生成的部分，没有时为空字符串）"""
+    
+    def __init__(self, message: str, partial: str = ""):
+        super().__init__(message)
+        self.partial = partial
 
 
 # 用于 LLM 提取超参数的系统提示词（多语言）
@@ -144,17 +171,30 @@ If some parameters are not mentioned, mark as "Not mentioned". If no experimenta
 }
 
 
-def extract_pdf_text(pdf_path: str, max_pages: int = 15) -> str:
+def extract_pdf_text(pdf_path: str, max_pages: int = 15, arxiv_id: str = "") -> str:
     """
     从 PDF 中提取文本内容
     
+    逐页文本按 PDF 内容指纹写入 pdf_text_cache，同一份 PDF 在任何会话和进程中只解析一次；
+    缓存读写失败时照常解析 PDF。
+    
     Args:
         pdf_path: PDF 文件路径
         max_pages: 最多提取的页数
+        arxiv_id: 论文 ID（仅记录在缓存中便于排查）
     
     Returns:
         str: 提取的文本内容
     """
+    cache_key = _pdf_cache_key(pdf_path)
+    if cache_key is not None:
+        try:
+            cached = pdf_text_cache.get_pages(cache_key, max_pages)
+            if cached is not None:
+                return "\n".join(cached)
+        except Exception as e:
+            print(f"读取 PDF 文本缓存失败: {e}")
+    
     try:
         doc = fitz.open(pdf_path)
         text_parts = []
@@ -163,11 +203,27 @@ def extract_pdf_text(pdf_path: str, max_pages: int = 15) -> str:
             page = doc[page_num]
             text_parts.append(page.get_text())
         
+        page_count = len(doc)
         doc.close()
-        return "\n".join(text_parts)
     except Exception as e:
         print(f"提取 PDF 文本失败: {e}")
         return ""
+    
+    if cache_key is not None:
+        try:
+            pdf_text_cache.put_pages(cache_key, arxiv_id, text_parts, page_count)
+        except Exception as e:
+            print(f"写入 PDF 文本缓存失败: {e}")
+    return "\n".join(text_parts)
+
+
+def _pdf_cache_key(pdf_path: str) -> Optional[str]:
+    """计算 PDF 文本缓存键，失败时返回 None（不使用缓存）"""
+    try:
+        return pdf_text_cache.pdf_digest(pdf_path)
+    except Exception as e:
+        print(f"计算 PDF 指纹失败: {e}")
+        return None
 
 
 def extract_experiment_sections(full_text: str) -> str:
@@ -178,7 +234,7 @@ def extract_experiment_sections(full_text: str) -> str:
         full_text: PDF 全文
     
     Returns:
-        str: 实验相关文本（最多 8000 字符）
+        str: 实验相关文本（各章节之间以空行分隔，长度由 prompt_preflight 按 token 预算截断）
     """
     # 关键词模式，用于定位实验章节
     section_patterns = [
@@ -202,6 +258,9 @@ def extract_experiment_sections(full_text: str) -> str:
         is_section_header = any(re.search(pattern, line) for pattern in section_patterns)
         
         if is_section_header:
+            # 新章节与前面保留的内容之间空一行，便于按章节边界截断
+            if relevant_lines and relevant_lines[-1]:
+                relevant_lines.append("")
             in_relevant_section = True
             section_line_count = 0
         
@@ -221,8 +280,7 @@ def extract_experiment_sections(full_text: str) -> str:
         mid_end = 2 * len(full_text) // 3
         result = full_text[mid_start:mid_end]
     
-    # 限制长度
-    return result[:8000]
+    return result
 
 
 def get_hyperparam_prompt(lang: str = "zh-CN") -> str:
@@ -230,13 +288,109 @@ def get_hyperparam_prompt(lang: str = "zh-CN") -> str:
     return HYPERPARAM_PROMPTS.get(lang, HYPERPARAM_PROMPTS["en"])
 
 
+def _prepare_hyperparam_request(
+    arxiv_url: str,
+    arxiv_id: str
+) -> Optional[str]:
+    """
+    下载 PDF 并提取实验章节（流式与非流式提取共用）
+    
+    实验章节与逐页文本一起保存在 pdf_text_cache 中，已解析过的 PDF 不再读取页面；
+    缓存不可用时照常解析。
+    
+    Returns:
+        Optional[str]: 实验章节文本，PDF 下载或文本提取失败返回 None
+    """
+    # 下载 PDF
+    pdf_url = get_pdf_url_from_arxiv(arxiv_url)
+    pdf_path = download_pdf(pdf_url, arxiv_id)
+    
+    if not pdf_path:
+        return None
+    
+    cache_key = _pdf_cache_key(pdf_path)
+    if cache_key is not None:
+        try:
+            cached = pdf_text_cache.get_sections(cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"读取 PDF 文本缓存失败: {e}")
+    
+    # 提取文本
+    full_text = extract_pdf_text(pdf_path, arxiv_id=arxiv_id)
+    if not full_text:
+        return None
+    
+    # 提取实验章节
+    sections = extract_experiment_sections(full_text)
+    if cache_key is not None:
+        try:
+            pdf_text_cache.put_sections(cache_key, sections)
+        except Exception as e:
+            print(f"写入 PDF 文本缓存失败: {e}")
+    return sections
+
+
+def _hyperparam_messages(experiment_text: str, lang: str, model: str) -> Tuple[List[dict], PreflightResult]:
+    """
+    构造超参数提取请求的消息列表
+    
+    实验章节先经过输入预检：去掉页眉页脚、合并空白，再按模型的 token 预算在章节 / 行 / 句子边界截断
+    （不会把表格切成半行）。
+    
+    Returns:
+        Tuple[List[dict], PreflightResult]: (消息列表, 预检结果)
+    """
+    system_prompt = get_hyperparam_prompt(lang)
+    budget = input_budget(model, system_prompt + _HYPERPARAM_REQUEST, HYPERPARAM_MAX_TOKENS, cap=HYPERPARAM_INPUT_TOKENS)
+    checked = preflight(experiment_text, model, budget, kind="paper")
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": _HYPERPARAM_REQUEST + checked.text}
+    ], checked
+
+
+def _card_cache_path(arxiv_id: str, experiment_text: str, lang: str, model: str) -> str:
+    """
+    超参数卡片的缓存路径
+    
+    同一篇论文（任意版本）的实验章节、提示词和模型都相同时复用已生成的结果
+    """
+    cache_key = content_hash(experiment_text, get_hyperparam_prompt(lang), model)
+    return os.path.join(
+        HYPERPARAM_CACHE_DIR, f"{PaperId.parse(arxiv_id).base.replace('/', '_')}_{cache_key}.md"
+    )
+
+
+def _read_card(cache_path: str) -> Optional[str]:
+    """读取已缓存的超参数卡片，不存在返回 None"""
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+    return None
+
+
+def _write_card(cache_path: str, card: str) -> None:
+    """保存超参数卡片"""
+    os.makedirs(HYPERPARAM_CACHE_DIR, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        f.write(card)
+
+
+def _partial_card_path(cache_path: str) -> str:
+    """中途被打断的卡片的保存路径（不作为缓存命中，只在生成失败时展示）"""
+    return cache_path[:-3] + ".partial.md"
+
+
 def extract_hyperparams_from_pdf(
     arxiv_url: str,
     arxiv_id: str,
     api_key: str,
     base_url: str,
     model: str,
-    lang: str = "zh-CN"
+    lang: str = "zh-CN",
+    priority: int = PRIORITY_INTERACTIVE
 ) -> Optional[str]:
     """
     从论文 PDF 中提取超参数信息
@@ -248,51 +402,199 @@ def extract_hyperparams_from_pdf(
         base_url: LLM API Base URL
         model: 模型名称
         lang: 语言代码
+        priority: 请求在 LLM 调度器中的优先级（见 llm_scheduler.PRIORITY_*）
     
     Returns:
         Optional[str]: LLM 生成的超参数卡片，失败返回 None
     """
-    from openai import OpenAI
+    from utils.llm_client_pool import get_client
     
-    # 下载 PDF
-    pdf_url = get_pdf_url_from_arxiv(arxiv_url)
-    pdf_path = download_pdf(pdf_url, arxiv_id)
-    
-    if not pdf_path:
-        return None
-    
-    # 提取文本
-    full_text = extract_pdf_text(pdf_path)
-    if not full_text:
+    experiment_text = _prepare_hyperparam_request(arxiv_url, arxiv_id)
+    if experiment_text is None:
         return None
+    model = model.strip() if model else "gpt-3.5-turbo"
+    cache_path = _card_cache_path(arxiv_id, experiment_text, lang, model)
     
-    # 提取实验章节
-    experiment_text = extract_experiment_sections(full_text)
+    cached = _read_card(cache_path)
+    if cached is not None:
+        llm_metrics.record_cache_hit("hyperparams", model, base_url)
+        return cached
     
     try:
         # 调用 LLM 提取超参数
-        client = OpenAI(
-            api_key=api_key.strip(),
-            base_url=base_url.strip() if base_url else "https://api.openai.com/v1",
-            timeout=90.0
-        )
+        client = get_client(api_key, base_url, timeout=90.0)
         
-        system_prompt = get_hyperparam_prompt(lang)
-        
-        response = client.chat.completions.create(
-            model=model.strip() if model else "gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"请从以下论文文本中提取实验配置：\n\n{experiment_text}"}
-            ],
-            temperature=0.3,  # 低创造性，追求准确
-            max_tokens=1000
-        )
+        messages, checked = _hyperparam_messages(experiment_text, lang, model)
+        with llm_metrics.track_call("hyperparams", model, base_url) as call:
+            call.saved_tokens = checked.saved_tokens
+            response = LLM_SCHEDULER.run(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.3,  # 低创造性，追求准确
+                    max_tokens=HYPERPARAM_MAX_TOKENS
+                ),
+                base_url, messages, max_tokens=HYPERPARAM_MAX_TOKENS, priority=priority
+            )
+            call.set_usage(response.usage)
         
         if response.choices and len(response.choices) > 0:
-            return response.choices[0].message.content
+            result = response.choices[0].message.content
+            if result:
+                _write_card(cache_path, result)
+            return result
         return None
     
     except Exception as e:
         print(f"提取超参数失败: {e}")
         return None
+
+
+def stream_hyperparams_from_pdf(
+    arxiv_url: str,
+    arxiv_id: str,
+    api_key: str,
+    base_url: str,
+    model: str,
+    lang: str = "zh-CN",
+    priority: int = PRIORITY_INTERACTIVE,
+    backups: Sequence[Provider] = ()
+) -> Iterator[str]:
+    """
+    extract_hyperparams_from_pdf 的流式版本：逐段产出超参数卡片（参数同上）
+    
+    已缓存的卡片一次性产出；PDF 下载或解析失败时不产出任何内容。
+    完整结果写入卡片缓存；中途被打断时已生成的部分另存为 .partial.md，不会被当作缓存命中，
+    LLM 调用失败时随异常一起返回，供界面展示并提示重试。
+    提供 backups 时 LLM 请求经 LLM_ROUTER 在主服务商和备用服务商之间对冲 / 切换
+    （PDF 只下载和解析一次）。
+    
+    Args:
+        backups: 备用服务商（按优先顺序，没有 API Key 的会被忽略）
+    
+    Yields:
+        str: 新生成的文本片段
+    
+    Raises:
+        HyperparamExtractError: LLM 调用失败（包括已产出部分内容后失败）时抛出，
+                                partial 为本次已生成的部分，没有时为上次中断时保存的部分
+    """
+    experiment_text = _prepare_hyperparam_request(arxiv_url, arxiv_id)
+    if experiment_text is None:
+        return
+    model = model.strip() if model else "gpt-3.5-turbo"
+    
+    cache_path = _card_cache_path(arxiv_id, experiment_text, lang, model)
+    cached = _read_card(cache_path)
+    if cached is not None:
+        llm_metrics.record_cache_hit("hyperparams_stream", model, base_url)
+        yield cached
+        return
+    
+    def open_stream(provider: Provider) -> Iterator[str]:
+        provider_model = provider.model.strip() if provider.model else "gpt-3.5-turbo"
+        return _stream_card(
+            experiment_text, lang, _card_cache_path(arxiv_id, experiment_text, lang, provider_model),
+            provider.api_key, provider.base_url, provider_model, priority
+        )
+    
+    providers = [Provider(base_url, api_key, model)] + [
+        provider for provider in backups if provider.api_key and provider.api_key.strip()
+    ]
+    chunks = LLM_ROUTER.stream(open_stream, providers) if len(providers) > 1 else open_stream(providers[0])
+    parts: List[str] = []
+    try:
+        for delta in chunks:
+            parts.append(delta)
+            yield delta
+    except Exception as e:
+        raise HyperparamExtractError(
+            f"提取超参数失败: {e}", "".join(parts) or _read_card(_partial_card_path(cache_path)) or ""
+        ) from e
+    finally:
+        chunks.close()
+
+
+def _stream_card(
+    experiment_text: str,
+    lang: str,
+    cache_path: str,
+    api_key: str,
+    base_url: str,
+    model: str,
+    priority: int
+) -> Iterator[str]:
+    """
+    向一个服务商流式请求超参数卡片（失败时抛出异常）
+    
+    备用服务商的卡片已缓存时直接产出；完整结果写入 cache_path，被打断时另存为 .partial.md
+    （在对冲中落败的请求不保存）。
+    """
+    from utils.llm_client_pool import abort_stream, get_client
+    
+    cached = _read_card(cache_path)
+    if cached is not None:
+        llm_metrics.record_cache_hit("hyperparams_stream", model, base_url)
+        yield cached
+        return
+    
+    parts: List[str] = []
+    complete = False
+    stream = None
+    lost = None
+    try:
+        client = get_client(api_key, base_url, timeout=90.0)
+        messages, checked = _hyperparam_messages(experiment_text, lang, model)
+        with llm_metrics.track_call("hyperparams_stream", model, base_url) as call:
+            call.saved_tokens = checked.saved_tokens
+            # 经 LLM_ROUTER 路由时，另一服务商胜出后立即取消：还在调度器中排队的请求直接退出队列，
+            # 已发出的请求断开连接（不必等到首个片段）
+            settle = None
+            try:
+                with cancel_scope(lambda: abort_stream(stream)) as lost:
+                    stream, settle = LLM_SCHEDULER.run_stream(
+                        lambda: client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            temperature=0.3,
+                            max_tokens=HYPERPARAM_MAX_TOKENS,
+                            stream=True,
+                            stream_options={"include_usage": True}  # 流结束时返回 usage
+                        ),
+                        base_url, messages, max_tokens=HYPERPARAM_MAX_TOKENS, priority=priority,
+                        cancelled=lost
+                    )
+                    if lost.is_set():
+                        # 等待响应头期间落败（中断函数被调用时还没有可断开的连接）
+                        raise RequestCancelled("请求在等待响应时被取消")
+                    for chunk in stream:
+                        call.set_usage(getattr(chunk, "usage", None))
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            call.first_token()
+                            parts.append(delta)
+                            yield delta
+            except Exception:
+                # 落败被断开连接时记为 interrupted，而不是调用错误
+                if lost is not None and lost.is_set():
+                    call.error = "interrupted"
+                raise
+            finally:
+                if settle is not None:
+                    # 流式接口没有返回 usage 时按文本估算
+                    if not call.prompt_tokens:
+                        call.estimate_usage("\n".join(m["content"] for m in messages), "".join(parts))
+                    # 流关闭时用最终用量（或估算值）修正调度器中按 max_tokens 预留的 TPM
+                    settle(call.prompt_tokens + call.completion_tokens)
+        complete = True
+    
+    finally:
+        # 提前停止读取时关闭响应，释放连接（服务端随之停止生成）
+        if stream is not None:
+            stream.close()
+        if parts and not (lost is not None and lost.is_set()):
+            _write_card(cache_path if complete else _partial_card_path(cache_path), "".join(parts))
+            if complete and os.path.exists(_partial_card_path(cache_path)):
+                os.remove(_partial_card_path(cache_path))
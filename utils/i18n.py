@@ -223,6 +223,13 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "ja": "✅ 最新論文 {count} 件を取得しました",
         "ko": "✅ 최신 논문 {count}편을 찾았습니다"
     },
+    "feed_cached": {
+        "en": "🕒 Showing results cached {minutes} min ago (refreshed in the background when stale)",
+        "zh-CN": "🕒 显示 {minutes} 分钟前的缓存结果（过期时会在后台刷新）",
+        "zh-TW": "🕒 顯示 {minutes} 分鐘前的快取結果（過期時會在背景更新）",
+        "ja": "🕒 {minutes} 分前のキャッシュを表示中（期限切れの場合はバックグラウンドで更新）",
+        "ko": "🕒 {minutes}분 전 캐시 결과 표시 중 (만료 시 백그라운드에서 갱신)"
+    },
     "authors_et_al": {
         "zh-CN": "等 {count} 人",
         "zh-TW": "等 {count} 人",
@@ -273,6 +280,209 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "ja": "処理中: {title}...",
         "ko": "처리 중: {title}..."
     },
+    "summary_progress": {
+        "en": "Done {done}/{total}: {title}...",
+        "zh-CN": "已完成 {done}/{total}: {title}...",
+        "zh-TW": "已完成 {done}/{total}: {title}...",
+        "ja": "完了 {done}/{total}: {title}...",
+        "ko": "완료 {done}/{total}: {title}..."
+    },
+    "admin_panel": {
+        "en": "📊 Usage & Status",
+        "zh-CN": "📊 用量与运行状态",
+        "zh-TW": "📊 用量與運行狀態",
+        "ja": "📊 使用量とステータス",
+        "ko": "📊 사용량 및 상태"
+    },
+    "show_admin_stats": {
+        "en": "Load statistics",
+        "zh-CN": "加载统计",
+        "zh-TW": "載入統計",
+        "ja": "統計を読み込む",
+        "ko": "통계 불러오기"
+    },
+    "metrics_by_day": {
+        "en": "**LLM calls by day (last 7 days)**",
+        "zh-CN": "**LLM 调用（最近 7 天，按天）**",
+        "zh-TW": "**LLM 調用（最近 7 天，按天）**",
+        "ja": "**LLM 呼び出し（直近 7 日・日別）**",
+        "ko": "**LLM 호출 (최근 7일, 일별)**"
+    },
+    "metrics_by_model": {
+        "en": "**LLM calls by model**",
+        "zh-CN": "**LLM 调用（按模型）**",
+        "zh-TW": "**LLM 調用（按模型）**",
+        "ja": "**LLM 呼び出し（モデル別）**",
+        "ko": "**LLM 호출 (모델별)**"
+    },
+    "no_llm_calls": {
+        "en": "No LLM calls in the last 7 days",
+        "zh-CN": "最近 7 天没有 LLM 调用",
+        "zh-TW": "最近 7 天沒有 LLM 調用",
+        "ja": "直近 7 日間の LLM 呼び出しはありません",
+        "ko": "최근 7일간 LLM 호출이 없습니다"
+    },
+    "runtime_stats": {
+        "en": "**Connections & caches**",
+        "zh-CN": "**连接与缓存**",
+        "zh-TW": "**連接與緩存**",
+        "ja": "**接続とキャッシュ**",
+        "ko": "**연결 및 캐시**"
+    },
+    "presummarize": {
+        "en": "⚡ Pre-summarize in background",
+        "zh-CN": "⚡ 后台预生成摘要",
+        "zh-TW": "⚡ 背景預生成摘要",
+        "ja": "⚡ バックグラウンドで要約を事前生成",
+        "ko": "⚡ 백그라운드에서 요약 미리 생성"
+    },
+    "presummarize_help": {
+        "en": "Summarize newly fetched papers at low priority so summaries are ready when you open them",
+        "zh-CN": "拉取论文后以低优先级提前生成摘要，展开论文时摘要通常已经就绪",
+        "zh-TW": "拉取論文後以低優先級提前生成摘要，展開論文時摘要通常已經就緒",
+        "ja": "取得した論文を低優先度で事前に要約し、開いたときにすぐ表示できるようにします",
+        "ko": "가져온 논문을 낮은 우선순위로 미리 요약하여 열 때 바로 볼 수 있게 합니다"
+    },
+    "presummarize_budget": {
+        "en": "Pre-summaries left today: {remaining}/{budget}",
+        "zh-CN": "今日剩余预摘要：{remaining}/{budget} 篇",
+        "zh-TW": "今日剩餘預摘要：{remaining}/{budget} 篇",
+        "ja": "本日の残り事前要約：{remaining}/{budget} 本",
+        "ko": "오늘 남은 사전 요약: {remaining}/{budget} 편"
+    },
+    "offline_summary_note": {
+        "en": "⚡ Offline extractive summary (key sentences from the abstract, no LLM used)",
+        "zh-CN": "⚡ 离线抽取式摘要（摘录原文关键句，未调用 LLM）",
+        "zh-TW": "⚡ 離線抽取式摘要（摘錄原文關鍵句，未呼叫 LLM）",
+        "ja": "⚡ オフライン抽出型要約（原文の重要文を抜粋、LLM 未使用）",
+        "ko": "⚡ 오프라인 추출 요약 (원문 핵심 문장 발췌, LLM 미사용)"
+    },
+    "llm_fallback_error": {
+        "en": "⚠️ LLM unavailable ({error}). Showing an offline summary instead; click the button to try the LLM again.",
+        "zh-CN": "⚠️ LLM 暂不可用（{error}），先显示离线摘要，可点击按钮重新尝试 LLM",
+        "zh-TW": "⚠️ LLM 暫不可用（{error}），先顯示離線摘要，可點擊按鈕重新嘗試 LLM",
+        "ja": "⚠️ LLM を利用できません（{error}）。オフライン要約を表示しています。ボタンで LLM を再試行できます",
+        "ko": "⚠️ LLM을 사용할 수 없습니다 ({error}). 오프라인 요약을 표시합니다. 버튼을 눌러 LLM을 다시 시도할 수 있습니다"
+    },
+    "summary_partial": {
+        "en": "⚠️ The last generation was interrupted. Below is the part generated so far; click the button to regenerate.",
+        "zh-CN": "⚠️ 上次生成中途被打断，以下为已生成的部分，可点击按钮重新生成",
+        "zh-TW": "⚠️ 上次生成中途被打斷，以下為已生成的部分，可點擊按鈕重新生成",
+        "ja": "⚠️ 前回の生成は途中で中断されました。以下は生成済みの部分です。ボタンで再生成できます",
+        "ko": "⚠️ 지난 생성이 중간에 중단되었습니다. 아래는 생성된 부분이며, 버튼을 눌러 다시 생성할 수 있습니다"
+    },
+    "retry_summary": {
+        "en": "🔄 Regenerate AI Summary",
+        "zh-CN": "🔄 重新生成 AI 摘要",
+        "zh-TW": "🔄 重新生成 AI 摘要",
+        "ja": "🔄 AI要約を再生成",
+        "ko": "🔄 AI 요약 다시 생성"
+    },
+    "hyperparam_partial": {
+        "en": "⚠️ Hyperparameter extraction did not finish ({error}). Showing the part generated so far; click the button to try again.",
+        "zh-CN": "⚠️ 超参数提取未完成（{error}），以下为已生成的部分，可点击按钮重试",
+        "zh-TW": "⚠️ 超參數提取未完成（{error}），以下為已生成的部分，可點擊按鈕重試",
+        "ja": "⚠️ ハイパーパラメータ抽出が完了しませんでした（{error}）。生成済みの部分を表示しています。ボタンで再試行できます",
+        "ko": "⚠️ 하이퍼파라미터 추출이 완료되지 않았습니다 ({error}). 생성된 부분을 표시합니다. 버튼을 눌러 다시 시도할 수 있습니다"
+    },
+    "offline_key_points": {
+        "en": "Key points",
+        "zh-CN": "要点",
+        "zh-TW": "要點",
+        "ja": "要点",
+        "ko": "핵심 내용"
+    },
+    "offline_method": {
+        "en": "Method:",
+        "zh-CN": "方法：",
+        "zh-TW": "方法：",
+        "ja": "手法：",
+        "ko": "방법:"
+    },
+    "offline_results": {
+        "en": "Results:",
+        "zh-CN": "结果：",
+        "zh-TW": "結果：",
+        "ja": "結果：",
+        "ko": "결과:"
+    },
+    "backup_provider": {
+        "en": "🛟 Backup provider",
+        "zh-CN": "🛟 备用服务商",
+        "zh-TW": "🛟 備用服務商",
+        "ja": "🛟 予備プロバイダー",
+        "ko": "🛟 백업 제공자"
+    },
+    "backup_provider_help": {
+        "en": "When the main provider is slow, a hedged request is sent to the backup and the faster answer is used; it also takes over when the main provider fails",
+        "zh-CN": "主服务商响应过慢时同时向备用服务商发出请求并采用先返回的结果，主服务商失败时也会自动切换",
+        "zh-TW": "主服務商回應過慢時同時向備用服務商發出請求並採用先返回的結果，主服務商失敗時也會自動切換",
+        "ja": "メインのプロバイダーが遅い場合は予備にも並行してリクエストし、先に返った結果を使います。失敗時にも自動で切り替えます",
+        "ko": "기본 제공자가 느리면 백업에도 동시에 요청해 먼저 도착한 결과를 사용하며, 실패 시에도 자동으로 전환합니다"
+    },
+    "backup_none": {
+        "en": "None",
+        "zh-CN": "不使用",
+        "zh-TW": "不使用",
+        "ja": "使用しない",
+        "ko": "사용 안 함"
+    },
+    "backup_api_key": {
+        "en": "Backup API Key",
+        "zh-CN": "备用 API Key",
+        "zh-TW": "備用 API Key",
+        "ja": "予備 API Key",
+        "ko": "백업 API Key"
+    },
+    "summary_mode": {
+        "en": "Summary language mode",
+        "zh-CN": "摘要语言模式",
+        "zh-TW": "摘要語言模式",
+        "ja": "要約の言語モード",
+        "ko": "요약 언어 모드"
+    },
+    "summary_mode_help": {
+        "en": "Translate: reuse a summary already generated in another language with a shorter, cheaper call. All languages: one request returns the summary in every supported language.",
+        "zh-CN": "翻译：已有其他语言的摘要时，用更短更省的请求翻译得到。全部语言：一次请求同时生成所有支持语言的摘要。",
+        "zh-TW": "翻譯：已有其他語言的摘要時，用更短更省的請求翻譯得到。全部語言：一次請求同時生成所有支援語言的摘要。",
+        "ja": "翻訳：他の言語の要約が既にある場合、より短く安価なリクエストで翻訳します。全言語：1 回のリクエストで対応する全言語の要約を生成します。",
+        "ko": "번역: 다른 언어의 요약이 이미 있으면 더 짧고 저렴한 요청으로 번역합니다. 모든 언어: 한 번의 요청으로 지원하는 모든 언어의 요약을 생성합니다."
+    },
+    "summary_mode_single": {
+        "en": "Current language only",
+        "zh-CN": "仅当前语言",
+        "zh-TW": "僅目前語言",
+        "ja": "現在の言語のみ",
+        "ko": "현재 언어만"
+    },
+    "summary_mode_derive": {
+        "en": "Translate existing summaries",
+        "zh-CN": "翻译已有摘要",
+        "zh-TW": "翻譯已有摘要",
+        "ja": "既存の要約を翻訳",
+        "ko": "기존 요약 번역"
+    },
+    "summary_mode_all": {
+        "en": "All languages at once",
+        "zh-CN": "一次生成全部语言",
+        "zh-TW": "一次生成全部語言",
+        "ja": "全言語を一括生成",
+        "ko": "모든 언어 한 번에 생성"
+    },
+    "generating_all_languages": {
+        "en": "AI is analyzing the paper in all languages...",
+        "zh-CN": "AI 正在用所有语言解读论文...",
+        "zh-TW": "AI 正在用所有語言解讀論文...",
+        "ja": "AIが全言語で論文を解説中...",
+        "ko": "AI가 모든 언어로 논문을 해설하는 중..."
+    },
+    "load_more": {
+        "en": "⬇️ Load More",
+        "zh-CN": "⬇️ 加载更多",
+        "zh-TW": "⬇️ 載入更多",
+        "ja": "⬇️ さらに読み込む",
+        "ko": "⬇️ 더 불러오기"
+    },
     "all_summaries_done": {
         "zh-CN": "✅ 所有摘要生成完成！",
         "zh-TW": "✅ 所有摘要生成完成！",
@@ -351,6 +561,34 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "ja": "お気に入りは空です。論文の横にある ⭐ をクリックして追加",
         "ko": "즐겨찾기가 비어 있습니다. 논문 옆의 ⭐를 클릭하여 추가"
     },
+    "refresh_favorites": {
+        "en": "🔄 Update Metadata",
+        "zh-CN": "🔄 更新元数据",
+        "zh-TW": "🔄 更新元資料",
+        "ja": "🔄 メタデータを更新",
+        "ko": "🔄 메타데이터 갱신"
+    },
+    "refreshing_favorites": {
+        "en": "Fetching latest versions of favorited papers from ArXiv...",
+        "zh-CN": "正在从 ArXiv 获取收藏论文的最新版本...",
+        "zh-TW": "正在從 ArXiv 取得收藏論文的最新版本...",
+        "ja": "ArXiv からお気に入り論文の最新版を取得中...",
+        "ko": "ArXiv에서 즐겨찾기 논문의 최신 버전을 가져오는 중..."
+    },
+    "favorites_refreshed": {
+        "en": "✅ Updated {changed} of {total} favorites",
+        "zh-CN": "✅ {total} 篇收藏中有 {changed} 篇已更新",
+        "zh-TW": "✅ {total} 篇收藏中有 {changed} 篇已更新",
+        "ja": "✅ {total} 件中 {changed} 件のお気に入りを更新しました",
+        "ko": "✅ 즐겨찾기 {total}개 중 {changed}개 업데이트됨"
+    },
+    "favorites_save_failed": {
+        "en": "⚠️ Fetched the latest metadata but failed to save favorites.json",
+        "zh-CN": "⚠️ 已获取最新元数据，但保存 favorites.json 失败",
+        "zh-TW": "⚠️ 已取得最新元資料，但儲存 favorites.json 失敗",
+        "ja": "⚠️ 最新のメタデータを取得しましたが、favorites.json の保存に失敗しました",
+        "ko": "⚠️ 최신 메타데이터를 가져왔지만 favorites.json 저장에 실패했습니다"
+    },
     "add_to_favorites": {
         "zh-CN": "⭐ 收藏",
         "zh-TW": "⭐ 收藏",
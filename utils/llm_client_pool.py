@@ -0,0 +1,225 @@
+"""
+LLM 客户端池模块
+按 (base_url, API Key 指纹, 超时) 复用 OpenAI 客户端及其 HTTP 连接池，
+避免每次调用都重新建立 TCP / TLS 连接；空闲过久的客户端自动关闭，
+并统计连接复用率和节省的握手时间
+"""
+
+import hashlib
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from openai import DefaultHttpxClient, OpenAI
+
+try:
+    import httpx
+except ImportError:  # 新版 openai SDK 基于 httpx2
+    import httpx2 as httpx
+
+
+# 客户端空闲超过该秒数后关闭（需大于单次请求的最长耗时，避免关闭正在使用的客户端）
+CLIENT_IDLE_SECONDS = 15 * 60
+
+# HTTP 连接保活时间（SDK 默认只有 5 秒，用户两次点击之间连接就会被丢弃）
+KEEPALIVE_SECONDS = 120.0
+
+# 单个客户端的连接池上限
+CONNECTION_LIMITS = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=KEEPALIVE_SECONDS
+)
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+
+class _ConnectionTrace:
+    """单次请求的连接追踪：记录是否新建了连接以及 TCP / TLS 握手耗时"""
+
+    def __init__(self):
+        self.new_connection = False
+        self.handshake_seconds = 0.0
+        self._started = 0.0
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            self.new_connection = True
+            self._started = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.handshake_seconds += time.perf_counter() - self._started
+
+
+@dataclass
+class _PooledClient:
+    """池中的一个客户端"""
+    client: OpenAI
+    created: float
+    last_used: float
+    uses: int = 0
+
+
+@dataclass
+class _PoolStats:
+    """客户端池统计"""
+    clients_created: int = 0
+    clients_reused: int = 0
+    clients_evicted: int = 0
+    client_init_seconds: float = 0.0
+    requests: int = 0
+    new_connections: int = 0
+    handshake_seconds: float = 0.0
+
+
+_pool: Dict[Tuple[str, str, float], _PooledClient] = {}
+_lock = threading.Lock()
+_stats = _PoolStats()
+
+
+def _on_request(request) -> None:
+    """请求发出前挂上连接追踪回调（底层 httpcore 会上报连接事件）"""
+    request.extensions["trace"] = _ConnectionTrace()
+
+
+def _on_response(response) -> None:
+    """收到响应头时汇总本次请求的连接情况"""
+    trace = response.request.extensions.get("trace")
+    if not isinstance(trace, _ConnectionTrace):
+        return
+    with _lock:
+        _stats.requests += 1
+        if trace.new_connection:
+            _stats.new_connections += 1
+            _stats.handshake_seconds += trace.handshake_seconds
+
+
+def _evict_idle(now: float) -> None:
+    """关闭空闲过久的客户端（调用方需持有 _lock）"""
+    for key, pooled in list(_pool.items()):
+        if now - pooled.last_used > CLIENT_IDLE_SECONDS:
+            del _pool[key]
+            _stats.clients_evicted += 1
+            try:
+                pooled.client.close()
+            except Exception:
+                pass
+
+
+def get_client(api_key: str, base_url: str = DEFAULT_BASE_URL, timeout: float = 60.0) -> OpenAI:
+    """
+    获取（或创建）一个可复用的 OpenAI 客户端
+
+    OpenAI 客户端本身是线程安全的，同一配置的所有会话和线程共享同一个连接池。
+
+    Args:
+        api_key: API 密钥
+        base_url: API 基础 URL
+        timeout: 请求超时秒数
+
+    Returns:
+        OpenAI: 客户端实例
+    """
+    api_key = api_key.strip()
+    base_url = (base_url.strip() if base_url else DEFAULT_BASE_URL).rstrip("/")
+    key = (base_url, hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16], float(timeout))
+    now = time.time()
+
+    with _lock:
+        _evict_idle(now)
+        pooled = _pool.get(key)
+        if pooled is not None:
+            pooled.last_used = now
+            pooled.uses += 1
+            _stats.clients_reused += 1
+            return pooled.client
+
+        start = time.perf_counter()
+        client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            # 重试（包括 429 的 Retry-After）统一由 llm_scheduler 负责，每次重试都重新经过限额检查
+            max_retries=0,
+            http_client=DefaultHttpxClient(
+                limits=CONNECTION_LIMITS,
+                event_hooks={"request": [_on_request], "response": [_on_response]}
+            )
+        )
+        _stats.client_init_seconds += time.perf_counter() - start
+        _stats.clients_created += 1
+        _pool[key] = _PooledClient(client=client, created=now, last_used=now, uses=1)
+        return client
+
+
+def abort_stream(stream) -> bool:
+    """
+    从其他线程立即中断一个流式响应（chat.completions.create(stream=True) 的返回值）
+
+    在其他线程调用 close() 不会唤醒正阻塞在读取上的线程；这里直接关闭底层 socket 的读写，
+    读取线程随即以连接错误返回，服务端也能看到连接断开。响应已读完时什么也不做
+    （连接可能已经归还连接池，正被其他请求使用）。
+
+    Args:
+        stream: OpenAI SDK 的 Stream 对象，为 None（请求还没有返回）时什么也不做
+
+    Returns:
+        bool: 是否断开了进行中的连接
+    """
+    response = getattr(stream, "response", None)
+    if response is None or response.is_closed:
+        return False
+    network_stream = response.extensions.get("network_stream")
+    sock = network_stream.get_extra_info("socket") if network_stream is not None else None
+    if sock is None:
+        return False
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        return False
+    return True
+
+
+def get_pool_stats() -> Dict[str, float]:
+    """
+    获取客户端池统计
+
+    Returns:
+        dict: {
+            "clients": 当前池中的客户端数,
+            "clients_created": 累计创建数, "clients_reused": 累计复用次数,
+            "clients_evicted": 因空闲被关闭的数量,
+            "requests": 累计 HTTP 请求数, "new_connections": 新建连接数,
+            "connection_reuse_rate": 复用已有连接的请求比例,
+            "avg_handshake_ms": 新建连接的平均握手耗时（毫秒）,
+            "time_saved_seconds": 估算节省的时间（复用连接省下的握手 + 复用客户端省下的初始化）
+        }
+    """
+    with _lock:
+        stats = _stats
+        reused_connections = stats.requests - stats.new_connections
+        avg_handshake = stats.handshake_seconds / stats.new_connections if stats.new_connections else 0.0
+        avg_init = stats.client_init_seconds / stats.clients_created if stats.clients_created else 0.0
+        return {
+            "clients": len(_pool),
+            "clients_created": stats.clients_created,
+            "clients_reused": stats.clients_reused,
+            "clients_evicted": stats.clients_evicted,
+            "requests": stats.requests,
+            "new_connections": stats.new_connections,
+            "connection_reuse_rate": reused_connections / stats.requests if stats.requests else 0.0,
+            "avg_handshake_ms": avg_handshake * 1000,
+            "time_saved_seconds": reused_connections * avg_handshake + stats.clients_reused * avg_init,
+        }
+
+
+def close_all() -> None:
+    """关闭并清空所有客户端"""
+    with _lock:
+        for pooled in _pool.values():
+            try:
+                pooled.client.close()
+            except Exception:
+                pass
+        _pool.clear()
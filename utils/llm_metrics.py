@@ -0,0 +1,262 @@
+"""
+LLM 调用计量模块
+记录每次 LLM 调用（包括缓存命中）的 token 用量、耗时、首 token 延迟、模型和服务商，
+保存在本地 SQLite 中，并提供按天、按模型的汇总，供管理面板展示
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+from urllib.parse import urlparse
+
+
+# 计量数据文件路径（与其他缓存同目录）
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "arxiv_daily_chef_cache")
+METRICS_DB_FILE = os.path.join(CACHE_DIR, "llm_metrics.db")
+
+# 明细记录保留天数
+METRICS_RETENTION_DAYS = 90
+
+# 已知服务商的 API 域名（与 app.py 中的 API 预设对应），其他地址按域名统计
+PROVIDER_HOSTS = {
+    "api.openai.com": "OpenAI",
+    "api.deepseek.com": "DeepSeek",
+    "api.moonshot.cn": "Moonshot",
+    "open.bigmodel.cn": "GLM",
+    "api.siliconflow.cn": "SiliconFlow",
+}
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts                REAL NOT NULL,
+    day               TEXT NOT NULL,
+    operation         TEXT NOT NULL,
+    provider          TEXT NOT NULL,
+    model             TEXT NOT NULL,
+    cache_hit         INTEGER NOT NULL,
+    prompt_tokens     INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    usage_estimated   INTEGER NOT NULL DEFAULT 0,
+    saved_tokens      INTEGER NOT NULL DEFAULT 0,
+    wall_ms           REAL NOT NULL DEFAULT 0,
+    ttft_ms           REAL,
+    error             TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_ts ON llm_calls (ts);
+"""
+
+
+# 本进程中已完成建表和迁移的数据库文件（每个文件只需执行一次）
+_initialized_dbs: Set[str] = set()
+_init_lock = threading.Lock()
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
+    """启用 WAL、建表，并为旧版计量库补齐新增的列"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    
+    # 旧版计量库没有 saved_tokens 列，就地补上
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_calls)")}
+    if "saved_tokens" not in columns:
+        conn.execute("ALTER TABLE llm_calls ADD COLUMN saved_tokens INTEGER NOT NULL DEFAULT 0")
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """
+    打开计量数据库连接（每次调用新建连接，保证多线程 / 多进程安全）
+
+    with 块正常结束时提交、出错时回滚，退出时关闭连接；建表和迁移每个进程只执行一次
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # 数据库文件被删除（如临时目录被清理）后重新建表
+    missing = not os.path.exists(METRICS_DB_FILE)
+    conn = sqlite3.connect(METRICS_DB_FILE, timeout=30)
+    try:
+        with _init_lock:
+            if missing or METRICS_DB_FILE not in _initialized_dbs:
+                _init_db(conn)
+                _initialized_dbs.add(METRICS_DB_FILE)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def provider_name(base_url: str) -> str:
+    """根据 API 地址识别服务商（未知地址返回域名）"""
+    host = (urlparse(base_url.strip()).hostname or "") if base_url else "api.openai.com"
+    return PROVIDER_HOSTS.get(host, host or "unknown")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 个 token，其余约 4 个字符 1 个 token"""
+    cjk = len(re.findall(r'[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]', text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+@dataclass
+class LLMCall:
+    """
+    一次 LLM 调用的计量记录
+
+    用法:
+        with track_call("summary", model, base_url) as call:
+            response = client.chat.completions.create(...)
+            call.set_usage(response.usage)
+    """
+    operation: str
+    model: str
+    provider: str
+    cache_hit: bool = False
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    usage_estimated: bool = False
+    saved_tokens: int = 0           # 输入预检（prompt_preflight）节省的输入 token 数
+    started: float = 0.0
+    ttft_seconds: Optional[float] = None
+    error: str = ""
+
+    def first_token(self) -> None:
+        """流式输出收到第一个片段时调用，记录首 token 延迟"""
+        if self.ttft_seconds is None:
+            self.ttft_seconds = time.perf_counter() - self.started
+
+    def set_usage(self, usage) -> None:
+        """从响应的 usage 字段读取 token 用量（为空时不修改）"""
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens or 0
+            self.completion_tokens = usage.completion_tokens or 0
+            self.usage_estimated = False
+
+    def estimate_usage(self, prompt: str, completion: str) -> None:
+        """服务商没有返回 usage 时（部分流式接口）按文本估算"""
+        self.prompt_tokens = estimate_tokens(prompt)
+        self.completion_tokens = estimate_tokens(completion) if completion else 0
+        self.usage_estimated = True
+
+    def __enter__(self) -> "LLMCall":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None and not self.error:
+            # 流式输出被调用方中途停止时记为 interrupted
+            self.error = "interrupted" if exc_type is GeneratorExit else str(exc)[:200]
+        _record(self, time.perf_counter() - self.started)
+        return False
+
+
+def track_call(operation: str, model: str, base_url: str) -> LLMCall:
+    """
+    开始计量一次 LLM 调用（作为 with 语句使用，退出时写入计量数据库）
+
+    Args:
+        operation: 调用类型，如 "summary"、"summary_stream"、"summary_pack"、"hyperparams"
+        model: 模型名称
+        base_url: API 地址（用于识别服务商）
+
+    Returns:
+        LLMCall: 计量记录
+    """
+    return LLMCall(operation=operation, model=model.strip(), provider=provider_name(base_url))
+
+
+def record_cache_hit(operation: str, model: str, base_url: str) -> None:
+    """记录一次缓存命中（没有实际调用 LLM）"""
+    call = track_call(operation, model, base_url)
+    call.cache_hit = True
+    _record(call, 0.0)
+
+
+def _record(call: LLMCall, wall_seconds: float) -> None:
+    """写入一条计量记录，并清理过期记录（计量失败不影响 LLM 调用本身）"""
+    now = time.time()
+    try:
+        with _connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_calls
+                    (ts, day, operation, provider, model, cache_hit, prompt_tokens,
+                     completion_tokens, usage_estimated, saved_tokens, wall_ms, ttft_ms, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    now, datetime.fromtimestamp(now).strftime("%Y-%m-%d"),
+                    call.operation, call.provider, call.model, int(call.cache_hit),
+                    call.prompt_tokens, call.completion_tokens, int(call.usage_estimated),
+                    call.saved_tokens, wall_seconds * 1000,
+                    call.ttft_seconds * 1000 if call.ttft_seconds is not None else None,
+                    call.error
+                )
+            )
+            conn.execute(
+                "DELETE FROM llm_calls WHERE ts < ?",
+                (now - METRICS_RETENTION_DAYS * 24 * 3600,)
+            )
+    except sqlite3.Error as e:
+        print(f"写入 LLM 计量数据失败: {e}")
+
+
+# 汇总查询共用的聚合列
+_ROLLUP_COLUMNS = """
+    COUNT(*) AS calls,
+    SUM(cache_hit) AS cache_hits,
+    SUM(error != '') AS errors,
+    SUM(prompt_tokens) AS prompt_tokens,
+    SUM(completion_tokens) AS completion_tokens,
+    SUM(saved_tokens) AS saved_tokens,
+    ROUND(AVG(CASE WHEN cache_hit = 0 THEN wall_ms END)) AS avg_wall_ms,
+    ROUND(AVG(ttft_ms)) AS avg_ttft_ms
+"""
+
+
+def _rollup(group_by: str, days: int) -> List[Dict]:
+    """按指定列汇总最近若干天的调用"""
+    since = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    with _connect() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"SELECT {group_by}, {_ROLLUP_COLUMNS} FROM llm_calls "
+            f"WHERE day >= ? GROUP BY {group_by} ORDER BY {group_by}",
+            (since,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_daily_rollup(days: int = 7) -> List[Dict]:
+    """
+    按天汇总最近若干天的 LLM 调用
+
+    Returns:
+        List[Dict]: 每天一行 {"day", "calls", "cache_hits", "errors", "prompt_tokens",
+                    "completion_tokens", "saved_tokens", "avg_wall_ms", "avg_ttft_ms"}
+                    （耗时只统计实际调用，首 token 延迟只统计流式调用）
+    """
+    return _rollup("day", days)
+
+
+def get_model_rollup(days: int = 7) -> List[Dict]:
+    """
+    按服务商和模型汇总最近若干天的 LLM 调用
+
+    Returns:
+        List[Dict]: 每个模型一行，字段同 get_daily_rollup（day 换成 provider 和 model）
+    """
+    return _rollup("provider, model", days)
+
+
+def clear() -> None:
+    """清空计量数据"""
+    with _connect() as conn:
+        conn.execute("DELETE FROM llm_calls")
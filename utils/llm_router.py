@@ -0,0 +1,351 @@
+"""
+LLM 路由模块
+在主服务商和备用服务商之间路由流式 LLM 请求：主服务商迟迟没有产出首个片段
+（超过其近期首 token 延迟的高分位数）时，向备用服务商发出对冲请求，先产出内容的一方胜出，
+另一方被立即取消（已登记中断函数的请求直接断开连接）；主服务商直接失败时立即切换到备用服务商。
+连续失败的服务商由熔断器暂时摘除，冷却后放行一次试探请求
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+from utils.llm_metrics import provider_name
+from utils.llm_scheduler import RequestCancelled
+
+
+# 对冲延迟：取服务商近期首 token 延迟的该分位数
+HEDGE_PERCENTILE = 95
+
+# 样本数不足时使用的对冲延迟（秒），以及对冲延迟的下限（避免样本偏快时频繁对冲）
+HEDGE_DEFAULT_DELAY = 8.0
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MIN_SAMPLES = 10
+
+# 每个服务商保留的最近延迟样本数
+LATENCY_WINDOW = 100
+
+# 熔断：连续失败次数达到阈值后摘除服务商，冷却若干秒后放行一次试探请求
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class Provider:
+    """一个可用的 LLM 服务配置"""
+    base_url: str
+    api_key: str
+    model: str
+
+    @property
+    def name(self) -> str:
+        """服务商名称（与 llm_metrics / llm_scheduler 的统计口径一致）"""
+        return provider_name(self.base_url)
+
+
+@dataclass
+class _ProviderHealth:
+    """单个服务商的延迟样本、熔断状态和路由统计"""
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "routed": 0, "wins": 0, "failures": 0, "hedges": 0, "hedge_wins": 0,
+        "cancelled": 0, "ejected": 0,
+    })
+
+
+@dataclass
+class _Racer:
+    """一次路由中向某个服务商发出的请求"""
+    provider: Provider
+    hedged: bool
+    started: float
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    lost: threading.Event = field(default_factory=threading.Event)     # 在对冲中落败（结果将被丢弃）
+    finished: bool = False
+    abort: Optional[Callable[[], bool]] = None      # 读取线程登记的中断函数（见 cancel_scope）
+    aborted: bool = False                           # 进行中的连接是否已被中断函数断开
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def cancel(self) -> None:
+        """落败取消：设置取消标记，并立即调用已登记的中断函数（读取线程可能正阻塞在等待首个片段）"""
+        self.lost.set()
+        with self.lock:
+            if self.cancelled.is_set():
+                return
+            self.cancelled.set()
+            # 持锁调用，保证读取线程离开 cancel_scope 之后不会再被中断
+            if self.abort is not None:
+                try:
+                    self.aborted = bool(self.abort())
+                except Exception:
+                    pass
+
+
+# 路由读取线程当前处理的请求（供 cancel_scope 登记中断函数）
+_local = threading.local()
+
+
+@contextmanager
+def cancel_scope(abort: Callable[[], bool]) -> Iterator[threading.Event]:
+    """
+    在 open_stream 返回的迭代器中登记中断函数（例如断开流式响应的连接）
+
+    所在请求在 with 块内落败（另一服务商胜出）时立即调用 abort，不必等到下一个片段；
+    离开 with 块后不再调用。应在发出请求之前进入：排队中的请求可以把返回的标记传给
+    LLM_SCHEDULER（cancelled 参数）直接退出队列。不经过 LLM_ROUTER 时什么也不做。
+
+    Args:
+        abort: 中断函数（在取消请求的线程中调用），返回是否断开了进行中的连接
+               （断开后读取线程收到的连接错误不计入熔断器）
+
+    Yields:
+        threading.Event: 请求的落败标记（落败请求已生成的内容会被丢弃，不应作为部分结果保存）
+    """
+    racer: Optional[_Racer] = getattr(_local, "racer", None)
+    if racer is None:
+        yield threading.Event()
+        return
+    with racer.lock:
+        racer.abort = abort
+        if racer.lost.is_set():
+            racer.aborted = bool(abort())
+    try:
+        yield racer.lost
+    finally:
+        with racer.lock:
+            racer.abort = None
+
+
+def _is_cancellation(error: BaseException) -> bool:
+    """异常（或引发它的异常）是否为请求在发出前被取消（open_stream 可能把它包装成其他异常）"""
+    while error is not None:
+        if isinstance(error, RequestCancelled):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class LLMRouter:
+    """
+    流式 LLM 请求的对冲路由与熔断（进程内，所有会话共享）
+
+    每个请求由独立线程读取。某个请求胜出时其余请求立即被取消：在 cancel_scope 中登记了中断函数的请求
+    直接断开连接；其余请求由读取线程在收到下一个片段时检查取消标记并关闭流，服务端随之停止生成。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._health: Dict[str, _ProviderHealth] = {}
+
+    def _get_health(self, provider: Provider) -> _ProviderHealth:
+        """获取服务商状态（调用方需持有 _lock）"""
+        return self._health.setdefault(provider.name, _ProviderHealth())
+
+    def hedge_delay(self, provider: Provider) -> float:
+        """等待该服务商首个片段多久后发出对冲请求（秒）"""
+        return self._hedge_delay(provider.name)
+
+    def _hedge_delay(self, name: str) -> float:
+        with self._lock:
+            samples = sorted(self._health[name].latencies) if name in self._health else []
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        rank = min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100))
+        return max(HEDGE_MIN_DELAY, samples[rank])
+
+    def is_available(self, provider: Provider) -> bool:
+        """熔断器是否放行该服务商（熔断中的服务商冷却结束后放行一次试探请求）"""
+        with self._lock:
+            health = self._get_health(provider)
+            return (health.consecutive_failures < BREAKER_FAILURE_THRESHOLD
+                    or time.monotonic() >= health.open_until)
+
+    def _record_first_chunk(self, provider: Provider, latency: float) -> None:
+        """服务商产出了首个片段（无论是否胜出）：记录延迟样本并重置连续失败次数"""
+        with self._lock:
+            health = self._get_health(provider)
+            health.latencies.append(latency)
+            health.consecutive_failures = 0
+
+    def _record_failure(self, provider: Provider) -> None:
+        with self._lock:
+            health = self._get_health(provider)
+            health.consecutive_failures += 1
+            health.stats["failures"] += 1
+            if health.consecutive_failures == BREAKER_FAILURE_THRESHOLD:
+                health.stats["ejected"] += 1
+            if health.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+                health.open_until = time.monotonic() + BREAKER_COOLDOWN_SECONDS
+
+    def stream(
+        self,
+        open_stream: Callable[[Provider], Iterator[str]],
+        providers: Sequence[Provider],
+        error_type: Callable[[str], Exception] = RuntimeError
+    ) -> Iterator[str]:
+        """
+        按顺序在多个服务商之间路由一个流式请求
+
+        先请求第一个可用的服务商；超过其对冲延迟仍没有产出时向下一个服务商发出对冲请求，
+        某个请求失败时立即启用下一个服务商。最先产出片段的请求胜出，其余请求被取消。
+        所有服务商都被熔断时仍请求第一个，保证调用方拿到真实的错误。
+
+        Args:
+            open_stream: 向指定服务商发起请求的函数，返回逐段产出文本的迭代器，失败时抛出异常
+            providers: 服务商列表（第一个为主服务商，其余按优先顺序作为备用）
+            error_type: 所有请求都没有产出内容、也没有抛出异常时使用的异常类型
+                        （open_stream 抛出的异常原样传给调用方，两者应是调用方捕获的同一类异常）
+
+        Yields:
+            str: 胜出请求产出的文本片段
+
+        Raises:
+            Exception: 所有服务商都失败时抛出最后一个错误（胜出后中途失败时抛出该错误）
+        """
+        candidates = [provider for provider in providers if self.is_available(provider)] or list(providers[:1])
+        events: "queue.Queue" = queue.Queue()
+        racers: List[_Racer] = []
+
+        def read(racer: _Racer) -> None:
+            # 延迟样本和失败次数在读取线程中记录，被取消的请求之后的结果同样计入熔断器
+            chunks = None
+            produced = False
+            _local.racer = racer
+            try:
+                if racer.cancelled.is_set():
+                    # 还没开始请求就已落败（如对冲请求刚发出另一方就产出了内容）
+                    events.put((racer, "done", None))
+                    return
+                chunks = open_stream(racer.provider)
+                for chunk in chunks:
+                    if not produced:
+                        produced = True
+                        self._record_first_chunk(racer.provider, time.monotonic() - racer.started)
+                    if racer.cancelled.is_set():
+                        break
+                    events.put((racer, "data", chunk))
+                if not produced:
+                    self._record_failure(racer.provider)
+                events.put((racer, "done", None))
+            except Exception as e:
+                # 被路由主动断开连接、或在发出前就被取消的请求不算服务商失败
+                if not (racer.aborted or _is_cancellation(e)):
+                    self._record_failure(racer.provider)
+                events.put((racer, "error", e))
+            finally:
+                _local.racer = None
+                # 在读取线程中关闭内层生成器（释放连接、写入部分结果）
+                if chunks is not None and hasattr(chunks, "close"):
+                    chunks.close()
+
+        def launch(hedged: bool) -> float:
+            provider = candidates[len(racers)]
+            racer = _Racer(provider=provider, hedged=hedged, started=time.monotonic())
+            racers.append(racer)
+            with self._lock:
+                health = self._get_health(provider)
+                health.stats["routed"] += 1
+                health.stats["hedges"] += hedged
+                if health.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+                    # 试探请求：结果出来之前其他请求仍被熔断器拦截
+                    health.open_until = time.monotonic() + BREAKER_COOLDOWN_SECONDS
+            threading.Thread(target=read, args=(racer,), name=f"llm-route-{provider.name}", daemon=True).start()
+            return time.monotonic() + self.hedge_delay(provider)
+
+        winner: Optional[_Racer] = None
+        error: Optional[Exception] = None
+
+        def cancel_losers() -> None:
+            for racer in racers:
+                if racer is winner or racer.cancelled.is_set():
+                    continue
+                if not racer.finished:
+                    with self._lock:
+                        self._get_health(racer.provider).stats["cancelled"] += 1
+                racer.cancel()
+
+        try:
+            hedge_at = launch(hedged=False)
+            while winner is None:
+                running = [racer for racer in racers if not racer.finished]
+                if not running:
+                    if len(racers) == len(candidates):
+                        raise error or error_type("LLM 请求没有返回任何内容")
+                    # 失败切换：没有进行中的请求时立即启用下一个服务商
+                    hedge_at = launch(hedged=False)
+                    continue
+
+                can_hedge = len(racers) < len(candidates)
+                try:
+                    racer, kind, payload = events.get(
+                        timeout=max(0.0, hedge_at - time.monotonic()) if can_hedge else None
+                    )
+                except queue.Empty:
+                    hedge_at = launch(hedged=True)
+                    continue
+
+                if kind == "data":
+                    winner = racer
+                    with self._lock:
+                        health = self._get_health(racer.provider)
+                        health.stats["wins"] += 1
+                        health.stats["hedge_wins"] += racer.hedged
+                    # 胜负已分：立即取消其余请求，不等它们的下一个片段
+                    cancel_losers()
+                    yield payload
+                    continue
+                racer.finished = True
+                if kind == "error":
+                    error = payload
+
+            # 胜出后只转发胜出请求的片段
+            while True:
+                racer, kind, payload = events.get()
+                if racer is not winner:
+                    continue
+                if kind == "data":
+                    yield payload
+                elif kind == "done":
+                    break
+                else:
+                    raise payload
+        finally:
+            cancel_losers()
+            # 调用方提前停止读取时，胜出的请求在收到下一个片段时关闭流（它正在产出，不必断开连接），
+            # 内层生成器照常把已生成的部分作为不完整结果保存
+            if winner is not None:
+                winner.cancelled.set()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取各服务商的路由统计
+
+        Returns:
+            dict: {服务商: {"routed": 发出的请求数, "wins": 胜出次数, "failures": 失败次数,
+                            "hedges": 对冲请求数, "hedge_wins": 对冲请求胜出次数,
+                            "cancelled": 被取消的落败请求数, "ejected": 被熔断的次数,
+                            "breaker_open": 当前是否处于熔断中, "hedge_delay_s": 当前对冲延迟}}
+        """
+        with self._lock:
+            now = time.monotonic()
+            result = {
+                name: dict(
+                    health.stats,
+                    breaker_open=(health.consecutive_failures >= BREAKER_FAILURE_THRESHOLD
+                                  and now < health.open_until)
+                )
+                for name, health in self._health.items()
+            }
+        for name, stats in result.items():
+            stats["hedge_delay_s"] = round(self._hedge_delay(name), 3)
+        return result
+
+
+# 全局路由器（所有 Streamlit 会话共享）
+LLM_ROUTER = LLMRouter()
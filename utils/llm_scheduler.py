@@ -0,0 +1,380 @@
+"""
+LLM 请求调度模块
+所有 Chat Completion 请求经过调度器发送：按服务商跟踪每分钟请求数（RPM）和 token 数（TPM），
+发送前估算请求的 token 数，预算不足时排队（用户点击优先于批量生成和后台预取）；
+遇到 429 / 5xx / 连接错误时按 Retry-After 或带抖动的指数退避重试，
+并让同一服务商的其他排队请求一起暂停
+"""
+
+import email.utils
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from utils.llm_metrics import estimate_tokens, provider_name
+
+
+# 请求优先级（数值越小越优先）
+PRIORITY_INTERACTIVE = 0    # 用户点击的单篇摘要 / 超参数提取
+PRIORITY_BATCH = 5          # 「一键生成所有摘要」
+PRIORITY_BACKGROUND = 10    # 后台预取
+
+# 各服务商的默认预算 (RPM, TPM)，按 llm_metrics.provider_name 识别服务商
+# 取各家入门档位的限额，避免批量请求一开始就撞上 429
+DEFAULT_PROVIDER_BUDGETS: Dict[str, Tuple[int, int]] = {
+    "OpenAI": (500, 200000),
+    "DeepSeek": (300, 1000000),
+    "Moonshot": (20, 64000),
+    "GLM": (60, 200000),
+    "SiliconFlow": (1000, 50000),
+}
+
+# 未知服务商的预算
+DEFAULT_BUDGET = (60, 100000)
+
+# 按服务商覆盖预算的配置文件（与 app.py 同级目录，可选）
+# 格式: {"DeepSeek": {"rpm": 60, "tpm": 100000}, "127.0.0.1": {"rpm": 10}, ...}
+LLM_LIMITS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "llm_limits.json")
+
+# 重试设置：最多重试次数、指数退避的基础秒数和上限
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# 预算统计的时间窗口（秒）
+WINDOW_SECONDS = 60.0
+
+# 排队中的请求检查取消标记的间隔（秒）
+CANCEL_POLL_SECONDS = 0.1
+
+
+T = TypeVar("T")
+
+
+def load_budget_config() -> Dict[str, Tuple[int, int]]:
+    """
+    加载各服务商的预算（默认值 + llm_limits.json 中的覆盖项）
+    文件不存在或格式错误时只使用默认值
+    """
+    budgets = dict(DEFAULT_PROVIDER_BUDGETS)
+    try:
+        if os.path.exists(LLM_LIMITS_FILE):
+            with open(LLM_LIMITS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for provider, limits in data.items():
+                rpm, tpm = budgets.get(provider, DEFAULT_BUDGET)
+                budgets[provider] = (int(limits.get("rpm", rpm)), int(limits.get("tpm", tpm)))
+    except (json.JSONDecodeError, IOError, AttributeError, ValueError) as e:
+        print(f"加载 LLM 限额配置失败: {e}")
+    return budgets
+
+
+class RequestCancelled(Exception):
+    """请求在第一次发出前（排队中）被取消"""
+    pass
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """读取 OpenAI SDK 异常中的 HTTP 状态码（连接错误等没有状态码）"""
+    return getattr(error, "status_code", None)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """429、5xx 和连接 / 超时错误可以重试；4xx 参数或鉴权错误不重试"""
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return name in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    读取响应中建议的重试等待时间
+
+    支持 retry-after-ms、retry-after（秒数或 HTTP 日期）两种响应头，没有时返回 None
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    计算第 attempt 次重试前的等待时间
+
+    服务端给出 Retry-After 时以它为准并加一点抖动（避免排队的请求同时醒来）；
+    否则使用 full jitter 指数退避：在 [0, min(上限, 基础 * 2^attempt)] 内随机
+    """
+    if retry_after is not None:
+        return min(BACKOFF_MAX_SECONDS, retry_after) + random.uniform(0, BACKOFF_BASE_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+@dataclass
+class _ProviderState:
+    """单个服务商的预算窗口和等待队列"""
+    rpm: int
+    tpm: int
+    window: Deque[List[float]] = field(default_factory=deque)     # [发送时间, 计入的 token 数]
+    queue: List[Tuple[int, int]] = field(default_factory=list)     # 等待者 (优先级, 序号) 的小顶堆
+    blocked_until: float = 0.0
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "requests": 0, "throttled": 0, "retries": 0, "rate_limited": 0, "failed": 0
+    })
+
+    def prune(self, now: float) -> None:
+        """移出窗口外的记录"""
+        while self.window and self.window[0][0] <= now - WINDOW_SECONDS:
+            self.window.popleft()
+
+    def wait_time(self, now: float, tokens: int) -> float:
+        """距离可以发送一个 tokens 大小的请求还需要等待的秒数（0 表示可以立即发送）"""
+        wait = self.blocked_until - now
+        if len(self.window) >= self.rpm:
+            wait = max(wait, self.window[-self.rpm][0] + WINDOW_SECONDS - now)
+
+        # 超过 TPM 时等到足够多的旧记录移出窗口；单个请求就超过 TPM 时等窗口清空后发送
+        excess = sum(entry[1] for entry in self.window) + min(tokens, self.tpm) - self.tpm
+        for sent_at, used in self.window:
+            if excess <= 0:
+                break
+            excess -= used
+            wait = max(wait, sent_at + WINDOW_SECONDS - now)
+        return wait
+
+
+class LLMScheduler:
+    """
+    按服务商限制 RPM / TPM 的 LLM 请求调度器（进程内，所有会话和线程共享）
+
+    同一服务商的请求按 (优先级, 到达顺序) 排队，只有队首请求在预算允许时发出。
+    请求发出时按「估算的输入 token + max_tokens」计入 TPM（与 OpenAI 等服务商的计数方式一致），
+    拿到响应中的实际用量后（流式请求在流关闭时，见 run_stream）再修正，未用完的额度立即释放给后续请求。
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Tuple[int, int]]] = None):
+        """
+        Args:
+            budgets: {服务商: (RPM, TPM)}，默认读取 DEFAULT_PROVIDER_BUDGETS 和 llm_limits.json
+        """
+        self.budgets = load_budget_config() if budgets is None else dict(budgets)
+        self._providers: Dict[str, _ProviderState] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+
+    def _state(self, provider: str) -> _ProviderState:
+        """获取服务商状态（调用方需持有 _cond）"""
+        state = self._providers.get(provider)
+        if state is None:
+            rpm, tpm = self.budgets.get(provider, DEFAULT_BUDGET)
+            state = self._providers[provider] = _ProviderState(rpm=rpm, tpm=tpm)
+        return state
+
+    def set_budget(self, provider: str, rpm: int, tpm: int) -> None:
+        """修改服务商的预算（立即生效）"""
+        with self._cond:
+            self.budgets[provider] = (rpm, tpm)
+            state = self._state(provider)
+            state.rpm, state.tpm = rpm, tpm
+            self._cond.notify_all()
+
+    def _acquire(
+        self,
+        provider: str,
+        tokens: int,
+        ticket: Tuple[int, int],
+        cancelled: Optional[threading.Event] = None
+    ) -> List[float]:
+        """
+        排队直到预算允许发送，返回计入窗口的记录（用于之后修正 token 数）
+
+        ticket 为 (优先级, 到达序号)；重试时沿用原来的 ticket，不会排到后来的请求后面。
+        cancelled 被设置时退出队列并抛出 RequestCancelled
+        """
+        with self._cond:
+            state = self._state(provider)
+            heapq.heappush(state.queue, ticket)
+            throttled = False
+            try:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise RequestCancelled("请求在排队中被取消")
+                    now = time.monotonic()
+                    state.prune(now)
+                    timeout = None
+                    if state.queue[0] == ticket:
+                        timeout = state.wait_time(now, tokens)
+                        if timeout <= 0:
+                            heapq.heappop(state.queue)
+                            entry = [now, float(tokens)]
+                            state.window.append(entry)
+                            state.stats["requests"] += 1
+                            state.stats["throttled"] += int(throttled)
+                            self._cond.notify_all()
+                            return entry
+                    throttled = True
+                    if cancelled is not None:
+                        timeout = CANCEL_POLL_SECONDS if timeout is None else min(timeout, CANCEL_POLL_SECONDS)
+                    self._cond.wait(timeout=timeout)
+            except BaseException:
+                # 等待被中断（如 Streamlit 停止脚本）时退出队列，避免阻塞后面的请求
+                if ticket in state.queue:
+                    state.queue.remove(ticket)
+                    heapq.heapify(state.queue)
+                    self._cond.notify_all()
+                raise
+
+    def _settle(self, entry: List[float], tokens: int) -> None:
+        """用实际用量修正已计入的 token 数"""
+        with self._cond:
+            entry[1] = float(tokens)
+            self._cond.notify_all()
+
+    def _penalize(self, provider: str, seconds: float) -> None:
+        """被限流后让该服务商的所有请求暂停 seconds 秒"""
+        with self._cond:
+            state = self._state(provider)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def run(
+        self,
+        request: Callable[[], T],
+        base_url: str,
+        messages: List[dict],
+        max_tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_retries: int = MAX_RETRIES,
+        cancelled: Optional[threading.Event] = None
+    ) -> T:
+        """
+        在预算内发送一个请求，失败时按需重试
+
+        Args:
+            request: 实际发送请求的函数（如 lambda: client.chat.completions.create(...)）
+            base_url: API 地址（用于识别服务商）
+            messages: 请求的消息列表（用于估算输入 token 数）
+            max_tokens: 请求的 max_tokens（计入 TPM 预算）
+            priority: 优先级，见 PRIORITY_*
+            max_retries: 可重试错误的最多重试次数
+            cancelled: 取消标记，请求第一次发出前（排队中）被设置时不再发送
+
+        Returns:
+            request 的返回值；返回值带 usage 时用实际用量修正预算
+
+        Raises:
+            RequestCancelled: 请求发出前被取消
+            Exception: request 抛出的不可重试错误，或重试耗尽后的最后一个错误
+        """
+        result, entry = self._run(request, base_url, messages, max_tokens, priority, max_retries, cancelled)
+        usage = getattr(result, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            self._settle(entry, usage.total_tokens)
+        return result
+
+    def run_stream(
+        self,
+        request: Callable[[], T],
+        base_url: str,
+        messages: List[dict],
+        max_tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_retries: int = MAX_RETRIES,
+        cancelled: Optional[threading.Event] = None
+    ) -> Tuple[T, Callable[[int], None]]:
+        """
+        与 run 相同，用于流式请求：用量要等流结束才知道，由调用方在流关闭时修正预算
+
+        Returns:
+            Tuple[T, Callable[[int], None]]: (request 的返回值, settle)；
+            流结束或被中断时调用 settle(实际 token 数)（最后一个片段的 usage 或按文本估算），
+            在此之前按「估算的输入 token + max_tokens」占用 TPM 预算
+        """
+        result, entry = self._run(request, base_url, messages, max_tokens, priority, max_retries, cancelled)
+        return result, lambda tokens: self._settle(entry, tokens)
+
+    def _run(
+        self,
+        request: Callable[[], T],
+        base_url: str,
+        messages: List[dict],
+        max_tokens: int,
+        priority: int,
+        max_retries: int,
+        cancelled: Optional[threading.Event]
+    ) -> Tuple[T, List[float]]:
+        """发送请求（排队、重试），返回 (request 的返回值, 计入窗口的记录)"""
+        provider = provider_name(base_url)
+        tokens = sum(estimate_tokens(message["content"]) + 4 for message in messages) + max_tokens
+        ticket = (priority, next(self._seq))
+
+        for attempt in range(max_retries + 1):
+            # 只有从未发出过的请求可以取消；已经失败过的请求重试到底，最终结果仍反映服务商的状况
+            entry = self._acquire(provider, tokens, ticket, cancelled if attempt == 0 else None)
+            try:
+                return request(), entry
+            except Exception as e:
+                with self._cond:
+                    stats = self._state(provider).stats
+                    if _status_code(e) == 429:
+                        stats["rate_limited"] += 1
+                    if attempt >= max_retries or not _is_retryable(e):
+                        stats["failed"] += 1
+                        raise
+                    stats["retries"] += 1
+
+                delay = backoff_seconds(attempt, retry_after_seconds(e))
+                if _status_code(e) == 429:
+                    self._penalize(provider, delay)
+                else:
+                    time.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取各服务商的调度统计
+
+        Returns:
+            dict: {服务商: {"rpm", "tpm": 预算, "queued": 排队中的请求数,
+                            "requests_last_minute", "tokens_last_minute": 最近一分钟的用量,
+                            "requests": 已发出的请求数, "throttled": 因预算排队过的请求数,
+                            "retries": 重试次数, "rate_limited": 收到 429 的次数, "failed": 最终失败数}}
+        """
+        with self._cond:
+            now = time.monotonic()
+            result = {}
+            for provider, state in self._providers.items():
+                state.prune(now)
+                result[provider] = dict(
+                    state.stats,
+                    rpm=state.rpm,
+                    tpm=state.tpm,
+                    queued=len(state.queue),
+                    requests_last_minute=len(state.window),
+                    tokens_last_minute=int(sum(entry[1] for entry in state.window)),
+                )
+            return result
+
+
+# 全局 LLM 调度器（所有 Streamlit 会话共享）
+LLM_SCHEDULER = LLMScheduler()
@@ -1,11 +1,105 @@
 """
 LLM 摘要生成模块
-调用 OpenAI 兼容的 API 对论文摘要进行多语言总结
+调用 OpenAI 兼容的 API 对论文摘要进行多语言总结，生成结果写入跨会话共享的摘要缓存
 """
 
-from openai import OpenAI
-from typing import Optional
-from utils.i18n import get_llm_system_prompt
+import math
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from operator import mul, sub
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from utils.i18n import SUPPORTED_LANGUAGES, get_llm_system_prompt, get_text
+from utils import llm_metrics, summary_cache
+from utils.llm_client_pool import abort_stream, get_client
+from utils.llm_router import LLM_ROUTER, Provider, cancel_scope
+from utils.llm_scheduler import LLM_SCHEDULER, PRIORITY_BATCH, PRIORITY_INTERACTIVE, RequestCancelled
+from utils.paper_id import base_id
+from utils.prompt_preflight import (
+    PreflightResult, count_tokens, get_model_limits, input_budget,
+    normalize_latex, preflight, split_sentences
+)
+
+
+# 批量生成摘要时的默认并发请求数
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# 打包请求中每篇论文预留的输出 token 数（与单篇请求的 max_tokens 一致）
+PACKED_OUTPUT_TOKENS_PER_PAPER = 800
+
+# 单个打包请求最多包含的论文数（过多会降低每篇摘要的质量）
+MAX_PACK_SIZE = 8
+
+# 打包请求中解析失败的论文重新打包发送的轮数，之后改为逐篇单独请求
+PACK_RETRY_ROUNDS = 1
+
+# 打包请求的指令和每篇论文的标记（系统提示词只发送一次）
+_PACK_INSTRUCTION = (
+    "请按系统提示词的要求分别分析以下 {count} 篇论文摘要，每篇独立输出完整结果。\n"
+    "每篇结果必须以单独一行的 [[SUMMARY 论文ID]] 开头、以单独一行的 [[END 论文ID]] 结尾，"
+    "论文ID 与输入中的标记完全一致，标记之外不要输出其他内容。\n\n{papers}"
+)
+_PACK_PAPER = "[[PAPER {label}]]\n{abstract}\n"
+
+# 单篇摘要请求的用户消息前缀
+_SUMMARY_REQUEST = "请分析以下论文摘要：\n\n"
+
+# 由其他语言的已有摘要派生时（翻译）的最大输出 token 数，以及翻译提示词
+TRANSLATE_MAX_TOKENS = 600
+_TRANSLATE_PROMPT = (
+    "你是专业的科研论文翻译。请把用户提供的论文解读从{source}翻译成{target}，"
+    "保持原有的 Markdown 结构、图标和编号，标题也译为{target}，只输出译文。"
+)
+
+# 一次请求生成所有语言摘要的指令（系统提示词使用英文版，规定输出结构）
+_MULTILANG_INSTRUCTION = (
+    "请按系统提示词的结构分析以下论文摘要，分别用这些语言各输出一份完整结果（标题也使用对应语言）：{languages}。\n"
+    "每种语言的结果必须以单独一行的 [[LANG 语言代码]] 开头、以单独一行的 [[END 语言代码]] 结尾，"
+    "语言代码与上面列出的完全一致，标记之外不要输出其他内容。\n\n{abstract}"
+)
+_LANG_SECTION = re.compile(
+    r'^[ \t>*#]*\[\[LANG\s+([^\]\n]+?)\s*\]\][ \t*]*\n(.*?)^[ \t>*#]*\[\[END\s+\1\s*\]\]',
+    re.MULTILINE | re.DOTALL
+)
+
+# 解析打包响应：开始和结束标记中的论文 ID 必须一致，缺少结束标记（如输出被截断）视为解析失败
+_PACK_SECTION = re.compile(
+    r'^[ \t>*#]*\[\[SUMMARY\s+([^\]\n]+?)\s*\]\][ \t*]*\n(.*?)^[ \t>*#]*\[\[END\s+\1\s*\]\]',
+    re.MULTILINE | re.DOTALL
+)
+
+# 离线抽取式摘要：要点句数、TextRank 迭代参数
+EXTRACTIVE_KEY_SENTENCES = 2
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MAX_ITERATIONS = 20
+TEXTRANK_TOLERANCE = 1e-3
+
+_WORD = re.compile(r"[a-z][a-z0-9\-]+")
+
+# 计算句子相似度时忽略的常见词
+_STOPWORDS = frozenset("""
+a an the and or but of to in on for with by from as at into over under than then that this these those
+is are was were be been being has have had do does did can could may might will would should shall
+we our us it its they their them which who whom whose what when where while also such both each
+not no nor only very more most less other however thus therefore here there via using based
+""".split())
+
+# 方法句和结果句的提示词
+_METHOD_CUES = re.compile(
+    r'\b(we (propose|present|introduce|develop|design|formulate)|our (method|approach|framework|model|system)'
+    r'|(novel|new) (method|approach|framework|architecture|model|algorithm))\b',
+    re.IGNORECASE
+)
+_RESULT_CUES = re.compile(
+    r'\b(outperform\w*|surpass\w*|achiev\w*|state-of-the-art|sota|improv\w*|reduc\w*'
+    r'|(experiments|results|evaluations?) (show|demonstrate|indicate|confirm)\w*)\b|\d+(\.\d+)?\s?(%|x\b|×)',
+    re.IGNORECASE
+)
+
+# 提示词命中时的得分加成，以及靠前句子的位置加成
+CUE_BONUS = 0.25
+POSITION_BONUS = 0.3
 
 
 class LLMSummarizeError(Exception):
@@ -13,79 +107,991 @@ class LLMSummarizeError(Exception):
     pass
 
 
+@dataclass
+class SummaryResult:
+    """批量摘要中单篇论文的结果"""
+    index: int                      # 在输入列表中的位置
+    arxiv_id: str                   # 论文 ID
+    summary: Optional[str] = None   # 生成的摘要，失败时为 None（退回离线摘要时为离线抽取式摘要）
+    error: Optional[str] = None     # 失败原因（退回离线摘要时为 LLM 的错误）
+    offline: bool = False           # summary 是否为 LLM 失败后退回的离线抽取式摘要
+    
+    @property
+    def ok(self) -> bool:
+        """LLM 是否成功生成了摘要（离线摘要不算成功）"""
+        return self.error is None
+
+
+def _summary_cache_key(
+    abstract: str,
+    arxiv_id: str,
+    base_url: str,
+    model: str,
+    lang: str,
+    system_prompt: Optional[str] = None
+) -> str:
+    """计算摘要缓存键（与 summarize_abstract 使用的模型、地址和提示词保持一致）"""
+    return summary_cache.make_key(
+        arxiv_id=arxiv_id,
+        abstract=abstract,
+        lang=lang,
+        model=model.strip() if model else "gpt-3.5-turbo",
+        base_url=base_url.strip() if base_url else "https://api.openai.com/v1",
+        system_prompt=get_llm_system_prompt(lang) if system_prompt is None else system_prompt
+    )
+
+
+def _multilang_cache_key(abstract: str, arxiv_id: str, base_url: str, model: str, lang: str) -> str:
+    """summarize_all_languages 写入的缓存键：按实际使用的英文系统提示词和多语言指令计算"""
+    return _summary_cache_key(
+        abstract, arxiv_id, base_url, model, lang,
+        system_prompt=get_llm_system_prompt("en") + "\n" + _MULTILANG_INSTRUCTION
+    )
+
+
+def get_cached_summary(
+    abstract: str,
+    arxiv_id: str = "",
+    base_url: str = "https://api.openai.com/v1",
+    model: str = "gpt-3.5-turbo",
+    lang: str = "zh-CN"
+) -> Optional[str]:
+    """
+    读取已缓存的摘要，不调用 LLM（参数含义同 summarize_abstract）
+    
+    该语言没有单独生成的摘要时，使用 summarize_all_languages 一次生成的结果。
+    
+    Returns:
+        Optional[str]: 缓存的摘要，未缓存返回 None
+    """
+    if not abstract or not abstract.strip():
+        return None
+    cached = summary_cache.get_summary(_summary_cache_key(abstract, arxiv_id, base_url, model, lang))
+    if cached is None:
+        cached = summary_cache.get_summary(_multilang_cache_key(abstract, arxiv_id, base_url, model, lang))
+    return cached
+
+
+def get_partial_summary(
+    abstract: str,
+    arxiv_id: str = "",
+    base_url: str = "https://api.openai.com/v1",
+    model: str = "gpt-3.5-turbo",
+    lang: str = "zh-CN"
+) -> Optional[str]:
+    """
+    读取上次流式生成中途被打断时保存的部分摘要（参数含义同 summarize_abstract）
+    
+    Returns:
+        Optional[str]: 不完整的摘要，没有时返回 None（已有完整摘要时也返回 None）
+    """
+    if not abstract or not abstract.strip():
+        return None
+    return summary_cache.get_partial_summary(_summary_cache_key(abstract, arxiv_id, base_url, model, lang))
+
+
 def summarize_abstract(
     abstract: str,
     api_key: str,
     base_url: str = "https://api.openai.com/v1",
     model: str = "gpt-3.5-turbo",
-    lang: str = "zh-CN"
+    lang: str = "zh-CN",
+    arxiv_id: str = "",
+    timeout: float = 60.0,
+    priority: int = PRIORITY_INTERACTIVE,
+    fallback: bool = False,
+    derive: bool = False
 ) -> str:
     """
     使用 LLM 对论文摘要进行总结
     
+    相同论文、语言、模型、API 地址和系统提示词的摘要只生成一次，
+    之后所有会话直接从摘要缓存读取。
+    fallback 为 True 时，未配置 API Key 或 LLM 调用失败会改为返回离线抽取式摘要
+    （见 summarize_extractive）而不是抛出异常。
+    derive 为 True 且同一论文已有其他语言的摘要缓存时，改为把该摘要翻译成目标语言
+    （输入和输出都更短），结果同样写入目标语言的摘要缓存。
+    
     Args:
         abstract: 论文的英文摘要
         api_key: OpenAI 兼容 API 的密钥
         base_url: API 基础 URL（支持 DeepSeek、Moonshot 等兼容接口）
         model: 使用的模型名称
         lang: 输出语言 (zh-CN, zh-TW, ja, ko)
+        arxiv_id: 论文 ID（用于缓存键，可带版本号）
+        timeout: 单次请求的超时秒数
+        priority: 请求在 LLM 调度器中的优先级（见 llm_scheduler.PRIORITY_*）
+        fallback: LLM 不可用时是否退回离线抽取式摘要
+        derive: 是否优先由其他语言的已有摘要翻译得到
     
     Returns:
         str: LLM 生成的摘要
     
     Raises:
-        LLMSummarizeError: 当 API 调用失败时抛出
+        LLMSummarizeError: 当 API 调用失败（且未启用 fallback）时抛出
     """
     # 参数验证
-    if not api_key or not api_key.strip():
-        raise LLMSummarizeError("请先配置 API Key")
-    
     if not abstract or not abstract.strip():
         raise LLMSummarizeError("论文摘要为空")
     
+    model = model.strip() if model else "gpt-3.5-turbo"
+    cache_key = _summary_cache_key(abstract, arxiv_id, base_url, model, lang)
+    cached = get_cached_summary(abstract, arxiv_id, base_url, model, lang)
+    if cached is not None:
+        llm_metrics.record_cache_hit("summary", model, base_url)
+        return cached
+    
+    if not api_key or not api_key.strip():
+        if fallback:
+            return summarize_extractive(abstract, lang)
+        raise LLMSummarizeError("请先配置 API Key")
+    
     try:
-        # 创建 OpenAI 客户端（兼容其他 API）
-        client = OpenAI(
-            api_key=api_key.strip(),
-            base_url=base_url.strip() if base_url else "https://api.openai.com/v1",
-            timeout=60.0  # 设置超时时间
-        )
+        # 从客户端池获取 OpenAI 客户端（兼容其他 API，复用 HTTP 连接）
+        client = get_client(api_key, base_url, timeout)
         
-        # 根据语言获取对应的系统提示词
-        system_prompt = get_llm_system_prompt(lang)
-        
-        # 调用 Chat Completion API
-        response = client.chat.completions.create(
-            model=model.strip() if model else "gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"请分析以下论文摘要：\n\n{abstract}"}
-            ],
-            temperature=0.7,  # 适中的创造性
-            max_tokens=800    # 限制输出长度
+        # 经调度器调用 Chat Completion API（限额内排队，限流时自动重试）
+        messages, max_tokens, saved_tokens, derived = _summary_request(
+            abstract, arxiv_id, base_url, model, lang, derive
         )
+        with llm_metrics.track_call("summary_translate" if derived else "summary", model, base_url) as call:
+            call.saved_tokens = saved_tokens
+            response = LLM_SCHEDULER.run(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.3 if derived else 0.7,  # 翻译追求准确，解读适中的创造性
+                    max_tokens=max_tokens                  # 限制输出长度
+                ),
+                base_url, messages, max_tokens=max_tokens, priority=priority
+            )
+            call.set_usage(response.usage)
         
         # 提取生成的内容
         if response.choices and len(response.choices) > 0:
-            return response.choices[0].message.content
+            summary = response.choices[0].message.content
+            if summary:
+                summary_cache.put_summary(cache_key, arxiv_id, lang, model, summary)
+            return summary
         else:
             raise LLMSummarizeError("LLM 返回结果为空")
     
     except LLMSummarizeError:
         # 重新抛出已知异常
+        if fallback:
+            return summarize_extractive(abstract, lang)
         raise
     
     except Exception as e:
-        # 处理 API 调用中的各种错误
-        error_msg = str(e)
+        if fallback:
+            return summarize_extractive(abstract, lang)
+        raise _to_summarize_error(e)
+
+
+def stream_summary(
+    abstract: str,
+    api_key: str,
+    base_url: str = "https://api.openai.com/v1",
+    model: str = "gpt-3.5-turbo",
+    lang: str = "zh-CN",
+    arxiv_id: str = "",
+    timeout: float = 60.0,
+    priority: int = PRIORITY_INTERACTIVE,
+    fallback: bool = False,
+    backups: Sequence[Provider] = (),
+    derive: bool = False,
+    on_fallback: Optional[Callable[[str], None]] = None
+) -> Iterator[str]:
+    """
+    summarize_abstract 的流式版本：逐段产出 LLM 生成的文本（参数同 summarize_abstract）
+    
+    已缓存的摘要一次性产出。流结束时把完整结果写入摘要缓存；
+    中途被打断（网络中断、调用方停止读取）时已生成的部分标记为不完整后写入缓存，
+    不会被当作缓存命中（可用 get_partial_summary 读取展示），下次请求会重新生成。
+    fallback 为 True 时，未配置 API Key 或在产出任何文本之前失败会改为一次性产出离线抽取式摘要；
+    已经产出部分文本后的失败仍然抛出异常。
+    提供 backups 时请求经 LLM_ROUTER 路由：主服务商响应过慢时对冲到备用服务商、失败时切换，
+    摘要写入实际生成它的服务商和模型对应的缓存。
+    
+    Args:
+        backups: 备用服务商（按优先顺序，没有 API Key 的会被忽略）
+        derive: 是否优先由其他语言的已有摘要翻译得到
+        on_fallback: 退回离线摘要时以 LLM 的错误信息回调（调用方据此区分离线摘要，以便之后重试 LLM）
+    
+    Yields:
+        str: 新生成的文本片段
+    
+    Raises:
+        LLMSummarizeError: 当 API 调用失败时抛出
+    """
+    if not abstract or not abstract.strip():
+        raise LLMSummarizeError("论文摘要为空")
+    
+    providers = [
+        provider for provider in (Provider(base_url, api_key, model), *backups)
+        if provider.api_key and provider.api_key.strip()
+    ]
+    if fallback and not providers:
+        if on_fallback is not None:
+            on_fallback("请先配置 API Key")
+        yield summarize_extractive(abstract, lang)
+        return
+    
+    def open_stream(provider: Provider) -> Iterator[str]:
+        return _stream_llm_summary(
+            abstract, provider.api_key, provider.base_url, provider.model, lang, arxiv_id, timeout, priority, derive
+        )
+    
+    produced = False
+    if len(providers) > 1 and get_cached_summary(
+        abstract, arxiv_id, providers[0].base_url, providers[0].model, lang
+    ) is None:
+        chunks = LLM_ROUTER.stream(open_stream, providers, error_type=LLMSummarizeError)
+    else:
+        chunks = open_stream(providers[0] if providers else Provider(base_url, api_key, model))
+    try:
+        for delta in chunks:
+            produced = True
+            yield delta
+    except LLMSummarizeError as e:
+        if not fallback or produced:
+            raise
+        if on_fallback is not None:
+            on_fallback(str(e))
+        yield summarize_extractive(abstract, lang)
+    finally:
+        # 调用方提前停止读取时立即关闭内层生成器（释放连接、写入部分结果）
+        chunks.close()
+
+
+def _stream_llm_summary(
+    abstract: str,
+    api_key: str,
+    base_url: str,
+    model: str,
+    lang: str,
+    arxiv_id: str,
+    timeout: float,
+    priority: int,
+    derive: bool = False
+) -> Iterator[str]:
+    """stream_summary 的 LLM 流式调用部分（不含离线兜底）"""
+    model = model.strip() if model else "gpt-3.5-turbo"
+    cache_key = _summary_cache_key(abstract, arxiv_id, base_url, model, lang)
+    cached = get_cached_summary(abstract, arxiv_id, base_url, model, lang)
+    if cached is not None:
+        llm_metrics.record_cache_hit("summary_stream", model, base_url)
+        yield cached
+        return
+    
+    if not api_key or not api_key.strip():
+        raise LLMSummarizeError("请先配置 API Key")
+    
+    messages, max_tokens, saved_tokens, derived = _summary_request(
+        abstract, arxiv_id, base_url, model, lang, derive
+    )
+    parts: List[str] = []
+    complete = False
+    stream = None
+    lost = None
+    try:
+        client = get_client(api_key, base_url, timeout)
+        operation = "summary_translate_stream" if derived else "summary_stream"
+        with llm_metrics.track_call(operation, model, base_url) as call:
+            call.saved_tokens = saved_tokens
+            # 经 LLM_ROUTER 路由时，另一服务商胜出后立即取消：还在调度器中排队的请求直接退出队列，
+            # 已发出的请求断开连接（不必等到首个片段）
+            settle = None
+            try:
+                with cancel_scope(lambda: abort_stream(stream)) as lost:
+                    stream, settle = LLM_SCHEDULER.run_stream(
+                        lambda: client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            temperature=0.3 if derived else 0.7,
+                            max_tokens=max_tokens,
+                            stream=True,
+                            stream_options={"include_usage": True}  # 流结束时返回 usage
+                        ),
+                        base_url, messages, max_tokens=max_tokens, priority=priority,
+                        cancelled=lost
+                    )
+                    if lost.is_set():
+                        # 等待响应头期间落败（中断函数被调用时还没有可断开的连接）
+                        raise RequestCancelled("请求在等待响应时被取消")
+                    for chunk in stream:
+                        call.set_usage(getattr(chunk, "usage", None))
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            call.first_token()
+                            parts.append(delta)
+                            yield delta
+            except Exception:
+                # 落败被断开连接时记为 interrupted，而不是调用错误
+                if lost is not None and lost.is_set():
+                    call.error = "interrupted"
+                raise
+            finally:
+                if settle is not None:
+                    # 部分服务商的流式接口不返回 usage，此时按文本估算
+                    if not call.prompt_tokens:
+                        call.estimate_usage(_messages_text(messages), "".join(parts))
+                    # 流关闭时用最终用量（或估算值）修正调度器中按 max_tokens 预留的 TPM
+                    settle(call.prompt_tokens + call.completion_tokens)
+        complete = True
         
-        if "401" in error_msg or "Unauthorized" in error_msg:
-            raise LLMSummarizeError("API Key 无效，请检查配置")
-        elif "429" in error_msg or "rate limit" in error_msg.lower():
-            raise LLMSummarizeError("API 调用频率过高，请稍后重试")
-        elif "timeout" in error_msg.lower():
-            raise LLMSummarizeError("API 请求超时，请检查网络连接")
-        elif "connection" in error_msg.lower():
-            raise LLMSummarizeError("无法连接到 API 服务器，请检查 Base URL 配置")
+        if not parts:
+            raise LLMSummarizeError("LLM 返回结果为空")
+    
+    except LLMSummarizeError:
+        raise
+    
+    except Exception as e:
+        raise _to_summarize_error(e)
+    
+    finally:
+        # 提前停止读取时关闭响应，释放连接（服务端随之停止生成）
+        if stream is not None:
+            stream.close()
+        # 被打断时已生成的部分标记为不完整后写入（不作为缓存命中，见 get_partial_summary）；
+        # 在对冲中落败的请求的内容直接丢弃
+        if parts and not (lost is not None and lost.is_set()):
+            summary_cache.put_summary(cache_key, arxiv_id, lang, model, "".join(parts), complete=complete)
+
+
+def _summary_messages(abstract: str, lang: str, model: str) -> Tuple[List[dict], PreflightResult]:
+    """
+    构造摘要请求的消息列表（系统提示词按语言选择）
+    
+    摘要先经过输入预检：规范化 LaTeX、去掉样板句子，超出模型上下文时在句子边界截断。
+    
+    Returns:
+        Tuple[List[dict], PreflightResult]: (消息列表, 预检结果)
+    """
+    system_prompt = get_llm_system_prompt(lang)
+    checked = preflight(abstract, model, input_budget(model, system_prompt + _SUMMARY_REQUEST, 800))
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": _SUMMARY_REQUEST + checked.text}
+    ], checked
+
+
+def _summary_request(
+    abstract: str,
+    arxiv_id: str,
+    base_url: str,
+    model: str,
+    lang: str,
+    derive: bool
+) -> Tuple[List[dict], int, int, bool]:
+    """
+    构造单篇摘要请求：derive 为 True 且有其他语言的已有摘要时改为翻译请求
+    
+    Returns:
+        Tuple[List[dict], int, int, bool]: (消息列表, 最大输出 token 数, 预检节省的 token 数, 是否为翻译请求)
+    """
+    source = _find_source_summary(abstract, arxiv_id, base_url, model, lang) if derive else None
+    if source is not None:
+        source_lang, summary = source
+        return _translate_messages(summary, source_lang, lang), TRANSLATE_MAX_TOKENS, 0, True
+    messages, checked = _summary_messages(abstract, lang, model)
+    return messages, 800, checked.saved_tokens, False
+
+
+def _find_source_summary(
+    abstract: str,
+    arxiv_id: str,
+    base_url: str,
+    model: str,
+    lang: str
+) -> Optional[Tuple[str, str]]:
+    """
+    查找同一论文在相同模型和 API 地址下其他语言的已有摘要（按 SUPPORTED_LANGUAGES 的顺序）
+    
+    Returns:
+        Optional[Tuple[str, str]]: (来源语言, 摘要)，没有时返回 None
+    """
+    for source_lang in SUPPORTED_LANGUAGES:
+        if source_lang == lang:
+            continue
+        summary = get_cached_summary(abstract, arxiv_id, base_url, model, source_lang)
+        if summary:
+            return source_lang, summary
+    return None
+
+
+def _translate_messages(summary: str, source_lang: str, target_lang: str) -> List[dict]:
+    """构造把已有摘要从 source_lang 翻译成 target_lang 的消息列表"""
+    return [
+        {"role": "system", "content": _TRANSLATE_PROMPT.format(
+            source=SUPPORTED_LANGUAGES.get(source_lang, source_lang),
+            target=SUPPORTED_LANGUAGES.get(target_lang, target_lang)
+        )},
+        {"role": "user", "content": summary}
+    ]
+
+
+def summarize_all_languages(
+    abstract: str,
+    api_key: str,
+    base_url: str = "https://api.openai.com/v1",
+    model: str = "gpt-3.5-turbo",
+    arxiv_id: str = "",
+    timeout: float = 120.0,
+    priority: int = PRIORITY_INTERACTIVE
+) -> Dict[str, str]:
+    """
+    一次请求生成 SUPPORTED_LANGUAGES 中所有语言的摘要
+    
+    已缓存的语言直接读取，其余语言合并到一个请求中（论文摘要只发送一次），
+    结果按语言分别写入摘要缓存（缓存键按实际使用的共用提示词计算，见 _multilang_cache_key），
+    之后切换语言或单独请求某种语言时直接命中。
+    
+    Args:
+        abstract: 论文的英文摘要
+        api_key: OpenAI 兼容 API 的密钥
+        base_url: API 基础 URL
+        model: 使用的模型名称
+        arxiv_id: 论文 ID（用于缓存键，可带版本号）
+        timeout: 请求的超时秒数（输出较长，默认比单篇更长）
+        priority: 请求在 LLM 调度器中的优先级
+    
+    Returns:
+        Dict[str, str]: {语言代码: 摘要}，模型遗漏的语言不在结果中
+    
+    Raises:
+        LLMSummarizeError: 当 API 调用失败或没有解析出任何语言时抛出
+    """
+    if not abstract or not abstract.strip():
+        raise LLMSummarizeError("论文摘要为空")
+    
+    model = model.strip() if model else "gpt-3.5-turbo"
+    results: Dict[str, str] = {}
+    missing: List[str] = []
+    for lang in SUPPORTED_LANGUAGES:
+        cached = get_cached_summary(abstract, arxiv_id, base_url, model, lang)
+        if cached is not None:
+            llm_metrics.record_cache_hit("summary_multilang", model, base_url)
+            results[lang] = cached
         else:
-            raise LLMSummarizeError(f"LLM 调用失败: {error_msg}")
+            missing.append(lang)
+    if not missing:
+        return results
+    
+    if not api_key or not api_key.strip():
+        raise LLMSummarizeError("请先配置 API Key")
+    
+    # 以英文提示词规定输出结构，各语言的标题由模型按语言翻译
+    system_prompt = get_llm_system_prompt("en")
+    max_tokens = min(get_model_limits(model)[1], 800 * len(missing) + 64)
+    languages = ", ".join(f"{lang} ({SUPPORTED_LANGUAGES[lang]})" for lang in missing)
+    instruction = _MULTILANG_INSTRUCTION.format(languages=languages, abstract="")
+    checked = preflight(abstract, model, input_budget(model, system_prompt + instruction, max_tokens))
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": _MULTILANG_INSTRUCTION.format(languages=languages, abstract=checked.text)}
+    ]
+    
+    try:
+        client = get_client(api_key, base_url, timeout)
+        with llm_metrics.track_call("summary_multilang", model, base_url) as call:
+            call.saved_tokens = checked.saved_tokens
+            response = LLM_SCHEDULER.run(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=max_tokens
+                ),
+                base_url, messages, max_tokens=max_tokens, priority=priority
+            )
+            call.set_usage(response.usage)
+    except Exception as e:
+        raise _to_summarize_error(e)
+    
+    content = response.choices[0].message.content if response.choices else ""
+    parsed = 0
+    for lang, summary in _LANG_SECTION.findall(content or ""):
+        lang, summary = lang.strip(), summary.strip()
+        if lang in missing and summary:
+            summary_cache.put_summary(
+                _multilang_cache_key(abstract, arxiv_id, base_url, model, lang), arxiv_id, lang, model, summary
+            )
+            results[lang] = summary
+            parsed += 1
+    if not parsed:
+        raise LLMSummarizeError("LLM 返回结果中没有可识别的语言分段")
+    return results
+
+
+def _messages_text(messages: List[dict]) -> str:
+    """拼接消息内容（用于估算 token 数）"""
+    return "\n".join(message["content"] for message in messages)
+
+
+def _to_summarize_error(e: Exception) -> LLMSummarizeError:
+    """将 API 调用中的各种异常转换为带提示信息的 LLMSummarizeError"""
+    error_msg = str(e)
+    
+    if "401" in error_msg or "Unauthorized" in error_msg:
+        return LLMSummarizeError("API Key 无效，请检查配置")
+    elif "429" in error_msg or "rate limit" in error_msg.lower():
+        return LLMSummarizeError("API 调用频率过高，请稍后重试")
+    elif "timeout" in error_msg.lower():
+        return LLMSummarizeError("API 请求超时，请检查网络连接")
+    elif "connection" in error_msg.lower():
+        return LLMSummarizeError("无法连接到 API 服务器，请检查 Base URL 配置")
+    else:
+        return LLMSummarizeError(f"LLM 调用失败: {error_msg}")
+
+
+def _textrank(vectors: List[Dict[str, float]]) -> List[float]:
+    """
+    TextRank：以句子 TF-IDF 向量的余弦相似度为边权迭代计算句子得分
+    
+    Args:
+        vectors: 每个句子的 TF-IDF 向量（已归一化）
+    
+    Returns:
+        List[float]: 每个句子的得分
+    """
+    n = len(vectors)
+    # 倒排表：每个词只与同样含有该词的句子产生相似度
+    postings: Dict[str, List[Tuple[int, float]]] = {}
+    for i, vector in enumerate(vectors):
+        for term, value in vector.items():
+            postings.setdefault(term, []).append((i, value))
+    weights = [[0.0] * n for _ in range(n)]
+    for entries in postings.values():
+        for a, (i, value_i) in enumerate(entries):
+            for j, value_j in entries[a + 1:]:
+                weights[i][j] += value_i * value_j
+                weights[j][i] += value_i * value_j
+    out_sums = [sum(row) for row in weights]
+    
+    # incoming[i]: 指向句子 i 的边（来源句子, 转移概率），只保留非零边
+    incoming = []
+    for i in range(n):
+        sources = [j for j in range(n) if weights[j][i]]
+        incoming.append((sources, [weights[j][i] / out_sums[j] for j in sources]))
+    
+    base = (1 - TEXTRANK_DAMPING) / n
+    scores = [1.0 / n] * n
+    for _ in range(TEXTRANK_MAX_ITERATIONS):
+        updated = [
+            base + TEXTRANK_DAMPING * sum(map(mul, probabilities, map(scores.__getitem__, sources)))
+            for sources, probabilities in incoming
+        ]
+        delta = sum(map(abs, map(sub, updated, scores)))
+        scores = updated
+        if delta < TEXTRANK_TOLERANCE:
+            break
+    return scores
+
+
+def summarize_extractive(abstract: str, lang: str = "zh-CN") -> str:
+    """
+    离线抽取式摘要：不调用 LLM，只在本地从摘要中挑选原文句子
+    
+    句子按 TF-IDF + TextRank 得分排序（靠前的句子和含方法 / 结果提示词的句子有加成），
+    输出若干要点句，并单独标出最能代表方法和结果的句子。纯 CPU 计算，单篇耗时在毫秒以内，
+    用作没有配置 API Key 或 LLM 服务不可用时的兜底；结果不写入摘要缓存。
+    
+    Args:
+        abstract: 论文的英文摘要
+        lang: 界面语言（只影响标题，句子保持原文）
+    
+    Returns:
+        str: Markdown 格式的抽取式摘要
+    
+    Raises:
+        LLMSummarizeError: 摘要为空时抛出
+    """
+    if not abstract or not abstract.strip():
+        raise LLMSummarizeError("论文摘要为空")
+    
+    sentences = split_sentences(normalize_latex(abstract))
+    term_counts = [Counter(w for w in _WORD.findall(s.lower()) if w not in _STOPWORDS) for s in sentences]
+    
+    # 句子级 IDF：只在少数句子中出现的词更能区分句子
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+    vectors = []
+    for counts in term_counts:
+        vector = {
+            term: count * math.log(1 + len(sentences) / document_frequency[term])
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        vectors.append({term: value / norm for term, value in vector.items()})
+    
+    ranks = _textrank(vectors) if len(sentences) > 1 else [1.0]
+    is_method = [bool(_METHOD_CUES.search(s)) for s in sentences]
+    is_result = [bool(_RESULT_CUES.search(s)) for s in sentences]
+    scores = [
+        rank * (1 + POSITION_BONUS / (i + 1) + CUE_BONUS * (is_method[i] + is_result[i]))
+        for i, rank in enumerate(ranks)
+    ]
+    
+    def best(candidates: List[int]) -> Optional[int]:
+        return max(candidates, key=lambda i: scores[i]) if candidates else None
+    
+    method = best([i for i in range(len(sentences)) if is_method[i]])
+    result = best([i for i in range(len(sentences)) if is_result[i] and i != method])
+    highlighted = {method, result}
+    key_points = sorted(
+        sorted((i for i in range(len(sentences)) if i not in highlighted), key=lambda i: -scores[i])
+        [:EXTRACTIVE_KEY_SENTENCES]
+    )
+    
+    blocks = [f"*{get_text('offline_summary_note', lang)}*"]
+    if key_points:
+        blocks.append(f"**{get_text('offline_key_points', lang)}**\n" + "\n".join(f"- {sentences[i]}" for i in key_points))
+    if method is not None:
+        blocks.append(f"**{get_text('offline_method', lang)}** {sentences[method]}")
+    if result is not None:
+        blocks.append(f"**{get_text('offline_results', lang)}** {sentences[result]}")
+    return "\n\n".join(blocks)
+
+
+def summarize_batch(
+    abstracts: List[str],
+    api_key: str,
+    base_url: str = "https://api.openai.com/v1",
+    model: str = "gpt-3.5-turbo",
+    lang: str = "zh-CN",
+    arxiv_ids: Optional[List[str]] = None,
+    max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+    timeout: float = 60.0,
+    on_complete: Optional[Callable[[SummaryResult, int], None]] = None,
+    priority: int = PRIORITY_BATCH,
+    fallback: bool = False,
+    derive: bool = False
+) -> List[SummaryResult]:
+    """
+    并发地为多篇论文生成摘要
+    
+    请求在线程池中以有限并发执行，单篇失败不影响其他论文；
+    on_complete 在调用方线程中按完成顺序回调（可以安全地更新 Streamlit 进度条）。
+    
+    Args:
+        abstracts: 论文摘要列表
+        api_key: OpenAI 兼容 API 的密钥
+        base_url: API 基础 URL
+        model: 使用的模型名称
+        lang: 输出语言
+        arxiv_ids: 与 abstracts 一一对应的论文 ID（用于缓存键），可省略
+        max_workers: 最大并发请求数
+        timeout: 单次请求的超时秒数
+        on_complete: 每篇完成时的回调 (结果, 已完成数量)
+        priority: 请求在 LLM 调度器中的优先级（默认低于用户单独点击的请求）
+        fallback: LLM 失败时是否退回离线抽取式摘要（结果的 offline 为 True，error 保留 LLM 的错误）
+        derive: 是否优先由其他语言的已有摘要翻译得到（见 summarize_abstract）
+    
+    Returns:
+        List[SummaryResult]: 与输入顺序一致的结果列表
+    """
+    if not abstracts:
+        return []
+    
+    arxiv_ids = arxiv_ids or [""] * len(abstracts)
+    results: List[Optional[SummaryResult]] = [None] * len(abstracts)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(abstracts)))) as executor:
+        futures = {
+            executor.submit(
+                summarize_abstract,
+                abstract=abstract,
+                api_key=api_key,
+                base_url=base_url,
+                model=model,
+                lang=lang,
+                arxiv_id=arxiv_id,
+                timeout=timeout,
+                priority=priority,
+                derive=derive
+            ): index
+            for index, (abstract, arxiv_id) in enumerate(zip(abstracts, arxiv_ids))
+        }
+        
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            result = SummaryResult(index=index, arxiv_id=arxiv_ids[index])
+            try:
+                result.summary = future.result()
+            except LLMSummarizeError as e:
+                result.error = str(e)
+            except Exception as e:
+                result.error = f"LLM 调用失败: {e}"
+            if fallback and result.error is not None and (abstracts[index] or "").strip():
+                result.summary, result.offline = summarize_extractive(abstracts[index], lang), True
+            
+            results[index] = result
+            if on_complete is not None:
+                on_complete(result, done)
+    
+    return results
+
+
+def _plan_packs(abstracts: List[str], model: str, lang: str) -> List[List[int]]:
+    """
+    按模型的上下文窗口和最大输出把论文分组
+    
+    每组的「系统提示词 + 指令 + 所有摘要 + 预留输出」不超过上下文窗口，
+    预留输出不超过模型的最大输出 token 数，且每组最多 MAX_PACK_SIZE 篇。
+    
+    Returns:
+        List[List[int]]: 每组论文在 abstracts 中的下标
+    """
+    context_window, max_output = get_model_limits(model)
+    budget = context_window - count_tokens(get_llm_system_prompt(lang) + _PACK_INSTRUCTION, model)
+    max_papers = max(1, min(MAX_PACK_SIZE, max_output // PACKED_OUTPUT_TOKENS_PER_PAPER))
+    
+    packs: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, abstract in enumerate(abstracts):
+        cost = count_tokens(abstract, model) + PACKED_OUTPUT_TOKENS_PER_PAPER + 16
+        if current and (len(current) >= max_papers or used + cost > budget):
+            packs.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _pack_labels(arxiv_ids: List[str]) -> List[str]:
+    """为打包请求中的论文生成互不相同的标记（优先使用基础编号，缺失或重复时用序号）"""
+    labels: List[str] = []
+    for position, arxiv_id in enumerate(arxiv_ids, start=1):
+        label = base_id(arxiv_id) if arxiv_id else ""
+        if not label or label.lower() in (existing.lower() for existing in labels):
+            label = f"#{position}"
+        labels.append(label)
+    return labels
+
+
+def parse_packed_response(text: str) -> Dict[str, str]:
+    """
+    解析打包请求的响应
+    
+    Args:
+        text: LLM 返回的完整文本
+    
+    Returns:
+        Dict[str, str]: {论文标记（基础编号，小写）: 该论文的摘要}，只包含标记完整且内容非空的论文
+    """
+    sections: Dict[str, str] = {}
+    for match in _PACK_SECTION.finditer(text):
+        summary = match.group(2).strip()
+        if summary:
+            sections[base_id(match.group(1)).lower()] = summary
+    return sections
+
+
+def _summarize_pack(
+    abstracts: List[str],
+    labels: List[str],
+    api_key: str,
+    base_url: str,
+    model: str,
+    lang: str,
+    timeout: float,
+    priority: int
+) -> Dict[str, str]:
+    """
+    发送一个打包请求
+    
+    Returns:
+        Dict[str, str]: parse_packed_response 的解析结果
+    
+    Raises:
+        LLMSummarizeError: 当 API 调用失败时抛出
+    """
+    checked = [preflight(abstract, model) for abstract in abstracts]
+    papers = "\n".join(
+        _PACK_PAPER.format(label=label, abstract=result.text)
+        for label, result in zip(labels, checked)
+    )
+    _, max_output = get_model_limits(model)
+    max_tokens = min(max_output, PACKED_OUTPUT_TOKENS_PER_PAPER * len(abstracts) + 64)
+    messages = [
+        {"role": "system", "content": get_llm_system_prompt(lang)},
+        {"role": "user", "content": _PACK_INSTRUCTION.format(count=len(abstracts), papers=papers)}
+    ]
+    try:
+        client = get_client(api_key, base_url, timeout)
+        with llm_metrics.track_call("summary_pack", model, base_url) as call:
+            call.saved_tokens = sum(result.saved_tokens for result in checked)
+            response = LLM_SCHEDULER.run(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=max_tokens
+                ),
+                base_url, messages, max_tokens=max_tokens, priority=priority
+            )
+            call.set_usage(response.usage)
+    except Exception as e:
+        raise _to_summarize_error(e)
+    
+    if not response.choices or not response.choices[0].message.content:
+        return {}
+    return parse_packed_response(response.choices[0].message.content)
+
+
+def summarize_packed(
+    abstracts: List[str],
+    api_key: str,
+    base_url: str = "https://api.openai.com/v1",
+    model: str = "gpt-3.5-turbo",
+    lang: str = "zh-CN",
+    arxiv_ids: Optional[List[str]] = None,
+    max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+    timeout: float = 120.0,
+    on_complete: Optional[Callable[[SummaryResult, int], None]] = None,
+    priority: int = PRIORITY_BATCH,
+    fallback: bool = False,
+    derive: bool = False
+) -> List[SummaryResult]:
+    """
+    把多篇论文打包进同一个请求生成摘要（参数和返回值同 summarize_batch）
+    
+    系统提示词每个请求只发送一次，请求数和输入 token 数都按打包数量成倍减少。
+    每组的论文数按模型的上下文窗口和最大输出自动调整（见 _plan_packs）；
+    响应按 [[SUMMARY ID]] ... [[END ID]] 标记拆分，只有解析失败的论文会重新发送：
+    先重新打包 PACK_RETRY_ROUNDS 轮，仍失败的再逐篇单独请求。
+    生成的摘要与单篇请求共用摘要缓存。启用 fallback 时，最终失败的论文（空摘要除外）
+    改为离线抽取式摘要（offline 为 True，error 保留 LLM 的错误）。启用 derive 时，已有其他语言摘要的论文先逐篇翻译，
+    翻译失败的论文再参与打包。
+    """
+    if not abstracts:
+        return []
+    
+    arxiv_ids = arxiv_ids or [""] * len(abstracts)
+    model = model.strip() if model else "gpt-3.5-turbo"
+    results: List[Optional[SummaryResult]] = [None] * len(abstracts)
+    done = 0
+    
+    def finish(result: SummaryResult) -> None:
+        nonlocal done
+        if fallback and result.error is not None and (abstracts[result.index] or "").strip():
+            result.summary, result.offline = summarize_extractive(abstracts[result.index], lang), True
+        done += 1
+        results[result.index] = result
+        if on_complete is not None:
+            on_complete(result, done)
+    
+    # 空摘要和已缓存的论文不进入请求
+    pending: List[int] = []
+    for index, abstract in enumerate(abstracts):
+        if not abstract or not abstract.strip():
+            finish(SummaryResult(index=index, arxiv_id=arxiv_ids[index], error="论文摘要为空"))
+            continue
+        cached = get_cached_summary(abstract, arxiv_ids[index], base_url, model, lang)
+        if cached is not None:
+            llm_metrics.record_cache_hit("summary_pack", model, base_url)
+            finish(SummaryResult(index=index, arxiv_id=arxiv_ids[index], summary=cached))
+        else:
+            pending.append(index)
+    
+    if pending and (not api_key or not api_key.strip()):
+        for index in pending:
+            finish(SummaryResult(index=index, arxiv_id=arxiv_ids[index], error="请先配置 API Key"))
+        pending = []
+    
+    # 已有其他语言摘要的论文翻译即可，比重新生成更省 token
+    derivable = [
+        index for index in pending
+        if derive and _find_source_summary(abstracts[index], arxiv_ids[index], base_url, model, lang) is not None
+    ]
+    if derivable:
+        untranslated: List[int] = []
+        
+        def finish_translated(result: SummaryResult, _: int) -> None:
+            index = derivable[result.index]
+            if result.ok:
+                finish(SummaryResult(index=index, arxiv_id=result.arxiv_id, summary=result.summary))
+            else:
+                untranslated.append(index)
+        
+        summarize_batch(
+            abstracts=[abstracts[i] for i in derivable],
+            api_key=api_key,
+            base_url=base_url,
+            model=model,
+            lang=lang,
+            arxiv_ids=[arxiv_ids[i] for i in derivable],
+            max_workers=max_workers,
+            timeout=timeout,
+            priority=priority,
+            on_complete=finish_translated,
+            derive=True
+        )
+        pending = sorted(set(pending) - set(derivable) | set(untranslated))
+    
+    for _ in range(PACK_RETRY_ROUNDS + 1):
+        if len(pending) < 2:
+            break
+        
+        packs = [
+            [pending[i] for i in pack]
+            for pack in _plan_packs([abstracts[i] for i in pending], model, lang)
+        ]
+        failed: List[int] = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(packs)))) as executor:
+            futures = {}
+            for pack in packs:
+                labels = _pack_labels([arxiv_ids[i] for i in pack])
+                future = executor.submit(
+                    _summarize_pack,
+                    [abstracts[i] for i in pack], labels, api_key, base_url, model, lang, timeout, priority
+                )
+                futures[future] = (pack, labels)
+            
+            for future in as_completed(futures):
+                pack, labels = futures[future]
+                try:
+                    sections = future.result()
+                except LLMSummarizeError as e:
+                    for index in pack:
+                        finish(SummaryResult(index=index, arxiv_id=arxiv_ids[index], error=str(e)))
+                    continue
+                
+                for index, label in zip(pack, labels):
+                    summary = sections.get(label.lower())
+                    if summary is None:
+                        failed.append(index)
+                        continue
+                    summary_cache.put_summary(
+                        _summary_cache_key(abstracts[index], arxiv_ids[index], base_url, model, lang),
+                        arxiv_ids[index], lang, model, summary
+                    )
+                    finish(SummaryResult(index=index, arxiv_id=arxiv_ids[index], summary=summary))
+        pending = sorted(failed)
+    
+    # 多轮打包仍未解析出的论文逐篇单独请求
+    if pending:
+        summarize_batch(
+            abstracts=[abstracts[i] for i in pending],
+            api_key=api_key,
+            base_url=base_url,
+            model=model,
+            lang=lang,
+            arxiv_ids=[arxiv_ids[i] for i in pending],
+            max_workers=max_workers,
+            timeout=timeout,
+            priority=priority,
+            on_complete=lambda result, _: finish(SummaryResult(
+                index=pending[result.index],
+                arxiv_id=result.arxiv_id,
+                summary=result.summary,
+                error=result.error
+            ))
+        )
+    
+    return results
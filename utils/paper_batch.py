@@ -0,0 +1,164 @@
+"""
+列式论文批量存储模块
+将大量论文按列保存在紧凑的数组中（作者、分类用全局字典表编号），
+适合在内存中长期保留 10 万级以上的历史论文，用于检索和趋势统计
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from utils.arxiv_fetcher import Paper
+
+
+# 标准 ArXiv 链接前缀：链接可由 ID 推导时不单独保存
+ARXIV_ABS_PREFIX = "http://arxiv.org/abs/"
+
+
+class PaperBatch:
+    """
+    列式论文集合
+
+    - 标题、摘要、ID 各占一个列表
+    - 发布日期压缩为 YYYYMMDD 整数数组
+    - 作者和分类保存为字典表编号 + 偏移量数组（CSR 结构），重复姓名只存一份
+    - 代码链接、期刊出处和非标准 URL 稀疏存储
+    """
+
+    def __init__(self):
+        self.arxiv_ids: List[str] = []
+        self.titles: List[str] = []
+        self.abstracts: List[str] = []
+        self.published = array("I")                 # YYYYMMDD
+
+        self.author_names: List[str] = []           # 作者字典表
+        self._author_index: Dict[str, int] = {}
+        self.author_ids = array("I")
+        self.author_offsets = array("I", [0])
+
+        self.category_names: List[str] = []         # 分类字典表
+        self._category_index: Dict[str, int] = {}
+        self.category_ids = array("H")
+        self.category_offsets = array("I", [0])
+
+        self.code_urls: Dict[int, Tuple[str, ...]] = {}
+        self.extra_urls: Dict[int, str] = {}
+        self.journal_refs: Dict[int, str] = {}
+
+    @classmethod
+    def from_papers(cls, papers: Iterable[Paper]) -> "PaperBatch":
+        """由 Paper 序列构建列式集合"""
+        batch = cls()
+        batch.extend(papers)
+        return batch
+
+    @staticmethod
+    def _lookup(name: str, table: List[str], index: Dict[str, int]) -> int:
+        """获取字典表编号，不存在时追加"""
+        idx = index.get(name)
+        if idx is None:
+            idx = index[name] = len(table)
+            table.append(name)
+        return idx
+
+    def append(self, paper: Paper) -> None:
+        """追加一篇论文"""
+        row = len(self.arxiv_ids)
+        self.arxiv_ids.append(paper.arxiv_id)
+        self.titles.append(paper.title)
+        self.abstracts.append(paper.abstract)
+        self.published.append(int(paper.published.replace("-", "")))
+
+        self.author_ids.extend(
+            self._lookup(a, self.author_names, self._author_index) for a in paper.authors
+        )
+        self.author_offsets.append(len(self.author_ids))
+
+        self.category_ids.extend(
+            self._lookup(c, self.category_names, self._category_index) for c in paper.categories
+        )
+        self.category_offsets.append(len(self.category_ids))
+
+        if paper.code_urls:
+            self.code_urls[row] = tuple(paper.code_urls)
+        if paper.url != ARXIV_ABS_PREFIX + paper.arxiv_id:
+            self.extra_urls[row] = paper.url
+        if paper.journal_ref:
+            self.journal_refs[row] = paper.journal_ref
+
+    def extend(self, papers: Iterable[Paper]) -> None:
+        """批量追加论文"""
+        for paper in papers:
+            self.append(paper)
+
+    def __len__(self) -> int:
+        return len(self.arxiv_ids)
+
+    def authors_of(self, row: int) -> Tuple[str, ...]:
+        """获取第 row 篇论文的作者"""
+        start, end = self.author_offsets[row], self.author_offsets[row + 1]
+        return tuple(self.author_names[i] for i in self.author_ids[start:end])
+
+    def categories_of(self, row: int) -> Tuple[str, ...]:
+        """获取第 row 篇论文的分类"""
+        start, end = self.category_offsets[row], self.category_offsets[row + 1]
+        return tuple(self.category_names[i] for i in self.category_ids[start:end])
+
+    def __getitem__(self, row: int) -> Paper:
+        """按行号还原为 Paper 对象"""
+        if row < 0:
+            row += len(self)
+        date = str(self.published[row])
+        return Paper(
+            title=self.titles[row],
+            authors=self.authors_of(row),
+            abstract=self.abstracts[row],
+            url=self.extra_urls.get(row, ARXIV_ABS_PREFIX + self.arxiv_ids[row]),
+            published=f"{date[:4]}-{date[4:6]}-{date[6:]}",
+            arxiv_id=self.arxiv_ids[row],
+            code_urls=self.code_urls.get(row, ()),
+            categories=self.categories_of(row),
+            journal_ref=self.journal_refs.get(row, "")
+        )
+
+    def __iter__(self) -> Iterator[Paper]:
+        for row in range(len(self)):
+            yield self[row]
+
+    # ==================== 批量查询（直接在列上计算，不还原 Paper）====================
+    def rows_in_category(self, category: str) -> List[int]:
+        """返回属于指定分类的行号"""
+        idx = self._category_index.get(category)
+        if idx is None:
+            return []
+        offsets, ids = self.category_offsets, self.category_ids
+        return [
+            row for row in range(len(self))
+            if idx in ids[offsets[row]:offsets[row + 1]]
+        ]
+
+    def rows_by_author(self, name: str) -> List[int]:
+        """返回指定作者参与的论文行号"""
+        idx = self._author_index.get(name)
+        if idx is None:
+            return []
+        offsets, ids = self.author_offsets, self.author_ids
+        return [
+            row for row in range(len(self))
+            if idx in ids[offsets[row]:offsets[row + 1]]
+        ]
+
+    def rows_published_between(self, start: str, end: str) -> List[int]:
+        """返回发布日期在 [start, end]（YYYY-MM-DD）之间的论文行号"""
+        lo, hi = int(start.replace("-", "")), int(end.replace("-", ""))
+        return [row for row, day in enumerate(self.published) if lo <= day <= hi]
+
+    def top_authors(self, n: int = 10) -> List[Tuple[str, int]]:
+        """统计发文最多的作者"""
+        counts = Counter(self.author_ids)
+        return [(self.author_names[i], c) for i, c in counts.most_common(n)]
+
+    def top_categories(self, n: int = 10) -> List[Tuple[str, int]]:
+        """统计论文最多的分类"""
+        counts = Counter(self.category_ids)
+        return [(self.category_names[i], c) for i, c in counts.most_common(n)]
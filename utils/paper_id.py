@@ -0,0 +1,61 @@
+"""
+论文标识模块
+ArXiv ID 由基础编号和版本号组成（如 2505.06002v2）。同一篇论文的各个版本共享基础编号，
+论文库、收藏夹和各类缓存统一用基础编号识别论文，版本号和内容哈希只用来判断内容是否变化
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+
+
+# 解析 ArXiv ID：可带 arXiv: 前缀和 vN 版本后缀，兼容旧式 ID（如 hep-th/9901001v1）
+_ARXIV_ID = re.compile(r'^(?:arxiv:)?(.+?)(?:v(\d+))?$', re.IGNORECASE)
+
+# 可能出现在 ID 前面的链接前缀
+_URL_PREFIX = re.compile(r'^https?://(?:export\.)?arxiv\.org/(?:abs|pdf)/', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class PaperId:
+    """规范化的论文标识：基础编号 + 版本号（0 表示未指定版本，即最新版本）"""
+    base: str
+    version: int = 0
+
+    @classmethod
+    def parse(cls, arxiv_id: str) -> "PaperId":
+        """
+        解析 ArXiv ID 或论文链接
+
+        例如 "2505.06002v2"、"arXiv:2505.06002"、"http://arxiv.org/abs/2505.06002v2"、
+        "https://arxiv.org/pdf/hep-th/9901001v1.pdf"
+        """
+        text = _URL_PREFIX.sub("", arxiv_id.strip())
+        if text.lower().endswith(".pdf"):
+            text = text[:-4]
+        match = _ARXIV_ID.match(text)
+        if not match:
+            return cls(text)
+        return cls(match.group(1), int(match.group(2) or 0))
+
+    def __str__(self) -> str:
+        return f"{self.base}v{self.version}" if self.version else self.base
+
+    @property
+    def filename(self) -> str:
+        """可用作缓存文件名的形式（旧式 ID 中的 / 替换为 _）"""
+        return str(self).replace("/", "_").replace(":", "_")
+
+
+def base_id(arxiv_id: str) -> str:
+    """获取不带版本号的基础编号"""
+    return PaperId.parse(arxiv_id).base
+
+
+def content_hash(*parts: str) -> str:
+    """计算内容指纹（用于判断派生结果能否跨版本复用）"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
@@ -0,0 +1,378 @@
+"""
+本地论文库模块
+使用 SQLite 持久化保存拉取过的论文，按 arxiv_id 去重，并按领域（查询词）建立索引，
+用于支持增量刷新：只向 ArXiv 请求比本地最新论文更新的部分；
+论文按不带版本号的基础编号保存，同一篇论文的新版本会覆盖旧版本；
+同时保存按分类批量收割（bulk_harvester）的论文，支持在本地按关键词检索
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+from utils.arxiv_fetcher import Paper
+from utils.paper_id import PaperId
+
+
+# 论文库文件路径（与 PDF 缓存同目录）
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "arxiv_daily_chef_cache")
+PAPER_DB_FILE = os.path.join(CACHE_DIR, "papers.db")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id   TEXT PRIMARY KEY,
+    title      TEXT NOT NULL,
+    authors    TEXT NOT NULL,
+    abstract   TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    published  TEXT NOT NULL,
+    code_urls  TEXT NOT NULL,
+    stored_at  REAL NOT NULL,
+    categories TEXT NOT NULL DEFAULT '[]',
+    journal_ref TEXT NOT NULL DEFAULT '',
+    version    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_papers_published ON papers (published);
+
+CREATE TABLE IF NOT EXISTS topic_papers (
+    topic     TEXT NOT NULL,
+    arxiv_id  TEXT NOT NULL,
+    PRIMARY KEY (topic, arxiv_id)
+);
+
+CREATE TABLE IF NOT EXISTS topics (
+    topic         TEXT PRIMARY KEY,
+    depth         INTEGER NOT NULL,
+    last_fetched  REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS harvests (
+    set_spec   TEXT PRIMARY KEY,
+    last_date  TEXT NOT NULL,
+    last_run   REAL NOT NULL
+);
+"""
+
+# 建库之后新增的列及其定义（旧版论文库打开时自动补齐）
+_ADDED_COLUMNS = {
+    "categories": "TEXT NOT NULL DEFAULT '[]'",
+    "journal_ref": "TEXT NOT NULL DEFAULT ''",
+    "version": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# 论文库结构版本（PRAGMA user_version）：1 表示 arxiv_id 列保存基础编号、版本号单独成列
+_SCHEMA_VERSION = 1
+
+# 读取论文时使用的列顺序（与 _row_to_paper 对应）
+_PAPER_COLUMNS = (
+    "p.arxiv_id, p.title, p.authors, p.abstract, p.url, p.published, p.code_urls, "
+    "p.categories, p.journal_ref, p.version"
+)
+
+# 本地检索时忽略的查询语法（布尔运算符和字段前缀）
+_QUERY_OPERATORS = {"and", "or", "andnot", "not"}
+_FIELD_PREFIX = re.compile(r'^[a-z]{2,4}:')
+
+
+def normalize_topic(query: str) -> str:
+    """将查询词规范化为论文库中的领域键（忽略大小写和多余空格）"""
+    return " ".join(query.lower().split())
+
+
+# 本进程中已完成建表和迁移的数据库文件（每个文件只需执行一次）
+_initialized_dbs: Set[str] = set()
+_init_lock = threading.Lock()
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
+    """启用 WAL、建表，并迁移旧版论文库"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    
+    # 旧版论文库缺少后来新增的列，就地补上
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(papers)")}
+    for column, definition in _ADDED_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE papers ADD COLUMN {column} {definition}")
+    
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+        with conn:
+            _migrate_versioned_ids(conn)
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """
+    打开论文库连接（每次调用新建连接，保证多线程 / 多进程安全）
+
+    with 块正常结束时提交、出错时回滚，退出时关闭连接；建表和迁移每个进程只执行一次
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # 数据库文件被删除（如临时目录被清理）后重新建表
+    missing = not os.path.exists(PAPER_DB_FILE)
+    conn = sqlite3.connect(PAPER_DB_FILE, timeout=30)
+    try:
+        with _init_lock:
+            if missing or PAPER_DB_FILE not in _initialized_dbs:
+                _init_db(conn)
+                _initialized_dbs.add(PAPER_DB_FILE)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _migrate_versioned_ids(conn: sqlite3.Connection) -> None:
+    """将旧版论文库中带版本号的 ID 改写为基础编号，同一论文的多个版本只保留最新的一条"""
+    for (old_id,) in conn.execute("SELECT arxiv_id FROM papers").fetchall():
+        paper_id = PaperId.parse(old_id)
+        if paper_id.base == old_id:
+            continue
+        
+        existing = conn.execute(
+            "SELECT version FROM papers WHERE arxiv_id = ?", (paper_id.base,)
+        ).fetchone()
+        if existing is not None and existing[0] >= paper_id.version:
+            conn.execute("DELETE FROM papers WHERE arxiv_id = ?", (old_id,))
+        else:
+            conn.execute("DELETE FROM papers WHERE arxiv_id = ?", (paper_id.base,))
+            conn.execute(
+                "UPDATE papers SET arxiv_id = ?, version = ? WHERE arxiv_id = ?",
+                (paper_id.base, paper_id.version, old_id)
+            )
+        
+        conn.execute(
+            "UPDATE OR IGNORE topic_papers SET arxiv_id = ? WHERE arxiv_id = ?",
+            (paper_id.base, old_id)
+        )
+        conn.execute("DELETE FROM topic_papers WHERE arxiv_id = ?", (old_id,))
+
+
+def _row_to_paper(row: tuple) -> Paper:
+    """将数据库行还原为 Paper 对象"""
+    base, title, authors, abstract, url, published, code_urls, categories, journal_ref, version = row
+    return Paper(
+        title=title,
+        authors=json.loads(authors),
+        abstract=abstract,
+        url=url,
+        published=published,
+        arxiv_id=str(PaperId(base, version)),
+        code_urls=json.loads(code_urls),
+        categories=json.loads(categories),
+        journal_ref=journal_ref
+    )
+
+
+def _upsert_papers(conn: sqlite3.Connection, papers: List[Paper], now: float) -> None:
+    """
+    写入论文记录（按基础编号去重）
+    
+    已保存的版本比写入的版本更新时保留已有内容；
+    不带版本号的记录（如批量收割结果）视为最新内容，但不会降低已知的版本号。
+    """
+    rows = []
+    for p in papers:
+        paper_id = PaperId.parse(p.arxiv_id)
+        rows.append((
+            paper_id.base, p.title, json.dumps(list(p.authors), ensure_ascii=False),
+            p.abstract, p.url, p.published,
+            json.dumps(list(p.code_urls), ensure_ascii=False), now,
+            json.dumps(list(p.categories)), p.journal_ref, paper_id.version
+        ))
+    
+    conn.executemany(
+        """
+        INSERT INTO papers
+            (arxiv_id, title, authors, abstract, url, published, code_urls, stored_at,
+             categories, journal_ref, version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (arxiv_id) DO UPDATE SET
+            title = excluded.title, authors = excluded.authors, abstract = excluded.abstract,
+            url = excluded.url, published = excluded.published, code_urls = excluded.code_urls,
+            stored_at = excluded.stored_at, categories = excluded.categories,
+            journal_ref = excluded.journal_ref, version = MAX(version, excluded.version)
+        WHERE excluded.version = 0 OR excluded.version >= papers.version
+        """,
+        rows
+    )
+
+
+def save_papers(query: str, papers: List[Paper], depth: Optional[int] = None) -> None:
+    """
+    保存一批论文并关联到指定领域
+
+    Args:
+        query: 领域查询词
+        papers: 论文列表
+        depth: 该领域从最新论文开始连续已知的论文数量；
+               为 None 时表示 papers 就是完整的最新结果
+    """
+    topic = normalize_topic(query)
+    now = time.time()
+
+    with _connect() as conn:
+        _upsert_papers(conn, papers, now)
+        conn.executemany(
+            "INSERT OR IGNORE INTO topic_papers VALUES (?, ?)",
+            [(topic, PaperId.parse(p.arxiv_id).base) for p in papers]
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO topics VALUES (?, ?, ?)",
+            (topic, len(papers) if depth is None else depth, now)
+        )
+
+
+def get_papers(query: str, limit: int = 5) -> List[Paper]:
+    """
+    读取某领域下最新的若干篇论文（按发布日期和 ID 倒序）
+
+    Args:
+        query: 领域查询词
+        limit: 最多返回的数量
+
+    Returns:
+        List[Paper]: 论文列表
+    """
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {_PAPER_COLUMNS}
+            FROM topic_papers t JOIN papers p ON p.arxiv_id = t.arxiv_id
+            WHERE t.topic = ?
+            ORDER BY p.published DESC, p.arxiv_id DESC
+            LIMIT ?
+            """,
+            (normalize_topic(query), limit)
+        ).fetchall()
+    return [_row_to_paper(row) for row in rows]
+
+
+def get_topic_state(query: str) -> Optional[dict]:
+    """
+    获取领域的增量刷新状态
+
+    Returns:
+        Optional[dict]: {"depth": 连续已知论文数, "newest": 最新发布日期,
+                         "known_ids": 已关联论文的基础编号集合, "last_fetched": 上次拉取时间}，
+                        从未拉取过返回 None
+    """
+    topic = normalize_topic(query)
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT depth, last_fetched FROM topics WHERE topic = ?", (topic,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        newest = conn.execute(
+            """
+            SELECT MAX(p.published)
+            FROM topic_papers t JOIN papers p ON p.arxiv_id = t.arxiv_id
+            WHERE t.topic = ?
+            """,
+            (topic,)
+        ).fetchone()[0]
+        known_ids = {
+            r[0] for r in conn.execute(
+                "SELECT arxiv_id FROM topic_papers WHERE topic = ?", (topic,)
+            )
+        }
+
+    return {
+        "depth": row[0],
+        "newest": newest,
+        "known_ids": known_ids,
+        "last_fetched": row[1],
+    }
+
+
+# ==================== 批量收割数据 ====================
+def save_harvested_papers(papers: List[Paper]) -> None:
+    """保存批量收割得到的论文（不关联到任何领域）"""
+    with _connect() as conn:
+        _upsert_papers(conn, papers, time.time())
+
+
+def get_harvest_date(set_spec: str) -> Optional[str]:
+    """获取某个 OAI 集合上次收割到的日期（YYYY-MM-DD），从未收割过返回 None"""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT last_date FROM harvests WHERE set_spec = ?", (set_spec,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def set_harvest_date(set_spec: str, last_date: str) -> None:
+    """记录某个 OAI 集合本次收割到的日期"""
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO harvests VALUES (?, ?, ?)",
+            (set_spec, last_date, time.time())
+        )
+
+
+def _query_terms(query: str) -> List[str]:
+    """
+    将 ArXiv 风格的查询词拆分为本地检索词
+    
+    引号内的短语作为整体，AND / OR 等运算符和 ti: / abs: 等字段前缀被忽略，
+    所有检索词按 AND 语义组合。
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query):
+        term = (phrase or word).strip("()").lower()
+        term = _FIELD_PREFIX.sub("", term)
+        if term and term not in _QUERY_OPERATORS:
+            terms.append(term)
+    return terms
+
+
+def search_papers(
+    query: str,
+    limit: int = 5,
+    categories: Optional[List[str]] = None,
+    offset: int = 0
+) -> List[Paper]:
+    """
+    在本地论文库中按关键词检索论文（标题或摘要包含全部检索词）
+    
+    Args:
+        query: 查询词（如 "Point Cloud"）
+        limit: 最多返回的数量
+        categories: 只返回属于这些分类之一的论文，为 None 时不限制
+        offset: 跳过排在前面的结果数（用于分页）
+    
+    Returns:
+        List[Paper]: 按发布日期倒序排列的论文
+    """
+    conditions, params = [], []
+    for term in _query_terms(query):
+        # 检索词中的 % 和 _ 按字面匹配
+        pattern = "%" + re.sub(r'([\\%_])', r'\\\1', term) + "%"
+        conditions.append("(p.title LIKE ? ESCAPE '\\' OR p.abstract LIKE ? ESCAPE '\\')")
+        params += [pattern, pattern]
+    if categories:
+        conditions.append("(" + " OR ".join("p.categories LIKE ?" for _ in categories) + ")")
+        params += [f'%"{c}"%' for c in categories]
+    
+    where = " AND ".join(conditions) or "1"
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {_PAPER_COLUMNS} FROM papers p
+            WHERE {where}
+            ORDER BY p.published DESC, p.arxiv_id DESC
+            LIMIT ? OFFSET ?
+            """,
+            params + [limit, offset]
+        ).fetchall()
+    return [_row_to_paper(row) for row in rows]
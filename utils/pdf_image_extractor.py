@@ -4,6 +4,7 @@ PDF 图片提取模块
 """
 
 import fitz  # PyMuPDF
+import glob
 import io
 import os
 import requests
@@ -11,6 +12,8 @@ import tempfile
 from typing import Optional, Tuple
 from PIL import Image
 import base64
+from utils.paper_id import PaperId
+from utils.rate_limiter import ARXIV_LIMITER
 
 
 # 缓存目录
@@ -43,29 +46,54 @@ def get_pdf_url_from_arxiv(arxiv_url: str) -> str:
     return arxiv_url
 
 
+def find_cached_pdf(arxiv_id: str) -> Optional[str]:
+    """
+    查找已缓存的 PDF
+    
+    带版本号的 ID 只匹配该版本；不带版本号的 ID（表示最新版本）匹配已缓存的最高版本。
+    
+    Returns:
+        Optional[str]: 缓存文件路径，未缓存返回 None
+    """
+    paper_id = PaperId.parse(arxiv_id)
+    cache_path = os.path.join(CACHE_DIR, f"{paper_id.filename}.pdf")
+    if os.path.exists(cache_path):
+        return cache_path
+    
+    if paper_id.version == 0:
+        prefix = os.path.join(CACHE_DIR, paper_id.filename)
+        versions = [
+            (PaperId.parse(os.path.basename(path)[:-4].replace("_", "/")).version, path)
+            for path in glob.glob(glob.escape(prefix) + "v*.pdf")
+        ]
+        if versions:
+            return max(versions)[1]
+    return None
+
+
 def download_pdf(pdf_url: str, arxiv_id: str) -> Optional[str]:
     """
     下载 PDF 文件到缓存目录
     
     Args:
         pdf_url: PDF 下载 URL
-        arxiv_id: ArXiv ID，用于缓存文件名
+        arxiv_id: ArXiv ID，用于缓存文件名（按规范化的「基础编号 + 版本号」命名）
     
     Returns:
         Optional[str]: 下载的 PDF 文件路径，失败返回 None
     """
     ensure_cache_dir()
     
-    # 生成缓存文件名
-    safe_id = arxiv_id.replace("/", "_").replace(":", "_")
-    cache_path = os.path.join(CACHE_DIR, f"{safe_id}.pdf")
-    
     # 如果已缓存，直接返回
-    if os.path.exists(cache_path):
-        return cache_path
+    cached = find_cached_pdf(arxiv_id)
+    if cached:
+        return cached
+    
+    cache_path = os.path.join(CACHE_DIR, f"{PaperId.parse(arxiv_id).filename}.pdf")
     
     try:
-        # 下载 PDF
+        # 下载 PDF（与 API 请求共享 ArXiv 全局限流）
+        ARXIV_LIMITER.acquire()
         response = requests.get(pdf_url, timeout=30, stream=True)
         response.raise_for_status()
         
@@ -0,0 +1,247 @@
+"""
+PDF 文本缓存模块
+使用 SQLite 持久化保存从论文 PDF 中提取的逐页文本和实验章节（zlib 压缩），所有 Streamlit 会话和进程共享；
+缓存键为 PDF 文件内容的 SHA-256，同一份 PDF 只解析一次，总大小超限时按最近最少使用淘汰
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+# PDF 文本缓存文件路径（与 PDF 缓存同目录）
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "arxiv_daily_chef_cache")
+PDF_TEXT_DB_FILE = os.path.join(CACHE_DIR, "pdf_texts.db")
+
+# 缓存总大小上限（按压缩后的字节数计算）
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+# 文本 / 章节提取逻辑变化时递增，旧缓存自然失效
+EXTRACTION_VERSION = 1
+
+# zlib 压缩级别（文本解压很快，压缩级别只影响首次写入）
+COMPRESSION_LEVEL = 6
+
+# 计算文件指纹时每次读取的字节数
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_texts (
+    key         TEXT PRIMARY KEY,
+    arxiv_id    TEXT NOT NULL,
+    page_count  INTEGER NOT NULL,
+    pages       BLOB NOT NULL,
+    sections    BLOB,
+    size        INTEGER NOT NULL,
+    raw_size    INTEGER NOT NULL,
+    created     REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_pdf_texts_last_used ON pdf_texts (last_used);
+"""
+
+
+# 进程内的文件指纹缓存：(路径, 修改时间, 大小) -> 指纹，同一文件不重复读取计算
+_digest_lock = threading.Lock()
+_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+# 本进程中已完成建表的数据库文件（每个文件只需执行一次）
+_initialized_dbs: Set[str] = set()
+_init_lock = threading.Lock()
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
+    """启用 WAL 并建表"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """
+    打开PDF 文本缓存连接（每次调用新建连接，保证多线程 / 多进程安全）
+
+    with 块正常结束时提交、出错时回滚，退出时关闭连接；建表每个进程只执行一次
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # 数据库文件被删除（如临时目录被清理）后重新建表
+    missing = not os.path.exists(PDF_TEXT_DB_FILE)
+    conn = sqlite3.connect(PDF_TEXT_DB_FILE, timeout=30)
+    try:
+        with _init_lock:
+            if missing or PDF_TEXT_DB_FILE not in _initialized_dbs:
+                _init_db(conn)
+                _initialized_dbs.add(PDF_TEXT_DB_FILE)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def _decompress(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def pdf_digest(pdf_path: str) -> str:
+    """
+    计算 PDF 文件的内容指纹（同一文件在进程内只计算一次）
+
+    Args:
+        pdf_path: PDF 文件路径
+
+    Returns:
+        str: 缓存键（文件内容的 SHA-256 + 提取逻辑版本）
+    """
+    stat = os.stat(pdf_path)
+    file_key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+    with _digest_lock:
+        cached = _digests.get(file_key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    key = f"{digest.hexdigest()}-v{EXTRACTION_VERSION}"
+    with _digest_lock:
+        _digests[file_key] = key
+    return key
+
+
+def get_pages(key: str, max_pages: int) -> Optional[List[str]]:
+    """
+    读取缓存的前 max_pages 页文本（命中时刷新最近使用时间）
+
+    Args:
+        key: pdf_digest 计算的缓存键
+        max_pages: 需要的页数
+
+    Returns:
+        Optional[List[str]]: 逐页文本；未缓存或缓存的页数不够时返回 None
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT page_count, pages FROM pdf_texts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        pages = json.loads(_decompress(row[1]))
+        if len(pages) < min(max_pages, row[0]):
+            return None
+        conn.execute(
+            "UPDATE pdf_texts SET last_used = ?, hits = hits + 1 WHERE key = ?",
+            (time.time(), key)
+        )
+    return pages[:max_pages]
+
+
+def put_pages(key: str, arxiv_id: str, pages: List[str], page_count: int) -> None:
+    """
+    写入逐页文本（替换已有的页和章节），并在总大小超过 MAX_CACHE_BYTES 时淘汰最久未使用的条目
+
+    Args:
+        key: pdf_digest 计算的缓存键
+        arxiv_id: 论文 ID（仅用于统计和排查）
+        pages: 已提取的逐页文本（从第一页开始）
+        page_count: PDF 的总页数
+    """
+    raw = json.dumps(pages, ensure_ascii=False)
+    data = _compress(raw)
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO pdf_texts
+                (key, arxiv_id, page_count, pages, sections, size, raw_size, created, last_used, hits)
+            VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?, 0)
+            """,
+            (key, arxiv_id, page_count, data, len(data), len(raw.encode("utf-8")), now, now)
+        )
+        # 从最近使用的条目开始累计大小，超出上限的部分全部删除
+        conn.execute(
+            """
+            DELETE FROM pdf_texts WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS total
+                    FROM pdf_texts
+                ) WHERE total > ?
+            )
+            """,
+            (MAX_CACHE_BYTES,)
+        )
+
+
+def get_sections(key: str) -> Optional[str]:
+    """
+    读取缓存的实验章节文本（命中时刷新最近使用时间）
+
+    Args:
+        key: pdf_digest 计算的缓存键
+
+    Returns:
+        Optional[str]: 实验章节文本，未缓存返回 None
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT sections FROM pdf_texts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        conn.execute(
+            "UPDATE pdf_texts SET last_used = ?, hits = hits + 1 WHERE key = ?",
+            (time.time(), key)
+        )
+    return _decompress(row[0])
+
+
+def put_sections(key: str, sections: str) -> None:
+    """
+    写入实验章节文本（需要先用 put_pages 写入同一 PDF 的文本，否则忽略）
+
+    Args:
+        key: pdf_digest 计算的缓存键
+        sections: extract_experiment_sections 的结果
+    """
+    data = _compress(sections)
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE pdf_texts SET sections = ?, size = LENGTH(pages) + ? WHERE key = ?",
+            (data, len(data), key)
+        )
+
+
+def get_stats() -> Dict[str, int]:
+    """
+    获取缓存统计
+
+    Returns:
+        dict: {"entries": 条目数, "bytes": 压缩后总大小, "raw_bytes": 页文本压缩前总大小,
+               "hits": 累计命中次数}
+    """
+    with _connect() as conn:
+        entries, size, raw_size, hits = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0), COALESCE(SUM(hits), 0) "
+            "FROM pdf_texts"
+        ).fetchone()
+    return {"entries": entries, "bytes": size, "raw_bytes": raw_size, "hits": hits}
+
+
+def clear() -> None:
+    """清空 PDF 文本缓存"""
+    with _connect() as conn:
+        conn.execute("DELETE FROM pdf_texts")
@@ -0,0 +1,224 @@
+"""
+后台预摘要模块
+领域论文拉取完成后，在后台以最低优先级为这些论文生成当前语言的摘要并写入共享摘要缓存，
+用户展开论文卡片时摘要通常已经就绪。每天的预摘要篇数有上限，达到上限后停止
+"""
+
+import json
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from utils.llm_scheduler import PRIORITY_BACKGROUND
+from utils.llm_summarizer import get_cached_summary, summarize_packed
+from utils.paper_id import base_id
+
+
+# 默认每天最多预摘要的论文篇数（只统计成功生成摘要的论文，缓存命中和失败不计）
+DEFAULT_DAILY_BUDGET = 50
+
+# 预摘要配置文件（与 app.py 同级目录，可选），上限由部署方配置，所有会话共用
+# 格式: {"daily_budget": 100}
+PRESUMMARIZE_CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "presummarize.json")
+
+# 后台预摘要的并发请求数（请求本身还会经过 LLM 调度器的限额和优先级排队）
+PRESUMMARIZE_CONCURRENCY = 2
+
+
+def load_daily_budget() -> int:
+    """
+    从 presummarize.json 读取每天的预摘要上限
+    文件不存在或格式错误时返回 DEFAULT_DAILY_BUDGET
+    """
+    try:
+        if os.path.exists(PRESUMMARIZE_CONFIG_FILE):
+            with open(PRESUMMARIZE_CONFIG_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return max(0, int(data.get("daily_budget", DEFAULT_DAILY_BUDGET)))
+        return DEFAULT_DAILY_BUDGET
+    except (json.JSONDecodeError, IOError, AttributeError, TypeError, ValueError) as e:
+        print(f"加载预摘要配置失败: {e}")
+        return DEFAULT_DAILY_BUDGET
+
+
+@dataclass
+class _Job:
+    """一次预摘要任务（同一次拉取的论文 + 摘要配置）"""
+    papers: List[Tuple[str, str]]   # (arxiv_id, abstract)
+    api_key: str
+    base_url: str
+    model: str
+    lang: str
+
+
+class Presummarizer:
+    """
+    后台预摘要工作线程（进程内，所有会话共享）
+
+    任务按提交顺序依次处理；同一篇论文在同一语言和模型下排队或处理中时不会重复提交。
+    """
+
+    def __init__(self, daily_budget: Optional[int] = None):
+        """
+        Args:
+            daily_budget: 每天最多预摘要的论文篇数，默认读取 presummarize.json
+        """
+        self.daily_budget = load_daily_budget() if daily_budget is None else daily_budget
+        self._queue: "queue.Queue[_Job]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending: Set[Tuple[str, str, str]] = set()
+        self._worker: Optional[threading.Thread] = None
+        self._day = date.today()
+        self._used = 0
+        self._stats = {"queued": 0, "summarized": 0, "failed": 0, "skipped_budget": 0}
+
+    def set_budget(self, daily_budget: int) -> None:
+        """修改每天的预摘要上限（进程内全局生效，不应由单个会话调用）"""
+        with self._lock:
+            self.daily_budget = daily_budget
+
+    def remaining_budget(self) -> int:
+        """今天剩余的预摘要篇数"""
+        with self._lock:
+            self._roll_day()
+            return max(0, self.daily_budget - self._used)
+
+    def _roll_day(self) -> None:
+        """跨天时重置用量（调用方需持有 _lock）"""
+        today = date.today()
+        if today != self._day:
+            self._day, self._used = today, 0
+
+    def submit(
+        self,
+        papers: Sequence,
+        api_key: str,
+        base_url: str,
+        model: str,
+        lang: str
+    ) -> int:
+        """
+        提交一批论文进行后台预摘要（立即返回）
+
+        Args:
+            papers: Paper 列表（需要 arxiv_id 和 abstract 字段）
+            api_key: OpenAI 兼容 API 的密钥
+            base_url: API 基础 URL
+            model: 模型名称
+            lang: 摘要语言
+
+        Returns:
+            int: 实际加入队列的论文数（已缓存、已在队列中的论文不计）
+        """
+        if not api_key or not api_key.strip():
+            return 0
+
+        model = model.strip() if model else "gpt-3.5-turbo"
+
+        # 查缓存要读 SQLite，放在锁外进行，避免阻塞其他会话的提交和统计
+        with self._lock:
+            pending = set(self._pending)
+        candidates = [
+            paper for paper in papers
+            if paper.abstract.strip()
+            and (base_id(paper.arxiv_id), lang, model) not in pending
+            and get_cached_summary(paper.abstract, paper.arxiv_id, base_url, model, lang) is None
+        ]
+
+        selected = []
+        with self._lock:
+            # 查缓存期间其他会话可能已提交同一篇论文
+            for paper in candidates:
+                key = (base_id(paper.arxiv_id), lang, model)
+                if key in self._pending:
+                    continue
+                self._pending.add(key)
+                selected.append((paper.arxiv_id, paper.abstract))
+
+            if not selected:
+                return 0
+            self._stats["queued"] += len(selected)
+            self._queue.put(_Job(selected, api_key, base_url, model, lang))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="presummarizer", daemon=True)
+                self._worker.start()
+        return len(selected)
+
+    def _run(self) -> None:
+        """工作线程：依次处理队列中的任务"""
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            except Exception as e:
+                print(f"后台预摘要失败: {e}")
+            finally:
+                with self._lock:
+                    for arxiv_id, _ in job.papers:
+                        self._pending.discard((base_id(arxiv_id), job.lang, job.model))
+                self._queue.task_done()
+
+    def _process(self, job: _Job) -> None:
+        """处理一个任务：在预算内打包生成摘要（结果由 summarize_packed 写入摘要缓存）"""
+        # 排队期间可能已被用户手动生成，发送前再检查一次缓存
+        papers = [
+            (arxiv_id, abstract) for arxiv_id, abstract in job.papers
+            if get_cached_summary(abstract, arxiv_id, job.base_url, job.model, job.lang) is None
+        ]
+
+        # 按剩余预算截断；预算在摘要成功后才扣除，失败的论文不占用当天的额度
+        with self._lock:
+            self._roll_day()
+            allowed = max(0, self.daily_budget - self._used)
+            if len(papers) > allowed:
+                self._stats["skipped_budget"] += len(papers) - allowed
+                papers = papers[:allowed]
+
+        if not papers:
+            return
+
+        results = summarize_packed(
+            abstracts=[abstract for _, abstract in papers],
+            api_key=job.api_key,
+            base_url=job.base_url,
+            model=job.model,
+            lang=job.lang,
+            arxiv_ids=[arxiv_id for arxiv_id, _ in papers],
+            max_workers=PRESUMMARIZE_CONCURRENCY,
+            priority=PRIORITY_BACKGROUND
+        )
+        succeeded = sum(result.ok for result in results)
+        with self._lock:
+            self._roll_day()
+            self._used += succeeded
+            self._stats["summarized"] += succeeded
+            self._stats["failed"] += len(results) - succeeded
+
+    def wait(self) -> None:
+        """阻塞直到队列中的任务全部处理完（用于测试和基准测试）"""
+        self._queue.join()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取预摘要统计
+
+        Returns:
+            dict: {"queued": 累计加入队列的论文数, "summarized": 成功数, "failed": 失败数,
+                   "skipped_budget": 因超出每日上限跳过的论文数, "in_progress": 排队或处理中的论文数,
+                   "used_today": 今天成功预摘要的篇数, "daily_budget": 每日上限}
+        """
+        with self._lock:
+            self._roll_day()
+            return dict(
+                self._stats,
+                in_progress=len(self._pending),
+                used_today=self._used,
+                daily_budget=self.daily_budget
+            )
+
+
+# 全局后台预摘要器（所有 Streamlit 会话共享）
+PRESUMMARIZER = Presummarizer()
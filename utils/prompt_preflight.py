@@ -0,0 +1,308 @@
+"""
+LLM 输入预检模块
+发送请求前统一处理输入文本：规范化 LaTeX 和空白、去除样板内容、计算 token 数，
+并按模型的上下文窗口在句子 / 段落 / 章节边界处截断，保证请求不会因超长而失败；
+每次预检返回节省的 token 数，由调用方写入 LLM 计量记录
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from utils.llm_metrics import estimate_tokens
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+# 常见模型的 (上下文窗口, 最大输出) token 数，按模型名前缀匹配（取最长前缀）
+MODEL_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-3.5-turbo": (16385, 4096),
+    "gpt-4": (8192, 4096),
+    "gpt-4-turbo": (128000, 4096),
+    "gpt-4o": (128000, 16384),
+    "gpt-4.1": (1047576, 32768),
+    "deepseek": (64000, 8192),
+    "moonshot-v1-8k": (8192, 4096),
+    "moonshot-v1-32k": (32768, 4096),
+    "moonshot-v1-128k": (131072, 4096),
+    "qwen": (32768, 8192),
+    "glm-4": (128000, 4096),
+}
+
+# 未知模型按保守的上下文窗口估算
+DEFAULT_MODEL_LIMITS = (8192, 4096)
+
+# 计算输入预算时额外预留的 token 数（抵消估算误差和消息格式开销）
+PROMPT_SAFETY_MARGIN = 256
+
+# 切分句子；切在 e.g. / i.e. / et al. / vs. 等缩写之后的片段再合并回去
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9(\[$\\])')
+_ABBREVIATIONS = ("e.g.", "i.e.", "et al.", "vs.", "etc.", "cf.", "Fig.", "Eq.")
+
+# LaTeX：保留参数内容的格式命令、整体删除的引用命令、转义字符和常用符号
+_LATEX_FORMAT = re.compile(
+    r'\\(?:textbf|textit|textrm|textsc|texttt|emph|text|mathrm|mathbf|mathit|mathcal|mathbb|operatorname)'
+    r'\s*\{([^{}]*)\}'
+)
+_LATEX_REFERENCE = re.compile(r'~?\\(?:cite[pt]?|ref|eqref|label|footnote)\s*\{[^{}]*\}')
+_LATEX_MATH = re.compile(r'(?<!\\)\$([^$]{1,200}?)(?<!\\)\$')
+_LATEX_SCRIPT = re.compile(r'([\^_])\{([^{}]{1,20})\}')
+_LATEX_ESCAPE = re.compile(r'\\([%&_#${}])')
+_LATEX_SYMBOLS = {
+    "alpha": "α", "beta": "β", "gamma": "γ", "delta": "δ", "epsilon": "ε", "varepsilon": "ε",
+    "eta": "η", "theta": "θ", "lambda": "λ", "mu": "μ", "pi": "π", "rho": "ρ", "sigma": "σ",
+    "tau": "τ", "phi": "φ", "omega": "ω", "Delta": "Δ", "Omega": "Ω",
+    "times": "×", "cdot": "·", "sim": "~", "approx": "≈", "leq": "≤", "le": "≤", "geq": "≥",
+    "ge": "≥", "pm": "±", "infty": "∞", "to": "→", "rightarrow": "→", "ell": "ℓ",
+    "ldots": "…", "dots": "…", "textasciitilde": "~",
+}
+_LATEX_OPERATOR = re.compile(r'\\(log|exp|max|min|argmax|argmin|sup|inf|lim|sqrt)(?![A-Za-z])')
+_LATEX_SPACING = re.compile(r'\\(?:left|right|big|Big|quad|qquad)(?![A-Za-z])|\\[,;!]')
+_LATEX_SYMBOL = re.compile(r'\\(' + "|".join(sorted(_LATEX_SYMBOLS, key=len, reverse=True)) + r')(?![A-Za-z])')
+
+# 摘要中的样板句子：带链接的句子、「代码 / 数据可在某处获取」的发布说明、「录用于某会议」的录用信息
+# （只匹配这些明确的说法，避免误删 "Datasets ... are rarely released" 之类的正文）
+_URL = re.compile(r'(?:https?://|www\.)\S+|\b(?:github|gitlab|huggingface)\.(?:com|co|io)/\S+', re.IGNORECASE)
+_BOILERPLATE_SENTENCE = re.compile(
+    r'\b(?:code|codes|data|datasets?|models?|weights|implementations?|project page|demo)\b[^.]{0,80}?'
+    r'\b(?:is|are|will be|has been|have been)\s+(?:made\s+)?(?:publicly\s+|freely\s+|openly\s+)?'
+    r'(?:available|released)\s+(?:at|from|via|on github|on hugging ?face)\b'
+    r'|^(?:this (?:paper|work|manuscript) (?:has been|was|is|will be) )?'
+    r'(?:accepted (?:at|to|by|in|for (?:publication|presentation) (?:at|in))|to appear (?:at|in))'
+    r'\s+(?:the\s+)?(?-i:[A-Z0-9])',
+    re.IGNORECASE
+)
+
+# PDF 文本中的样板行：arXiv 页边标记、会议 / 版权页眉页脚
+# （不按纯数字行删除页码：PyMuPDF 常把表格的每个单元格输出为单独一行）
+_BOILERPLATE_LINE = re.compile(
+    r'^(?:arXiv:\d{4}\.\d{4,5}(?:v\d+)?\s*\[[^\]]+\].*'
+    r'|(?:Preprint|Under review|Published as a conference paper|Proceedings of|Copyright|©|Permission to make digital)\b.*)$',
+    re.IGNORECASE
+)
+
+
+@dataclass
+class PreflightResult:
+    """一次预检的结果"""
+    text: str               # 处理后实际发送的文本
+    original_tokens: int    # 处理前的 token 数
+    tokens: int             # 处理后的 token 数
+    truncated: bool         # 是否因超出预算被截断
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+def get_model_limits(model: str) -> Tuple[int, int]:
+    """
+    获取模型的 (上下文窗口, 最大输出) token 数
+
+    Args:
+        model: 模型名称
+
+    Returns:
+        Tuple[int, int]: 按最长前缀匹配 MODEL_LIMITS，未知模型返回 DEFAULT_MODEL_LIMITS
+    """
+    name = model.strip().lower()
+    matches = [prefix for prefix in MODEL_LIMITS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_MODEL_LIMITS
+    return MODEL_LIMITS[max(matches, key=len)]
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: str):
+    """获取模型对应的 tiktoken 编码（未知模型用 cl100k_base，无法加载时返回 None）"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # 编码文件需要联网下载，离线时退回估算
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    计算文本的 token 数（安装了 tiktoken 时精确计数，否则用 llm_metrics.estimate_tokens 估算）
+
+    Args:
+        text: 文本
+        model: 模型名称（用于选择 tiktoken 编码）
+
+    Returns:
+        int: token 数
+    """
+    if TIKTOKEN_AVAILABLE:
+        encoding = _get_encoding(model.strip())
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def input_budget(model: str, prompt: str, max_tokens: int, cap: Optional[int] = None) -> int:
+    """
+    计算一次请求中可变输入部分的 token 预算
+
+    Args:
+        model: 模型名称
+        prompt: 请求中的固定部分（系统提示词、指令模板）
+        max_tokens: 为输出预留的 token 数
+        cap: 额外的上限（控制成本），None 表示只受上下文窗口限制
+
+    Returns:
+        int: 可变输入的最大 token 数（至少为 1）
+    """
+    context_window, _ = get_model_limits(model)
+    budget = context_window - count_tokens(prompt, model) - max_tokens - PROMPT_SAFETY_MARGIN
+    if cap is not None:
+        budget = min(budget, cap)
+    return max(1, budget)
+
+
+def split_sentences(text: str) -> List[str]:
+    """把文本切分为句子（合并换行和多余空白）"""
+    sentences: List[str] = []
+    for piece in _SENTENCE_BOUNDARY.split(" ".join(text.split())):
+        if sentences and sentences[-1].endswith(_ABBREVIATIONS):
+            sentences[-1] += " " + piece
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def normalize_latex(text: str) -> str:
+    """把摘要中的 LaTeX 标记转换为纯文本（去掉数学定界符和格式命令，符号换成 Unicode）"""
+    text = _LATEX_REFERENCE.sub("", text)
+    text = _LATEX_MATH.sub(r'\1', text)
+    for _ in range(3):
+        # 格式命令可能嵌套（如 \textbf{\emph{x}}），由内向外展开
+        text, count = _LATEX_FORMAT.subn(r'\1', text)
+        if not count:
+            break
+    text = _LATEX_SYMBOL.sub(lambda m: _LATEX_SYMBOLS[m.group(1)], text)
+    text = _LATEX_OPERATOR.sub(r'\1', _LATEX_SPACING.sub("", text))
+    text = _LATEX_SCRIPT.sub(r'\1\2', text)
+    text = _LATEX_ESCAPE.sub(r'\1', text)
+    text = re.sub(r'(?<=\w)~(?=\w)', " ", text)
+    return text.replace("``", '"').replace("''", '"')
+
+
+def normalize_whitespace(text: str) -> str:
+    """合并行内多余空白、去掉行尾空白，连续空行压缩为一个"""
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return re.sub(r'\n{3,}', "\n\n", "\n".join(lines)).strip()
+
+
+def strip_abstract_boilerplate(text: str) -> str:
+    """去掉摘要中的代码 / 数据发布说明和录用信息等样板句子"""
+    sentences = split_sentences(text)
+    kept = [
+        sentence for sentence in sentences
+        if not (_URL.search(sentence) or _BOILERPLATE_SENTENCE.search(sentence))
+    ]
+    return " ".join(kept or sentences)
+
+
+def strip_paper_boilerplate(text: str) -> str:
+    """去掉 PDF 文本中的 arXiv 页边标记和页眉页脚"""
+    return "\n".join(line for line in text.split("\n") if not _BOILERPLATE_LINE.match(line.strip()))
+
+
+def truncate_to_budget(text: str, budget: int, model: str = "") -> Tuple[str, bool]:
+    """
+    在不超过 token 预算的前提下保留尽量多的开头内容
+
+    依次按章节（空行）、行、句子切分，只在这些边界处截断，
+    不会把表格行或句子切成两半；开头的句子就超出预算时才按单词截断，
+    开头的单词仍超出预算（如没有空格的中日韩文本、长链接）时按 token 截断。
+
+    Args:
+        text: 文本
+        budget: token 预算
+        model: 模型名称（用于计数）
+
+    Returns:
+        Tuple[str, bool]: (截断后的文本, 是否发生截断)
+    """
+    if count_tokens(text, model) <= budget:
+        return text, False
+
+    separators = ["\n\n", "\n", None, " "]   # None 表示按句子切分
+
+    def fit(piece: str, remaining: int, level: int, leading: bool) -> str:
+        # leading: 此前还没有保留任何内容（只有这种情况下才允许按单词截断）
+        separator = separators[level]
+        parts = split_sentences(piece) if separator is None else piece.split(separator)
+        joiner = " " if separator is None else separator
+        kept: List[str] = []
+        for part in parts:
+            cost = count_tokens(part + joiner, model)
+            if cost <= remaining:
+                kept.append(part)
+                remaining -= cost
+                continue
+            # 放不下的片段按更细的边界保留其开头部分
+            if level + 1 < len(separators) and (separators[level + 1] != " " or (leading and not kept)):
+                partial = fit(part, remaining, level + 1, leading and not kept)
+                if partial:
+                    kept.append(partial)
+            break
+        return joiner.join(kept)
+
+    kept = fit(text, budget, 0, True).rstrip()
+    return kept or _slice_to_budget(text.strip(), budget, model), True
+
+
+def _slice_to_budget(text: str, budget: int, model: str) -> str:
+    """不考虑任何边界，保留不超过 token 预算的最长开头部分（二分查找字符数）"""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def preflight(text: str, model: str, budget: Optional[int] = None, kind: str = "abstract") -> PreflightResult:
+    """
+    预检一段 LLM 输入
+
+    Args:
+        text: 原始文本
+        model: 模型名称
+        budget: token 预算（见 input_budget），None 表示不截断
+        kind: "abstract"（论文摘要：规范化 LaTeX、合并为一段、去掉样板句子）
+              或 "paper"（PDF 正文：保留段落和表格的换行、去掉样板行）
+
+    Returns:
+        PreflightResult: 处理后的文本和 token 数
+    """
+    original_tokens = count_tokens(text, model)
+    if kind == "abstract":
+        compact = strip_abstract_boilerplate(" ".join(normalize_latex(text).split()))
+    else:
+        compact = normalize_whitespace(strip_paper_boilerplate(text))
+
+    truncated = False
+    if budget is not None:
+        compact, truncated = truncate_to_budget(compact, budget, model)
+    return PreflightResult(
+        text=compact,
+        original_tokens=original_tokens,
+        tokens=count_tokens(compact, model),
+        truncated=truncated
+    )
@@ -0,0 +1,220 @@
+"""
+全局限流模块
+基于 SQLite 实现跨线程、跨进程共享的令牌桶限流器，
+保证所有 Streamlit 会话和工作进程访问 ArXiv 时共同遵守请求间隔
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+# 限流状态文件路径（与 PDF 缓存同目录）
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "arxiv_daily_chef_cache")
+RATE_LIMIT_DB_FILE = os.path.join(CACHE_DIR, "rate_limits.db")
+
+# 单次等待的最长休眠时间（到点后重新检查令牌桶，避免长时间持有过期状态）
+MAX_SLEEP_SECONDS = 1.0
+
+# 进程排队数的心跳超时（秒）：有请求排队的进程每次检查令牌桶时都会刷新心跳，
+# 超时未刷新的记录（如进程已退出）不再计入全局排队数
+WAITER_HEARTBEAT_TIMEOUT = 15.0
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name           TEXT PRIMARY KEY,
+    tokens         REAL NOT NULL,
+    updated        REAL NOT NULL,
+    blocked_until  REAL NOT NULL DEFAULT 0,
+    acquired       INTEGER NOT NULL DEFAULT 0,
+    wait_total     REAL NOT NULL DEFAULT 0,
+    wait_max       REAL NOT NULL DEFAULT 0,
+    wait_last      REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS waiters (
+    name       TEXT NOT NULL,
+    pid        INTEGER NOT NULL,
+    waiting    INTEGER NOT NULL,
+    heartbeat  REAL NOT NULL,
+    PRIMARY KEY (name, pid)
+);
+"""
+
+
+class TokenBucketLimiter:
+    """
+    跨进程令牌桶限流器
+
+    令牌以 rate 个/秒 的速度补充，最多积累 capacity 个；每次请求消耗一个令牌。
+    桶状态保存在 SQLite 中，并通过 BEGIN IMMEDIATE 事务保证多线程 / 多进程下的原子性。
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float = 1.0, db_file: Optional[str] = None):
+        """
+        Args:
+            name: 令牌桶名称（同名限流器共享同一个桶）
+            rate: 每秒补充的令牌数（如 1/3 表示每 3 秒一次请求）
+            capacity: 桶容量（允许的最大突发请求数）
+            db_file: 状态文件路径，默认使用 RATE_LIMIT_DB_FILE
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.db_file = db_file or RATE_LIMIT_DB_FILE
+        self._local_waiting = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """打开一个写事务（每次新建连接，保证线程安全）"""
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+        conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR IGNORE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                (self.name, self.capacity, time.time())
+            )
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _add_waiting(self, delta: int) -> None:
+        """更新本进程的排队数（只在内存中，由 _report_waiting 随令牌桶事务一起写入）"""
+        with self._lock:
+            self._local_waiting += delta
+
+    def _report_waiting(self, conn: sqlite3.Connection, now: float, leaving: int = 0) -> None:
+        """在已打开的事务中写入本进程的排队数和心跳（leaving 为即将离开队列的请求数）"""
+        with self._lock:
+            waiting = max(self._local_waiting - leaving, 0)
+        conn.execute(
+            "INSERT OR REPLACE INTO waiters (name, pid, waiting, heartbeat) VALUES (?, ?, ?, ?)",
+            (self.name, os.getpid(), waiting, now)
+        )
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，令牌不足时阻塞等待
+
+        Args:
+            tokens: 需要消耗的令牌数
+
+        Returns:
+            float: 本次等待的秒数
+        """
+        start = time.time()
+        self._add_waiting(1)
+        try:
+            while True:
+                with self._transaction() as conn:
+                    current, updated, blocked_until = conn.execute(
+                        "SELECT tokens, updated, blocked_until FROM buckets WHERE name = ?",
+                        (self.name,)
+                    ).fetchone()
+
+                    now = time.time()
+                    current = min(self.capacity, current + max(now - updated, 0) * self.rate)
+
+                    if now >= blocked_until and current >= tokens:
+                        waited = now - start
+                        self._report_waiting(conn, now, leaving=1)
+                        conn.execute(
+                            """
+                            UPDATE buckets
+                            SET tokens = ?, updated = ?, acquired = acquired + 1,
+                                wait_total = wait_total + ?, wait_max = MAX(wait_max, ?),
+                                wait_last = ?
+                            WHERE name = ?
+                            """,
+                            (current - tokens, now, waited, waited, waited, self.name)
+                        )
+                        return waited
+
+                    conn.execute(
+                        "UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?",
+                        (current, now, self.name)
+                    )
+                    self._report_waiting(conn, now)
+                    to_sleep = max(blocked_until - now, (tokens - current) / self.rate)
+
+                time.sleep(min(max(to_sleep, 0.01), MAX_SLEEP_SECONDS))
+        finally:
+            self._add_waiting(-1)
+
+    def penalize(self, seconds: float) -> None:
+        """
+        暂停发放令牌一段时间（如收到 429 后全局退避）
+
+        Args:
+            seconds: 退避秒数
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE buckets SET blocked_until = MAX(blocked_until, ?), tokens = 0 WHERE name = ?",
+                (time.time() + seconds, self.name)
+            )
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        获取限流器压力统计（跨进程汇总，只读，不开启写事务）
+
+        Returns:
+            dict: {
+                "queue_depth": 当前所有进程中排队等待的请求数（心跳超时的进程不计入）,
+                "local_waiting": 当前进程中排队等待的请求数,
+                "acquired": 累计放行的请求数,
+                "avg_wait": 平均等待秒数,
+                "max_wait": 最长等待秒数,
+                "last_wait": 最近一次等待秒数,
+                "blocked_for": 距离退避结束的剩余秒数
+            }
+        """
+        now = time.time()
+        waiting, acquired, wait_total, wait_max, wait_last, blocked_until = 0, 0, 0.0, 0.0, 0.0, 0.0
+        if os.path.exists(self.db_file):
+            conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True, timeout=30)
+            try:
+                row = conn.execute(
+                    "SELECT acquired, wait_total, wait_max, wait_last, blocked_until FROM buckets WHERE name = ?",
+                    (self.name,)
+                ).fetchone()
+                if row is not None:
+                    acquired, wait_total, wait_max, wait_last, blocked_until = row
+                    waiting = conn.execute(
+                        "SELECT COALESCE(SUM(waiting), 0) FROM waiters WHERE name = ? AND heartbeat >= ?",
+                        (self.name, now - WAITER_HEARTBEAT_TIMEOUT)
+                    ).fetchone()[0]
+            except sqlite3.OperationalError:
+                # 状态表尚未创建（还没有进程获取过令牌）
+                pass
+            finally:
+                conn.close()
+
+        return {
+            "queue_depth": waiting,
+            "local_waiting": self._local_waiting,
+            "acquired": acquired,
+            "avg_wait": wait_total / acquired if acquired else 0.0,
+            "max_wait": wait_max,
+            "last_wait": wait_last,
+            "blocked_for": max(blocked_until - now, 0.0),
+        }
+
+
+# ArXiv 全局限流器：官方要求每 3 秒最多 1 次请求
+ARXIV_LIMITER = TokenBucketLimiter("arxiv", rate=1 / 3.0, capacity=1)
+
+# ArXiv OAI-PMH 接口的限流器：与搜索接口分开计数，收割遇到 503 时的退避不影响其他会话的搜索
+OAI_LIMITER = TokenBucketLimiter("arxiv_oai", rate=1 / 3.0, capacity=1)
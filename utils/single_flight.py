@@ -0,0 +1,145 @@
+"""
+请求合并（single-flight）模块
+同一进程内多个会话同时发起相同的拉取时，只向上游发出一次请求，
+其余调用等待这次请求并共享结果（逐条流式共享，不引入任何缓存过期问题）
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+
+class Flight:
+    """
+    一次正在进行的拉取
+
+    生产者在后台线程中逐条写入结果，任意数量的消费者可以同时从头读取，
+    结果到达即可读到；拉取结束（或失败）后所有消费者都会被唤醒。
+    """
+
+    def __init__(self, size: int):
+        """
+        Args:
+            size: 本次拉取请求的结果数量
+        """
+        self.size = size
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def add(self, item: Any) -> None:
+        """写入一条结果"""
+        with self._cond:
+            self.items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """标记拉取结束，error 不为空表示拉取失败"""
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def iter(self, limit: int) -> Iterator[Any]:
+        """
+        按到达顺序读取前 limit 条结果
+
+        Raises:
+            拉取失败时重新抛出生产者的异常（已读取的部分结果会先正常产出）
+        """
+        index = 0
+        while index < limit:
+            with self._cond:
+                while index >= len(self.items) and not self.done:
+                    self._cond.wait()
+                if index >= len(self.items):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                item = self.items[index]
+            index += 1
+            yield item
+
+        # 取满的是整个拉取时，等生产者收尾（如写入论文库）结束后再返回
+        if limit >= self.size:
+            with self._cond:
+                while not self.done:
+                    self._cond.wait()
+                if self.error is not None:
+                    raise self.error
+
+
+class SingleFlight:
+    """
+    相同键的并发拉取合并器
+
+    请求 n 条结果时，如果已有同键且请求数量不少于 n 的拉取正在进行，
+    就直接跟随它（取其前 n 条）；否则发起新的拉取。
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, List[Flight]] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def _run_producer(self, key: Hashable, flight: Flight, producer: Callable[[], Iterator[Any]]) -> None:
+        """在后台线程中执行拉取并写入 flight"""
+        error = None
+        try:
+            for item in producer():
+                flight.add(item)
+        except BaseException as e:
+            error = e
+        finally:
+            # 先从登记表中移除，之后到来的调用会发起新的拉取
+            with self._lock:
+                flights = self._flights.get(key, [])
+                if flight in flights:
+                    flights.remove(flight)
+                if not flights:
+                    self._flights.pop(key, None)
+            flight.finish(error)
+
+    def run(self, key: Hashable, size: int, producer: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        """
+        执行（或加入）一次拉取，逐条产出前 size 条结果
+
+        拉取在后台线程中进行，即使发起者中途停止读取，跟随者仍能拿到完整结果。
+
+        Args:
+            key: 合并键（相同键视为相同的请求）
+            size: 需要的结果数量
+            producer: 发起拉取的函数，返回结果迭代器
+
+        Yields:
+            拉取结果
+
+        Raises:
+            拉取失败时抛出 producer 的异常
+        """
+        with self._lock:
+            flight = next((f for f in self._flights.get(key, []) if f.size >= size), None)
+            if flight is not None:
+                self.followers += 1
+            else:
+                flight = Flight(size)
+                self._flights.setdefault(key, []).append(flight)
+                self.leaders += 1
+                threading.Thread(
+                    target=self._run_producer, args=(key, flight, producer), daemon=True
+                ).start()
+
+        yield from flight.iter(size)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取合并统计
+
+        Returns:
+            dict: {"leaders": 实际发出的拉取数, "followers": 被合并的调用数,
+                   "in_flight": 当前进行中的拉取数}
+        """
+        with self._lock:
+            in_flight = sum(len(flights) for flights in self._flights.values())
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": in_flight}
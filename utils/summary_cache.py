@@ -0,0 +1,231 @@
+"""
+LLM 摘要缓存模块
+使用 SQLite 持久化保存生成过的摘要，所有 Streamlit 会话和进程共享；
+缓存键由论文、语言、模型、API 地址和系统提示词共同决定，总大小超限时按最近最少使用淘汰；
+流式生成中途被打断时，已生成的部分标记为不完整（complete = 0）单独保存，不作为缓存命中
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+
+from utils.paper_id import base_id, content_hash
+
+
+# 摘要缓存文件路径（与 PDF 缓存同目录）
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "arxiv_daily_chef_cache")
+SUMMARY_DB_FILE = os.path.join(CACHE_DIR, "summaries.db")
+
+# 缓存总大小上限（按摘要文本的 UTF-8 字节数计算）
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# 命中时最近使用时间超过这个秒数才写回（期间的命中次数先在进程内累计，写回时一并加上）
+RECENCY_UPDATE_INTERVAL = 60
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key        TEXT PRIMARY KEY,
+    arxiv_id   TEXT NOT NULL,
+    lang       TEXT NOT NULL,
+    model      TEXT NOT NULL,
+    summary    TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created    REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0,
+    complete   INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries (last_used);
+"""
+
+
+# 进程内尚未写回的命中次数：缓存键 -> 次数
+_pending_lock = threading.Lock()
+_pending_hits: Dict[str, int] = {}
+
+
+# 本进程中已完成建表的数据库文件（每个文件只需执行一次）
+_initialized_dbs: Set[str] = set()
+_init_lock = threading.Lock()
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
+    """启用 WAL 并建表"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """
+    打开摘要缓存连接（每次调用新建连接，保证多线程 / 多进程安全）
+
+    with 块正常结束时提交、出错时回滚，退出时关闭连接；建表每个进程只执行一次
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # 数据库文件被删除（如临时目录被清理）后重新建表
+    missing = not os.path.exists(SUMMARY_DB_FILE)
+    conn = sqlite3.connect(SUMMARY_DB_FILE, timeout=30)
+    try:
+        with _init_lock:
+            if missing or SUMMARY_DB_FILE not in _initialized_dbs:
+                _init_db(conn)
+                _initialized_dbs.add(SUMMARY_DB_FILE)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def make_key(
+    arxiv_id: str,
+    abstract: str,
+    lang: str,
+    model: str,
+    base_url: str,
+    system_prompt: str
+) -> str:
+    """
+    计算摘要缓存键
+
+    论文按基础编号 + 摘要内容指纹识别（新版本摘要不变时复用）；
+    API 地址忽略末尾的斜杠，系统提示词变化后旧缓存自然失效。
+    """
+    parts = [
+        base_id(arxiv_id) if arxiv_id else "",
+        content_hash(abstract),
+        lang,
+        model.strip(),
+        base_url.strip().rstrip("/"),
+        content_hash(system_prompt),
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_summary(key: str) -> Optional[str]:
+    """
+    读取缓存的摘要（命中时刷新最近使用时间，每 RECENCY_UPDATE_INTERVAL 秒最多写一次）
+
+    Args:
+        key: make_key 计算的缓存键
+
+    Returns:
+        Optional[str]: 摘要文本，未命中返回 None
+    """
+    now = time.time()
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT summary, complete, last_used FROM summaries WHERE key = ?", (key,)
+        ).fetchone()
+        # 中途被打断的摘要（complete = 0）不作为命中，由 get_partial_summary 单独读取
+        if row is None or not row[1]:
+            return None
+        
+        # 最近刚用过：只在进程内记下命中，不写数据库
+        with _pending_lock:
+            if now - row[2] < RECENCY_UPDATE_INTERVAL:
+                _pending_hits[key] = _pending_hits.get(key, 0) + 1
+                return row[0]
+            hits = _pending_hits.pop(key, 0) + 1
+        conn.execute(
+            "UPDATE summaries SET last_used = ?, hits = hits + ? WHERE key = ?",
+            (now, hits, key)
+        )
+    return row[0]
+
+
+def get_partial_summary(key: str) -> Optional[str]:
+    """
+    读取中途被打断、不完整的摘要（只用于展示和提示重新生成，不刷新最近使用时间）
+
+    Args:
+        key: make_key 计算的缓存键
+
+    Returns:
+        Optional[str]: 不完整的摘要文本；没有记录或已有完整摘要时返回 None
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT summary FROM summaries WHERE key = ? AND complete = 0", (key,)
+        ).fetchone()
+    return row[0] if row is not None else None
+
+
+def put_summary(
+    key: str,
+    arxiv_id: str,
+    lang: str,
+    model: str,
+    summary: str,
+    complete: bool = True
+) -> None:
+    """
+    写入摘要，并在总大小超过 MAX_CACHE_BYTES 时淘汰最久未使用的条目
+
+    不完整的摘要只替换不完整的记录，不会覆盖其他会话同时写入的完整摘要。
+
+    Args:
+        key: make_key 计算的缓存键
+        arxiv_id: 论文 ID（仅用于统计和排查）
+        lang: 摘要语言
+        model: 模型名称
+        summary: 摘要文本
+        complete: 是否为完整结果（流式生成被打断时为 False）
+    """
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO summaries
+                (key, arxiv_id, lang, model, summary, size, created, last_used, hits, complete)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                arxiv_id = excluded.arxiv_id, lang = excluded.lang, model = excluded.model,
+                summary = excluded.summary, size = excluded.size, created = excluded.created,
+                last_used = excluded.last_used, hits = 0, complete = excluded.complete
+            WHERE excluded.complete = 1 OR summaries.complete = 0
+            """,
+            (key, arxiv_id, lang, model, summary, len(summary.encode("utf-8")), now, now, int(complete))
+        )
+        # 从最近使用的条目开始累计大小，超出上限的部分全部删除
+        conn.execute(
+            """
+            DELETE FROM summaries WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS total
+                    FROM summaries
+                ) WHERE total > ?
+            )
+            """,
+            (MAX_CACHE_BYTES,)
+        )
+
+
+def get_stats() -> Dict[str, int]:
+    """
+    获取缓存统计
+
+    Returns:
+        dict: {"entries": 条目数, "bytes": 总大小, "hits": 累计命中次数（含本进程尚未写回的命中）}
+    """
+    with _connect() as conn:
+        entries, size, hits = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM summaries"
+        ).fetchone()
+    with _pending_lock:
+        hits += sum(_pending_hits.values())
+    return {"entries": entries, "bytes": size, "hits": hits}
+
+
+def clear() -> None:
+    """清空摘要缓存"""
+    with _connect() as conn:
+        conn.execute("DELETE FROM summaries")
+    with _pending_lock:
+        _pending_hits.clear()